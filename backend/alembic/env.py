@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
 from app.core.config import get_settings
 from app.models.database import Base
+from app.orchestration.checkpointer import include_in_migrations
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -50,6 +51,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_in_migrations,
     )
 
     with context.begin_transaction():
@@ -57,7 +59,8 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    # The checkpoints table may share this database but belongs to the checkpointer.
+    context.configure(connection=connection, target_metadata=target_metadata, include_name=include_in_migrations)
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,29 @@
+"""Add workflow revision counter
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'workflows',
+        sa.Column('revision', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('workflows') as batch_op:
+        batch_op.drop_column('revision')
@@ -0,0 +1,45 @@
+"""Denormalize current_step and index per-user listings
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'workflows',
+        sa.Column('current_step', sa.String(), nullable=False, server_default='init'),
+    )
+
+    # Backfill from the JSON snapshot
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "UPDATE workflows SET current_step = COALESCE(state_snapshot->>'current_step', 'unknown')"
+        )
+    else:
+        op.execute(
+            "UPDATE workflows SET current_step = "
+            "COALESCE(json_extract(state_snapshot, '$.current_step'), 'unknown')"
+        )
+
+    op.create_index(
+        'ix_workflows_user_id_updated_ts', 'workflows', ['user_id', 'updated_ts'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_workflows_user_id_updated_ts', table_name='workflows')
+    with op.batch_alter_table('workflows') as batch_op:
+        batch_op.drop_column('current_step')
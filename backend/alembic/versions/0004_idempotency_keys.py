@@ -0,0 +1,35 @@
+"""Add idempotency key store
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'idempotency_keys',
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('request_hash', sa.String(), nullable=False),
+        sa.Column('status_code', sa.Integer(), nullable=True),
+        sa.Column('response_body', sa.JSON(), nullable=True),
+        sa.Column('created_ts', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+    op.create_index(op.f('ix_idempotency_keys_created_ts'), 'idempotency_keys', ['created_ts'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_idempotency_keys_created_ts'), table_name='idempotency_keys')
+    op.drop_table('idempotency_keys')
@@ -0,0 +1,51 @@
+"""Add normalized tables for script, thumbnail and A/B variant state
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table_name in ('workflow_script_variants', 'workflow_thumbnail_variants'):
+        op.create_table(
+            table_name,
+            sa.Column('workflow_id', sa.String(), nullable=False),
+            sa.Column('variant_id', sa.String(), nullable=False),
+            sa.Column('position', sa.Integer(), nullable=False),
+            sa.Column('data', sa.JSON(), nullable=False),
+            sa.ForeignKeyConstraint(['workflow_id'], ['workflows.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('workflow_id', 'variant_id'),
+        )
+
+    op.create_table(
+        'workflow_ab_variants',
+        sa.Column('workflow_id', sa.String(), nullable=False),
+        sa.Column('thumbnail_id', sa.String(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('style', sa.String(), nullable=True),
+        sa.Column('impressions', sa.Integer(), nullable=False),
+        sa.Column('clicks', sa.Integer(), nullable=False),
+        sa.Column('ctr', sa.Float(), nullable=False),
+        sa.Column('avg_view_duration', sa.Float(), nullable=False),
+        sa.Column('extra', sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(['workflow_id'], ['workflows.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('workflow_id', 'thumbnail_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('workflow_ab_variants')
+    op.drop_table('workflow_thumbnail_variants')
+    op.drop_table('workflow_script_variants')
@@ -0,0 +1,34 @@
+"""Add append-only A/B metric samples
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'ab_metric_samples',
+        sa.Column('workflow_id', sa.String(), nullable=False),
+        sa.Column('variant_id', sa.String(), nullable=False),
+        sa.Column('ts', sa.Float(), nullable=False),
+        sa.Column('impressions', sa.Integer(), nullable=False),
+        sa.Column('clicks', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['workflow_id'], ['workflows.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('workflow_id', 'variant_id', 'ts'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('ab_metric_samples')
@@ -0,0 +1,43 @@
+"""Add cold-storage archive of completed workflows
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'workflow_archive',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('topic', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('current_step', sa.String(), nullable=False),
+        sa.Column('created_ts', sa.Integer(), nullable=False),
+        sa.Column('updated_ts', sa.Integer(), nullable=False),
+        sa.Column('revision', sa.Integer(), nullable=False),
+        sa.Column('archived_ts', sa.Integer(), nullable=False),
+        sa.Column('codec', sa.String(), nullable=False),
+        sa.Column('payload', sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_workflow_archive_user_id'), 'workflow_archive', ['user_id'], unique=False)
+    op.create_index(op.f('ix_workflow_archive_archived_ts'), 'workflow_archive', ['archived_ts'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_workflow_archive_archived_ts'), table_name='workflow_archive')
+    op.drop_index(op.f('ix_workflow_archive_user_id'), table_name='workflow_archive')
+    op.drop_table('workflow_archive')
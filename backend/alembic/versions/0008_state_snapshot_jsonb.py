@@ -0,0 +1,43 @@
+"""Store workflows.state_snapshot as JSONB on PostgreSQL
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SQLite has no JSONB type; the column stays JSON text there.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.alter_column(
+        'workflows',
+        'state_snapshot',
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        postgresql_using='state_snapshot::jsonb',
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.alter_column(
+        'workflows',
+        'state_snapshot',
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        postgresql_using='state_snapshot::json',
+    )
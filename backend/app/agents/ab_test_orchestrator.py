@@ -80,16 +80,31 @@ class ABTestOrchestratorAgent(BaseAgent):
 
     async def _update_test(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Update metrics and check for significance"""
-        ab_test = state["ab_test"]
-        thumbnails = state.get("thumbnail_variants", [])
+        current_metrics = await self.collect_metrics(state)
 
-        # Calculate elapsed time
-        elapsed_seconds = time.time() - ab_test["started_at"]
-        elapsed_minutes = elapsed_seconds / 60
+        # Check for statistical significance (compare best vs control)
+        stats_result = self.statistics.calculate_multi_variant(current_metrics)
+        return self.apply_check(state, current_metrics, stats_result)
 
-        # Get mock analytics
+    async def collect_metrics(self, state: Dict[str, Any]) -> list[Dict[str, Any]]:
+        """Current metrics of every variant (mock analytics)."""
+        elapsed_minutes = (time.time() - state["ab_test"]["started_at"]) / 60
         provider = MockAnalyticsProvider(state["workflow_id"])
-        current_metrics = await provider.simulate_batch(thumbnails, int(elapsed_minutes))
+        return await provider.simulate_batch(state.get("thumbnail_variants", []), int(elapsed_minutes))
+
+    def is_due(self, ab_test: Dict[str, Any], now: float) -> bool:
+        """Whether check_interval_seconds have passed since the last check."""
+        return now - ab_test.get("last_updated", 0) >= self.check_interval_seconds
+
+    def apply_check(
+        self,
+        state: Dict[str, Any],
+        current_metrics: list[Dict[str, Any]],
+        stats_result: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Record one check's metrics and significance, and declare a winner or timeout if due."""
+        ab_test = state["ab_test"]
+        elapsed_minutes = (time.time() - ab_test["started_at"]) / 60
 
         # Update state with new metrics
         ab_test["variants"] = current_metrics
@@ -97,9 +112,6 @@ class ABTestOrchestratorAgent(BaseAgent):
         ab_test["check_count"] += 1
         ab_test["total_impressions"] = sum(v["impressions"] for v in current_metrics)
 
-        # Check for statistical significance (compare best vs control)
-        stats_result = self.statistics.calculate_multi_variant(current_metrics)
-
         ab_test["confidence"] = stats_result.get("winner_confidence", 0.0)
 
         # Determine if we should declare winner
@@ -11,6 +11,7 @@ from langchain_openai import ChatOpenAI
 
 from app.agents.base import BaseAgent
 from app.core.config import get_settings
+from app.core.instrumentation import external_call, record_fallback
 from app.models.state import ContentWorkflowState, ScriptVariant
 
 
@@ -51,8 +52,10 @@ class ScriptArchitectAgent(BaseAgent):
             elif self.provider == "ollama":
                 variants, usage = await self._generate_with_ollama(state)
             else:
+                record_fallback("mock_scripts")
                 variants = self._generate_fallback_variants(state)
         except Exception as exc:  # pragma: no cover - guarded fallback
+            record_fallback("script_generation_fallback")
             self.logger.warning(
                 "script_generation_fallback",
                 workflow_id=state["workflow_id"],
@@ -86,12 +89,13 @@ class ScriptArchitectAgent(BaseAgent):
     ) -> tuple[list[ScriptVariant], dict[str, int]]:
         system_prompt, user_prompt = self._build_prompts(state)
 
-        response = await self.openai_llm.ainvoke(
-            [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=json.dumps(user_prompt)),
-            ]
-        )
+        with external_call("openai"):
+            response = await self.openai_llm.ainvoke(
+                [
+                    SystemMessage(content=system_prompt),
+                    HumanMessage(content=json.dumps(user_prompt)),
+                ]
+            )
 
         parsed = self._parse_llm_output(response.content, state)
         usage = self.extract_token_usage(response)
@@ -113,8 +117,9 @@ class ScriptArchitectAgent(BaseAgent):
         }
 
         async with httpx.AsyncClient(timeout=self.ollama_timeout_seconds) as client:
-            response = await client.post(f"{self.ollama_base_url}/api/chat", json=payload)
-            response.raise_for_status()
+            with external_call("ollama"):
+                response = await client.post(f"{self.ollama_base_url}/api/chat", json=payload)
+                response.raise_for_status()
             response_json = response.json()
 
         content = str((response_json.get("message") or {}).get("content") or "")
@@ -176,6 +181,7 @@ class ScriptArchitectAgent(BaseAgent):
             )
 
         if len(normalized) != 3:
+            record_fallback("incomplete_llm_output")
             return self._generate_fallback_variants(state)
 
         return normalized
@@ -3,6 +3,7 @@
 import time
 
 from app.agents.base import BaseAgent
+from app.core.instrumentation import record_fallback
 from app.models.state import ContentWorkflowState
 from app.services.perplexity_client import PerplexityClient
 from app.services.redis_client import get_redis_cache
@@ -47,6 +48,7 @@ class TrendAnalystAgent(BaseAgent):
                 self.logger.info("cached_real_trends", topic=topic)
             else:
                 self.logger.warning("perplexity_api_failed_falling_back_to_mock")
+                record_fallback("mock_trend_source")
                 # 3. Fallback to mock data
                 trend_data = {
                     "primary_trend": "educational_hacks",
@@ -19,7 +19,10 @@ class VisualEngineerAgent(BaseAgent):
         self.thumbnail_height = settings.thumbnail_height
 
     async def run(self, state: ContentWorkflowState) -> ContentWorkflowState:
-        script = self._resolve_script(state)
+        return self.apply_thumbnails(state, self.build_thumbnails(state, self.resolve_script(state)))
+
+    def build_thumbnails(self, state: ContentWorkflowState, script: ScriptVariant) -> list[ThumbnailVariant]:
+        """The three thumbnail variants for script; image URLs render on first fetch."""
         hook = script.get("hook", f"{state['topic']} explained")
 
         prompt_specs = [
@@ -54,18 +57,24 @@ class VisualEngineerAgent(BaseAgent):
                     "seed": seed,
                 }
             )
+        return thumbnails
 
+    def apply_thumbnails(
+        self,
+        state: ContentWorkflowState,
+        thumbnails: list[ThumbnailVariant],
+    ) -> ContentWorkflowState:
         state["thumbnail_variants"] = thumbnails
         state["selected_thumbnail_id"] = None
         state["human_approval_status"]["thumbnails_approved"] = False
         state["current_step"] = "thumbnails_generated"
         state["updated_ts"] = int(time.time())
 
-        self.logger.info("thumbnails_generated", workflow_id=state["workflow_id"], variants=3)
+        self.logger.info("thumbnails_generated", workflow_id=state["workflow_id"], variants=len(thumbnails))
         return state
 
     @staticmethod
-    def _resolve_script(state: ContentWorkflowState) -> ScriptVariant:
+    def resolve_script(state: ContentWorkflowState) -> ScriptVariant:
         selected_script_id = state.get("selected_script_id")
         scripts = state.get("script_variants", [])
 
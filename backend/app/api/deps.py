@@ -1,10 +1,20 @@
 ﻿from collections.abc import AsyncGenerator
-from fastapi import Request
+from fastapi import Header, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.database import get_session
 from app.orchestration.workflow import ContentWorkflow
+from app.services.archive import WorkflowArchiver
+from app.services.checkpoint_compaction import CheckpointCompactor
+from app.services.events import WorkflowEventBus
+from app.services.idempotency import IdempotentRequest
+from app.services.job_queue import WorkflowJobQueue
+from app.services.read_routing import ReadSessionRouter
 from app.services.redis_client import RedisCache
+from app.services.response_cache import SerializedResponseCache
+from app.services.revisions import RevisionTracker
+from app.services.run_coordinator import WorkflowRunCoordinator
+from app.services.workflow_persistence import WorkflowPersistence
 
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
@@ -12,9 +22,71 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+async def get_read_session(
+    request: Request,
+    min_updated_ts: int | None = Header(default=None, alias="X-Min-Updated-Ts"),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for polling reads: the read replica when configured and fresh
+    enough, otherwise the primary. Clients send the updated_ts of their last
+    write as X-Min-Updated-Ts to read it back.
+    """
+    router: ReadSessionRouter = request.app.state.read_router
+    async with router.session(min_updated_ts, request.path_params.get("workflow_id")) as session:
+        yield session
+
+
 def get_workflow_engine(request: Request) -> ContentWorkflow:
     return request.app.state.workflow_engine
 
 
 def get_cache(request: Request) -> RedisCache:
     return request.app.state.redis_cache
+
+
+def get_revision_tracker(request: Request) -> RevisionTracker:
+    return request.app.state.revision_tracker
+
+
+def get_event_bus(request: Request) -> WorkflowEventBus:
+    return request.app.state.event_bus
+
+
+def get_workflow_persistence(request: Request) -> WorkflowPersistence:
+    return request.app.state.workflow_persistence
+
+
+def get_job_queue(request: Request) -> WorkflowJobQueue | None:
+    """The background job queue, or None when workflows run inline."""
+    return request.app.state.job_queue
+
+
+def get_run_coordinator(request: Request) -> WorkflowRunCoordinator:
+    return request.app.state.run_coordinator
+
+
+async def get_idempotent_request(
+    request: Request,
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key", max_length=255),
+) -> AsyncGenerator[IdempotentRequest, None]:
+    # Scoped to method and path so a key cannot replay another route's response.
+    key = f"{request.method} {request.url.path}:{idempotency_key}" if idempotency_key else None
+    idempotent = IdempotentRequest(request.app.state.idempotency_store, key)
+    try:
+        yield idempotent
+    finally:
+        # No-op once the response was stored; frees the key if the handler failed.
+        await idempotent.abandon()
+
+
+def get_response_cache(request: Request) -> SerializedResponseCache | None:
+    """Serialized bodies of hot read endpoints, or None when the fast path is off."""
+    return request.app.state.response_cache
+
+
+def get_checkpoint_compactor(request: Request) -> CheckpointCompactor:
+    return request.app.state.checkpoint_compactor
+
+
+def get_workflow_archiver(request: Request) -> WorkflowArchiver:
+    return request.app.state.workflow_archiver
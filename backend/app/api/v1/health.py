@@ -1,4 +1,10 @@
-﻿from fastapi import APIRouter
+﻿from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_checkpoint_compactor, get_job_queue
+from app.services.checkpoint_compaction import CheckpointCompactor
+from app.services.job_queue import WorkflowJobQueue
 
 router = APIRouter()
 
@@ -6,3 +12,17 @@ router = APIRouter()
 @router.get("", summary="Health check")
 async def health_check() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@router.get("/queue", summary="Workflow job queue depth and wait times")
+async def queue_stats(job_queue: WorkflowJobQueue | None = Depends(get_job_queue)) -> dict[str, Any]:
+    if job_queue is None:
+        return {"mode": "inline"}
+    return await job_queue.stats()
+
+
+@router.get("/checkpoints", summary="LangGraph checkpoint database size and retention")
+async def checkpoint_stats(
+    compactor: CheckpointCompactor = Depends(get_checkpoint_compactor),
+) -> dict[str, Any]:
+    return await compactor.stats()
@@ -1,15 +1,65 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+import json
 import time
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, literal, or_, select, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.api.deps import get_db_session, get_workflow_engine, get_cache
-from app.models.database import WorkflowRecord
+from starlette.websockets import WebSocketState
+
+from app.api.deps import (
+    get_cache,
+    get_db_session,
+    get_event_bus,
+    get_idempotent_request,
+    get_job_queue,
+    get_read_session,
+    get_response_cache,
+    get_run_coordinator,
+    get_revision_tracker,
+    get_workflow_archiver,
+    get_workflow_engine,
+    get_workflow_persistence,
+)
+from app.core.logger import get_logger
+from app.models.database import SessionLocal, WorkflowArchiveRecord, WorkflowRecord
+from app.services.ab_timeline import build_ab_timeline, load_ab_timeline
+from app.services.archive import WorkflowArchiver
+from app.services.events import WorkflowEventBus
+from app.services.idempotency import IdempotentRequest
+from app.services.job_queue import WorkflowJobQueue
 from app.services.redis_client import RedisCache
+from app.services.response_cache import (
+    JSONBytesResponse,
+    SerializedResponseCache,
+    dumps,
+    merge_json_objects,
+)
+from app.services.revisions import RevisionTracker
+from app.services.run_coordinator import WorkflowRunCoordinator
+from app.services.workflow_persistence import (
+    WorkflowPersistence,
+    final_results,
+    list_cache_scope,
+    status_cache_entry,
+    status_cache_key,
+    to_status_response,
+)
+from app.services.workflow_transfer import export_ndjson, import_ndjson
 from app.agents.ab_test_orchestrator import ABTestOrchestratorAgent
 from app.models.state import (
     ContentWorkflowState,
@@ -19,54 +69,300 @@ from app.models.state import (
     WorkflowThumbnailSelectRequest,
     WorkflowSummaryResponse,
     WorkflowStartRequest,
+    WorkflowStatusBatchRequest,
+    WorkflowStatusBatchResponse,
     WorkflowStatusResponse,
 )
 from app.orchestration.workflow import ContentWorkflow
 
 router = APIRouter()
+logger = get_logger(__name__)
+
+# Comment frames keep idle SSE connections open through proxies.
+AB_STREAM_HEARTBEAT_SECONDS = 15.0
+# Documents the 202 answer of mutating routes in queued execution mode.
+QUEUED_RESPONSE = {202: {"model": WorkflowStatusResponse, "description": "Queued for a background worker"}}
+# Upper bound on workflow IDs a single dashboard socket may watch.
+MAX_WS_SUBSCRIPTIONS = 500
 
 
 @router.get("", response_model=list[WorkflowSummaryResponse])
 async def list_workflows(
+    response: Response,
     user_id: str | None = Query(default=None),
-    session: AsyncSession = Depends(get_db_session),
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = Query(default=None, description="Opaque cursor from X-Next-Cursor"),
+    session: AsyncSession = Depends(get_read_session),
     cache: RedisCache = Depends(get_cache),
+    response_cache: SerializedResponseCache | None = Depends(get_response_cache),
 ) -> list[WorkflowSummaryResponse]:
-    cache_key = f"workflows_list:{user_id or 'all'}"
-    cached = await cache.get(cache_key)
+    """
+    Newest-first workflow summaries, keyset-paginated on (updated_ts, id).
+
+    Archived workflows are listed with the live ones, flagged archived.
+    When more rows exist, the cursor for the next page is returned in the
+    X-Next-Cursor header so the body stays a plain list. A response without
+    the header is the last page; clients that need every workflow (the
+    dashboard) follow it until then.
+    """
+    scope = list_cache_scope(user_id)
+    generation = await cache.get_generation(scope)
+    # Unknown generation (no Redis, or an error): bypass the cache instead of risking pre-bump pages.
+    cache_key = f"{scope}:g{generation}:{limit}:{cursor or 'first'}" if generation is not None else None
+    fast_key = ("list", cache_key) if response_cache is not None and cache_key else None
+    if fast_key:
+        serialized = response_cache.get(fast_key)
+        if serialized is not None:
+            return _list_bytes_response(*serialized)
+
+    cached = await cache.get(cache_key) if cache_key else None
     if cached:
-        return cached
+        if response_cache is not None:
+            return _list_bytes_response(dumps(cached["items"]), cached["next_cursor"], fast_key, response_cache)
+        if cached["next_cursor"]:
+            response.headers["X-Next-Cursor"] = cached["next_cursor"]
+        return cached["items"]
+
+    after = _decode_cursor(cursor) if cursor else None
+    listing = union_all(
+        _summary_select(WorkflowRecord, user_id, after, archived=False),
+        _summary_select(WorkflowArchiveRecord, user_id, after, archived=True),
+    ).subquery()
+    statement = select(listing).order_by(listing.c.updated_ts.desc(), listing.c.id.desc())
+    rows = (await session.execute(statement.limit(limit + 1))).all()
+
+    items = [
+        {
+            "workflow_id": row.id,
+            "topic": row.topic,
+            "status": row.status,
+            "current_step": row.current_step,
+            "created_ts": row.created_ts,
+            "updated_ts": row.updated_ts,
+            "archived": bool(row.archived),
+        }
+        for row in rows[:limit]
+    ]
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = _encode_cursor(last.updated_ts, last.id)
+
+    if cache_key:
+        await cache.set(cache_key, {"items": items, "next_cursor": next_cursor}, ttl=60)
+    if response_cache is not None:
+        return _list_bytes_response(dumps(items), next_cursor, fast_key, response_cache)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+
+@router.get("/export")
+async def export_workflows(
+    user_id: str | None = Query(default=None),
+    include_archived: bool = Query(default=True),
+    persistence: WorkflowPersistence = Depends(get_workflow_persistence),
+) -> StreamingResponse:
+    """
+    Stream workflows as NDJSON: one line per workflow with its record fields,
+    full state, A/B metric samples and (once completed) the /results payload.
+    """
+    return StreamingResponse(
+        export_ndjson(persistence, user_id=user_id, include_archived=include_archived),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="workflows.ndjson"'},
+    )
+
 
-    statement = select(WorkflowRecord)
+@router.post("/import")
+async def import_workflows(
+    request: Request,
+    persistence: WorkflowPersistence = Depends(get_workflow_persistence),
+) -> dict:
+    """
+    Bulk-insert workflows from an NDJSON body in the /export format.
+
+    Existing workflow IDs are skipped; malformed lines are listed in errors.
+    A/B metric samples are restored, so imported tests keep their timeline.
+    """
+    return await import_ndjson(request.stream(), persistence)
+
+
+def _summary_select(
+    model: type[WorkflowRecord] | type[WorkflowArchiveRecord],
+    user_id: str | None,
+    after: tuple[int, str] | None,
+    archived: bool,
+):
+    """Summary columns of one list source, filtered before the union so each side keeps its indexes."""
+    statement = select(
+        model.id,
+        model.topic,
+        model.status,
+        model.current_step,
+        model.created_ts,
+        model.updated_ts,
+        literal(archived).label("archived"),
+    )
     if user_id:
-        statement = statement.where(WorkflowRecord.user_id == user_id)
-    statement = statement.order_by(WorkflowRecord.updated_ts.desc())
-    result = await session.execute(statement)
-    records = result.scalars().all()
-
-    response = [
-        WorkflowSummaryResponse(
-            workflow_id=record.id,
-            topic=record.topic,
-            status=record.status,
-            current_step=record.state_snapshot.get("current_step", "unknown"),
-            created_ts=record.created_ts,
-            updated_ts=record.updated_ts,
+        statement = statement.where(model.user_id == user_id)
+    if after:
+        after_ts, after_id = after
+        statement = statement.where(
+            or_(model.updated_ts < after_ts, and_(model.updated_ts == after_ts, model.id < after_id))
+        )
+    return statement
+
+
+def _list_bytes_response(
+    body: bytes,
+    next_cursor: str | None,
+    fast_key: tuple | None = None,
+    response_cache: SerializedResponseCache | None = None,
+) -> JSONBytesResponse:
+    if fast_key and response_cache is not None:
+        response_cache.put(fast_key, (body, next_cursor))
+    return JSONBytesResponse(body, headers={"X-Next-Cursor": next_cursor} if next_cursor else None)
+
+
+def _encode_cursor(updated_ts: int, workflow_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{updated_ts}:{workflow_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[int, str]:
+    try:
+        updated_ts, workflow_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":", 1)
+        return int(updated_ts), workflow_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.websocket("/ws")
+async def workflow_updates_socket(websocket: WebSocket) -> None:
+    """
+    One multiplexed channel per browser tab for dashboards watching many workflows.
+
+    Client messages: {"action": "subscribe" | "unsubscribe", "workflow_ids": [...]}.
+    Server messages: compact deltas (status, current_step, updated_ts, revision),
+    sent once on subscribe and then whenever a workflow change is committed.
+    """
+    await websocket.accept()
+    events: WorkflowEventBus = websocket.app.state.event_bus
+    subscription = events.subscribe()
+
+    async def forward_events() -> None:
+        while True:
+            event = await subscription.get()
+            await websocket.send_json(_workflow_delta(event))
+
+    async def receive_messages() -> None:
+        while True:
+            message = await websocket.receive_json()
+            action = message.get("action") if isinstance(message, dict) else None
+            workflow_ids = message.get("workflow_ids") if isinstance(message, dict) else None
+            if action not in ("subscribe", "unsubscribe") or not isinstance(workflow_ids, list):
+                await websocket.send_json({"type": "error", "detail": "Invalid message"})
+                continue
+
+            workflow_ids = [str(workflow_id) for workflow_id in workflow_ids]
+            if action == "unsubscribe":
+                subscription.discard(workflow_ids)
+                continue
+
+            new_ids = [wid for wid in workflow_ids if wid not in subscription.workflow_ids]
+            if len(subscription.workflow_ids) + len(new_ids) > MAX_WS_SUBSCRIPTIONS:
+                await websocket.send_json(
+                    {"type": "error", "detail": f"At most {MAX_WS_SUBSCRIPTIONS} workflows per connection"}
+                )
+                continue
+
+            subscription.add(new_ids)
+            for delta in await _current_deltas(new_ids):
+                await websocket.send_json(delta)
+
+    # Whichever side stops first (disconnect, failed send) ends the connection.
+    forwarder = asyncio.create_task(forward_events())
+    receiver = asyncio.create_task(receive_messages())
+    try:
+        await asyncio.wait({forwarder, receiver}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        subscription.close()
+        for task in (forwarder, receiver):
+            task.cancel()
+            task.add_done_callback(_log_socket_task_failure)
+        if websocket.client_state == WebSocketState.CONNECTED:
+            try:
+                await websocket.close()
+            except RuntimeError:
+                # The peer went away before the close frame.
+                pass
+
+
+def _log_socket_task_failure(task: asyncio.Task) -> None:
+    """Done-callback of the /ws tasks: retrieves their outcome and logs real failures."""
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None and not isinstance(exc, WebSocketDisconnect):
+        logger.warning("workflow_socket_failed", error=str(exc))
+
+
+async def _current_deltas(workflow_ids: list[str]) -> list[dict]:
+    """Initial state for newly subscribed workflows (live or archived), read in one summary-column query."""
+    if not workflow_ids:
+        return []
+
+    statement = union_all(
+        *(
+            select(model.id, model.revision, model.status, model.current_step, model.updated_ts).where(
+                model.id.in_(workflow_ids)
+            )
+            for model in (WorkflowRecord, WorkflowArchiveRecord)
+        )
+    )
+    async with SessionLocal() as session:
+        rows = (await session.execute(statement)).all()
+
+    return [
+        _workflow_delta(
+            {
+                "workflow_id": workflow_id,
+                "revision": revision,
+                "status": status,
+                "current_step": current_step,
+                "updated_ts": updated_ts,
+            }
         )
-        for record in records
+        for workflow_id, revision, status, current_step, updated_ts in rows
     ]
-    
-    await cache.set(cache_key, response, ttl=60)
-    return response
 
 
-@router.post("/start", response_model=WorkflowStatusResponse)
+def _workflow_delta(event: dict) -> dict:
+    return {
+        "type": "workflow_update",
+        "workflow_id": event["workflow_id"],
+        "revision": event["revision"],
+        "status": event["status"],
+        "current_step": event["current_step"],
+        "updated_ts": event["updated_ts"],
+    }
+
+
+@router.post("/start", response_model=WorkflowStatusResponse, responses=QUEUED_RESPONSE)
 async def start_workflow(
     payload: WorkflowStartRequest,
+    response: Response,
     session: AsyncSession = Depends(get_db_session),
     workflow_engine: ContentWorkflow = Depends(get_workflow_engine),
-    cache: RedisCache = Depends(get_cache),
+    persistence: WorkflowPersistence = Depends(get_workflow_persistence),
+    job_queue: WorkflowJobQueue | None = Depends(get_job_queue),
+    run_coordinator: WorkflowRunCoordinator = Depends(get_run_coordinator),
+    idempotent: IdempotentRequest = Depends(get_idempotent_request),
 ) -> WorkflowStatusResponse:
+    replay = await idempotent.begin(payload)
+    if replay is not None:
+        return replay
+
     workflow_id = str(uuid.uuid4())
     now = int(time.time())
 
@@ -98,57 +394,153 @@ async def start_workflow(
         "updated_ts": now,
     }
 
-    result = await workflow_engine.run(initial_state, thread_id=workflow_id)
-
     record = WorkflowRecord(
         id=workflow_id,
         user_id=payload.user_id,
         topic=payload.topic,
         target_platforms=payload.platforms,
-        status=_map_status(result["current_step"]),
-        state_snapshot=result,
         created_ts=now,
-        updated_ts=result["updated_ts"],
+        revision=0,
+    )
+    workflow_status = await _run_or_enqueue(
+        session,
+        record,
+        initial_state,
+        response,
+        workflow_engine,
+        persistence,
+        job_queue,
+        run_coordinator,
+        fingerprint="start",
     )
+    await idempotent.complete(response.status_code, workflow_status)
+    return workflow_status
+
+
+@router.post("/status:batch", response_model=WorkflowStatusBatchResponse)
+async def workflow_status_batch(
+    payload: WorkflowStatusBatchRequest,
+    session: AsyncSession = Depends(get_read_session),
+    cache: RedisCache = Depends(get_cache),
+    persistence: WorkflowPersistence = Depends(get_workflow_persistence),
+    archiver: WorkflowArchiver = Depends(get_workflow_archiver),
+) -> WorkflowStatusBatchResponse:
+    """
+    Status of many workflows in one round trip.
 
-    session.add(record)
-    await session.commit()
-    await cache.delete_pattern("workflows_list:*")
+    Served from the status cache with a single MGET; misses are loaded with
+    one WHERE id IN (...) query (then one on the archive) and written back
+    to the cache.
+    """
+    workflow_ids = list(dict.fromkeys(payload.workflow_ids))
+
+    cached = await cache.get_many_json([status_cache_key(wid) for wid in workflow_ids])
+    found: dict[str, dict] = {
+        wid: entry["status"] for wid, entry in zip(workflow_ids, cached) if entry is not None
+    }
 
-    return _to_response(result)
+    misses = [wid for wid in workflow_ids if wid not in found]
+    if misses:
+        statement = select(WorkflowRecord).where(WorkflowRecord.id.in_(misses))
+        records = (await session.execute(statement)).scalars().all()
+
+        states = await persistence.load_states(session, records)
+        fresh = {record.id: status_cache_entry(record, states[record.id]) for record in records}
+        archived = await archiver.load_many(session, [wid for wid in misses if wid not in fresh])
+        fresh.update({wid: status_cache_entry(item.record, item.state) for wid, item in archived.items()})
+        await cache.set_many_json_if_newer({status_cache_key(wid): entry for wid, entry in fresh.items()})
+        found.update({wid: entry["status"] for wid, entry in fresh.items()})
+
+    return WorkflowStatusBatchResponse(
+        workflows=[found[wid] for wid in workflow_ids if wid in found],
+        missing=[wid for wid in workflow_ids if wid not in found],
+    )
 
 
 @router.get("/{workflow_id}/status", response_model=WorkflowStatusResponse)
 async def workflow_status(
     workflow_id: str,
-    session: AsyncSession = Depends(get_db_session),
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_read_session),
+    cache: RedisCache = Depends(get_cache),
+    revisions: RevisionTracker = Depends(get_revision_tracker),
+    persistence: WorkflowPersistence = Depends(get_workflow_persistence),
+    archiver: WorkflowArchiver = Depends(get_workflow_archiver),
+    response_cache: SerializedResponseCache | None = Depends(get_response_cache),
 ) -> WorkflowStatusResponse:
+    not_modified = await _not_modified(request, workflow_id, revisions)
+    if not_modified:
+        return not_modified
+
+    if response_cache is not None:
+        revision = await revisions.get(workflow_id)
+        serialized = response_cache.get(("status", workflow_id, revision)) if revision is not None else None
+        if serialized is not None:
+            return JSONBytesResponse(serialized, headers=_etag_headers(workflow_id, revision))
+
+    cached = await cache.get_json(status_cache_key(workflow_id))
+    if cached:
+        return _status_body(response, response_cache, workflow_id, cached)
+
     statement = select(WorkflowRecord).where(WorkflowRecord.id == workflow_id)
     result = await session.execute(statement)
     record = result.scalar_one_or_none()
 
-    if not record:
-        raise HTTPException(status_code=404, detail="Workflow not found")
+    if record:
+        entry = status_cache_entry(record, await persistence.load_state(session, record))
+    else:
+        archived = await archiver.load(session, workflow_id)
+        if archived is None:
+            raise HTTPException(status_code=404, detail="Workflow not found")
+        entry = status_cache_entry(archived.record, archived.state)
+    # Both only advance, so a stale read (replica, lost race) cannot replace a newer save.
+    await cache.set_json_if_newer(status_cache_key(workflow_id), entry)
+    await revisions.set(workflow_id, entry["revision"])
+    return _status_body(response, response_cache, workflow_id, entry)
+
+
+def _status_body(
+    response: Response,
+    response_cache: SerializedResponseCache | None,
+    workflow_id: str,
+    entry: dict,
+) -> dict | JSONBytesResponse:
+    """Return a status cache entry, pre-serialized when the fast path is on."""
+    if response_cache is None:
+        _set_etag(response, workflow_id, entry["revision"])
+        return entry["status"]
 
-    return _to_response(record.state_snapshot)
+    serialized = dumps(entry["status"])
+    response_cache.put(("status", workflow_id, entry["revision"]), serialized)
+    return JSONBytesResponse(serialized, headers=_etag_headers(workflow_id, entry["revision"]))
 
 
-@router.post("/{workflow_id}/approve", response_model=WorkflowStatusResponse)
+@router.post("/{workflow_id}/approve", response_model=WorkflowStatusResponse, responses=QUEUED_RESPONSE)
 async def approve_workflow(
     workflow_id: str,
     payload: WorkflowApproveRequest,
+    response: Response,
     session: AsyncSession = Depends(get_db_session),
     workflow_engine: ContentWorkflow = Depends(get_workflow_engine),
-    cache: RedisCache = Depends(get_cache),
+    persistence: WorkflowPersistence = Depends(get_workflow_persistence),
+    archiver: WorkflowArchiver = Depends(get_workflow_archiver),
+    job_queue: WorkflowJobQueue | None = Depends(get_job_queue),
+    run_coordinator: WorkflowRunCoordinator = Depends(get_run_coordinator),
+    idempotent: IdempotentRequest = Depends(get_idempotent_request),
 ) -> WorkflowStatusResponse:
+    replay = await idempotent.begin(payload)
+    if replay is not None:
+        return replay
+
     statement = select(WorkflowRecord).where(WorkflowRecord.id == workflow_id)
     result = await session.execute(statement)
     record = result.scalar_one_or_none()
 
     if not record:
-        raise HTTPException(status_code=404, detail="Workflow not found")
+        raise await _missing_workflow(session, archiver, workflow_id)
 
-    state = record.state_snapshot
+    state = await persistence.load_state(session, record)
 
     if not state.get("script_variants"):
         raise HTTPException(status_code=400, detail="No scripts available for approval")
@@ -159,49 +551,65 @@ async def approve_workflow(
         if selected_id not in script_ids:
             raise HTTPException(status_code=400, detail="Invalid selected_script_id")
 
-        state["selected_script_id"] = selected_id
-        state["human_approval_status"]["scripts_approved"] = True
-        state["human_approval_status"]["scripts_rejected"] = False
-        state["selected_thumbnail_id"] = None
-        state["human_approval_status"]["thumbnails_approved"] = False
     else:
-        state["selected_script_id"] = None
-        state["human_approval_status"]["scripts_approved"] = False
-        state["human_approval_status"]["scripts_rejected"] = True
-        state["selected_thumbnail_id"] = None
-        state["human_approval_status"]["thumbnails_approved"] = False
-
-    state["updated_ts"] = int(time.time())
-
-    updated_state = await workflow_engine.run(state, thread_id=workflow_id)
-
-    record.status = _map_status(updated_state["current_step"])
-    record.state_snapshot = updated_state
-    record.updated_ts = updated_state["updated_ts"]
+        selected_id = None
 
-    session.add(record)
-    await session.commit()
-    await cache.delete_pattern("workflows_list:*")
-
-    return _to_response(updated_state)
+    # Only these keys are sent to the graph, which resumes at the script gate.
+    approved = payload.action == "approve"
+    delta = {
+        "selected_script_id": selected_id,
+        "selected_thumbnail_id": None,
+        "human_approval_status": {
+            **state["human_approval_status"],
+            "scripts_approved": approved,
+            "scripts_rejected": not approved,
+            "thumbnails_approved": False,
+        },
+        "updated_ts": int(time.time()),
+    }
+    state.update(delta)
+
+    workflow_status = await _run_or_enqueue(
+        session,
+        record,
+        state,
+        response,
+        workflow_engine,
+        persistence,
+        job_queue,
+        run_coordinator,
+        fingerprint=f"approve:{payload.action}:{state['selected_script_id']}",
+        delta=delta,
+    )
+    await idempotent.complete(response.status_code, workflow_status)
+    return workflow_status
 
 
-@router.post("/{workflow_id}/select-thumbnail", response_model=WorkflowStatusResponse)
+@router.post("/{workflow_id}/select-thumbnail", response_model=WorkflowStatusResponse, responses=QUEUED_RESPONSE)
 async def select_thumbnail(
     workflow_id: str,
     payload: WorkflowThumbnailSelectRequest,
+    response: Response,
     session: AsyncSession = Depends(get_db_session),
     workflow_engine: ContentWorkflow = Depends(get_workflow_engine),
-    cache: RedisCache = Depends(get_cache),
+    persistence: WorkflowPersistence = Depends(get_workflow_persistence),
+    archiver: WorkflowArchiver = Depends(get_workflow_archiver),
+    job_queue: WorkflowJobQueue | None = Depends(get_job_queue),
+    run_coordinator: WorkflowRunCoordinator = Depends(get_run_coordinator),
+    idempotent: IdempotentRequest = Depends(get_idempotent_request),
 ) -> WorkflowStatusResponse:
+    replay = await idempotent.begin(payload)
+    if replay is not None:
+        return replay
+
     statement = select(WorkflowRecord).where(WorkflowRecord.id == workflow_id)
     result = await session.execute(statement)
     record = result.scalar_one_or_none()
 
     if not record:
-        raise HTTPException(status_code=404, detail="Workflow not found")
+        raise await _missing_workflow(session, archiver, workflow_id)
 
-    state = record.state_snapshot
+    state = await persistence.load_state(session, record)
     thumbnails = state.get("thumbnail_variants", [])
     if not thumbnails:
         raise HTTPException(status_code=400, detail="No thumbnails available for selection")
@@ -210,87 +618,310 @@ async def select_thumbnail(
     if payload.selected_thumbnail_id not in thumbnail_ids:
         raise HTTPException(status_code=400, detail="Invalid selected_thumbnail_id")
 
-    state["selected_thumbnail_id"] = payload.selected_thumbnail_id
-    state["human_approval_status"]["thumbnails_approved"] = True
-    state["updated_ts"] = int(time.time())
+    delta = {
+        "selected_thumbnail_id": payload.selected_thumbnail_id,
+        "human_approval_status": {**state["human_approval_status"], "thumbnails_approved": True},
+        "updated_ts": int(time.time()),
+    }
+    state.update(delta)
+
+    workflow_status = await _run_or_enqueue(
+        session,
+        record,
+        state,
+        response,
+        workflow_engine,
+        persistence,
+        job_queue,
+        run_coordinator,
+        fingerprint=f"select-thumbnail:{payload.selected_thumbnail_id}",
+        delta=delta,
+    )
+    await idempotent.complete(response.status_code, workflow_status)
+    return workflow_status
+
+
+async def _run_or_enqueue(
+    session: AsyncSession,
+    record: WorkflowRecord,
+    state: ContentWorkflowState,
+    response: Response,
+    workflow_engine: ContentWorkflow,
+    persistence: WorkflowPersistence,
+    job_queue: WorkflowJobQueue | None,
+    coordinator: WorkflowRunCoordinator,
+    fingerprint: str,
+    delta: dict | None = None,
+) -> WorkflowStatusResponse:
+    """
+    Run the graph inside the request, or (queued mode) persist the pending
+    input, hand the workflow to a background worker and answer 202.
+
+    Inline runs go through the run coordinator: a concurrent request with the
+    same fingerprint (double click, client retry) reuses the run in flight,
+    and the save is a compare-and-swap on the revision the record was read at.
+    With a delta (a human action already applied to state), the graph
+    resumes from the gate it is paused at with only those keys.
+    """
+    if job_queue is not None:
+        state["current_step"] = "queued"
+        await persistence.save(session, record, state)
+        await job_queue.enqueue(record.id)
+        response.status_code = 202
+        return to_status_response(state)
 
-    updated_state = await workflow_engine.run(state, thread_id=workflow_id)
+    async def execute() -> ContentWorkflowState:
+        await persistence.ensure_current(record)
+        if delta is None:
+            updated_state = await workflow_engine.run(state, thread_id=record.id)
+        else:
+            updated_state = await workflow_engine.resume(record.id, delta, state)
+        await persistence.save(session, record, updated_state)
+        return updated_state
 
-    record.status = _map_status(updated_state["current_step"])
-    record.state_snapshot = updated_state
-    record.updated_ts = updated_state["updated_ts"]
+    async def load_latest() -> ContentWorkflowState:
+        await session.refresh(record)
+        return await persistence.load_state(session, record)
 
-    session.add(record)
-    await session.commit()
-    await cache.delete_pattern("workflows_list:*")
+    updated_state = await coordinator.run(record.id, fingerprint, execute, load_latest)
+    return to_status_response(updated_state)
 
-    return _to_response(updated_state)
 
+async def _missing_workflow(session: AsyncSession, archiver: WorkflowArchiver, workflow_id: str) -> HTTPException:
+    """Error for a workflow not in the hot table: 410 when archived (read-only), 404 when unknown."""
+    if await archiver.is_archived(session, workflow_id):
+        return HTTPException(status_code=410, detail="Workflow is archived and read-only")
+    return HTTPException(status_code=404, detail="Workflow not found")
 
-def _map_status(step: str) -> str:
-    if step == "completed":
-        return "completed"
-    if step == "awaiting_approval":
-        return "awaiting_approval"
-    if step == "awaiting_thumbnail_selection":
-        return "awaiting_thumbnail_selection"
-    if step in ["ab_testing", "ab_test_complete"]:
-        return "ab_testing"
-    return "running"
 
+def _etag(workflow_id: str, revision: int, weak: bool = False) -> str:
+    tag = f'"{workflow_id}-{revision}"'
+    return f"W/{tag}" if weak else tag
 
-def _to_response(state: dict) -> WorkflowStatusResponse:
-    step = state.get("current_step", "unknown")
-    if step == "awaiting_approval":
-        requires_action = "script_approval"
-    elif step == "awaiting_thumbnail_selection":
-        requires_action = "thumbnail_selection"
-    elif step in ["ab_testing", "ab_test_complete"]:
-        requires_action = "ab_test_monitoring"
-    else:
-        requires_action = None
-
-    return WorkflowStatusResponse(
-        workflow_id=state["workflow_id"],
-        status=_map_status(step),
-        current_step=step,
-        requires_action=requires_action,
-        scripts=state.get("script_variants", []),
-        selected_script_id=state.get("selected_script_id"),
-        thumbnails=state.get("thumbnail_variants", []),
-        selected_thumbnail_id=state.get("selected_thumbnail_id"),
-        token_usage=state.get("token_usage", {}),
-    )
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison as required for If-None-Match (RFC 9110 13.1.2)."""
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == bare for candidate in if_none_match.split(","))
+
+
+def _etag_headers(workflow_id: str, revision: int, weak: bool = False) -> dict[str, str]:
+    # Let browsers cache the body but always revalidate, so polls become 304s.
+    return {"ETag": _etag(workflow_id, revision, weak), "Cache-Control": "no-cache"}
+
+
+def _set_etag(response: Response, workflow_id: str, revision: int, weak: bool = False) -> None:
+    response.headers.update(_etag_headers(workflow_id, revision, weak))
+
+
+async def _not_modified(
+    request: Request,
+    workflow_id: str,
+    revisions: RevisionTracker,
+    weak: bool = False,
+) -> Response | None:
+    """Answer a conditional GET from the revision map without hitting the database."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+
+    revision = await revisions.get(workflow_id)
+    if revision is None:
+        return None
+
+    etag = _etag(workflow_id, revision, weak)
+    if not _etag_matches(if_none_match, etag):
+        return None
+
+    return Response(status_code=304, headers=_etag_headers(workflow_id, revision, weak))
 
 
 @router.get("/{workflow_id}/ab-status")
 async def get_ab_test_status(
     workflow_id: str,
-    session: AsyncSession = Depends(get_db_session),
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_read_session),
+    revisions: RevisionTracker = Depends(get_revision_tracker),
+    persistence: WorkflowPersistence = Depends(get_workflow_persistence),
+    archiver: WorkflowArchiver = Depends(get_workflow_archiver),
+    response_cache: SerializedResponseCache | None = Depends(get_response_cache),
 ) -> dict:
     """
     Get current A/B test metrics and statistics.
     Frontend polls this every 5-10 seconds during testing phase.
+    Archived workflows are read back from cold storage.
+
+    The ETag is weak: metrics only change with the revision, but the
+    elapsed/remaining time fields are derived from the clock.
     """
-    statement = select(WorkflowRecord).where(WorkflowRecord.id == workflow_id)
-    result = await session.execute(statement)
-    record = result.scalar_one_or_none()
+    not_modified = await _not_modified(request, workflow_id, revisions, weak=True)
+    if not_modified:
+        return not_modified
+
+    if response_cache is not None:
+        revision = await revisions.get(workflow_id)
+        cached = response_cache.get(("ab_status", workflow_id, revision)) if revision is not None else None
+        if cached is not None:
+            metrics_body, started_at, confidence = cached
+            return JSONBytesResponse(
+                merge_json_objects(metrics_body, _ab_status_clock(started_at, confidence)),
+                headers=_etag_headers(workflow_id, revision, weak=True),
+            )
+
+    revision, ab_test = await _load_ab_test(session, persistence, archiver, workflow_id)
+    await revisions.set(workflow_id, revision)
+    if response_cache is None:
+        _set_etag(response, workflow_id, revision, weak=True)
+        return _ab_status_payload(workflow_id, ab_test)
+
+    # Cache the revision-bound part; the clock fields are appended per request.
+    metrics_body = dumps(_ab_status_metrics(workflow_id, ab_test))
+    response_cache.put(
+        ("ab_status", workflow_id, revision),
+        (metrics_body, ab_test["started_at"], ab_test["confidence"]),
+    )
+    return JSONBytesResponse(
+        merge_json_objects(metrics_body, _ab_status_clock(ab_test["started_at"], ab_test["confidence"])),
+        headers=_etag_headers(workflow_id, revision, weak=True),
+    )
 
-    if not record:
-        raise HTTPException(status_code=404, detail="Workflow not found")
 
-    state = record.state_snapshot
+async def _load_ab_test(
+    session: AsyncSession,
+    persistence: WorkflowPersistence,
+    archiver: WorkflowArchiver,
+    workflow_id: str,
+) -> tuple[int, dict]:
+    """(revision, ab_test) of a live or archived workflow; 404 if unknown, 400 if no test started."""
+    statement = select(WorkflowRecord).where(WorkflowRecord.id == workflow_id)
+    record = (await session.execute(statement)).scalar_one_or_none()
 
-    if "ab_test" not in state or not state["ab_test"]:
+    if record:
+        revision, ab_test = record.revision, await persistence.load_ab_test(session, record)
+    else:
+        archived = await archiver.load(session, workflow_id)
+        if archived is None:
+            raise HTTPException(status_code=404, detail="Workflow not found")
+        revision, ab_test = archived.record.revision, archived.state.get("ab_test")
+
+    if not ab_test:
         raise HTTPException(status_code=400, detail="A/B test not started yet")
+    return revision, ab_test
 
-    ab_test = state["ab_test"]
 
-    # Calculate time remaining
-    elapsed = time.time() - ab_test["started_at"]
-    max_duration = 72 * 3600  # 72 hours in seconds
-    time_remaining = max(0, max_duration - elapsed)
+@router.get("/{workflow_id}/ab-timeline")
+async def get_ab_test_timeline(
+    workflow_id: str,
+    request: Request,
+    response: Response,
+    points: int = Query(default=200, ge=3, le=2000, description="Maximum samples per variant"),
+    session: AsyncSession = Depends(get_read_session),
+    revisions: RevisionTracker = Depends(get_revision_tracker),
+    archiver: WorkflowArchiver = Depends(get_workflow_archiver),
+) -> dict:
+    """
+    CTR history of every variant, downsampled server-side (LTTB) to at most
+    `points` samples per variant so long tests stay cheap to chart.
+    Archived workflows are charted from their archived samples.
+    """
+    not_modified = await _not_modified(request, workflow_id, revisions)
+    if not_modified:
+        return not_modified
+
+    statement = select(WorkflowRecord.revision).where(WorkflowRecord.id == workflow_id)
+    revision = (await session.execute(statement)).scalar_one_or_none()
+    if revision is not None:
+        series = await load_ab_timeline(session, workflow_id, points)
+    else:
+        archived = await archiver.load(session, workflow_id)
+        if archived is None:
+            raise HTTPException(status_code=404, detail="Workflow not found")
+        revision, series = archived.record.revision, build_ab_timeline(archived.ab_samples, points)
+    await revisions.set(workflow_id, revision)
+    _set_etag(response, workflow_id, revision)
+    return {"workflow_id": workflow_id, "points": points, "series": series}
+
+
+@router.get("/{workflow_id}/ab-stream")
+async def stream_ab_test_status(
+    workflow_id: str,
+    request: Request,
+    session: AsyncSession = Depends(get_db_session),
+    persistence: WorkflowPersistence = Depends(get_workflow_persistence),
+    archiver: WorkflowArchiver = Depends(get_workflow_archiver),
+    events: WorkflowEventBus = Depends(get_event_bus),
+) -> StreamingResponse:
+    """
+    Server-Sent Events stream of A/B test metrics.
+
+    Sends the current payload immediately, then a new one only when a check
+    produces new metrics or a winner. The stream ends once the test stops,
+    so an archived workflow gets its final payload only.
+    """
+    # Subscribe before reading, so a check committed in between is still delivered.
+    subscription = events.subscribe([workflow_id])
+    try:
+        revision, ab_test = await _load_ab_test(session, persistence, archiver, workflow_id)
+    except BaseException:
+        subscription.close()
+        raise
+
+    # Release the connection now; the stream can stay open for hours.
+    await session.close()
+
+    async def event_stream():
+        try:
+            payload = _ab_status_payload(workflow_id, ab_test)
+            yield _sse_message(payload, event_id=revision)
+            last_marker = _ab_test_marker(ab_test)
+
+            while payload["is_running"]:
+                event = await subscription.get(timeout=AB_STREAM_HEARTBEAT_SECONDS)
+                if await request.is_disconnected():
+                    break
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                # Events queued before the read may be older than what was just sent.
+                latest = event.get("ab_test")
+                if not latest or event["revision"] <= revision or _ab_test_marker(latest) == last_marker:
+                    continue
+
+                last_marker = _ab_test_marker(latest)
+                payload = _ab_status_payload(workflow_id, latest)
+                yield _sse_message(payload, event_id=event["revision"])
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
+
+def _ab_test_marker(ab_test: dict) -> tuple:
+    """Identifies a distinct A/B check result; unchanged markers are not re-sent."""
+    return (ab_test.get("check_count", 0), ab_test.get("status"), ab_test.get("winner_id"))
+
+
+def _sse_message(payload: dict, event_id: int) -> str:
+    return f"id: {event_id}\nevent: ab_test\ndata: {json.dumps(payload)}\n\n"
+
+
+def _ab_status_payload(workflow_id: str, ab_test: dict) -> dict:
+    return {
+        **_ab_status_metrics(workflow_id, ab_test),
+        **_ab_status_clock(ab_test["started_at"], ab_test["confidence"]),
+    }
+
+
+def _ab_status_metrics(workflow_id: str, ab_test: dict) -> dict:
+    """Fields that only change with the workflow revision."""
     return {
         "workflow_id": workflow_id,
         "status": ab_test["status"],  # running, completed, timeout, manual_override
@@ -299,20 +930,37 @@ async def get_ab_test_status(
         "current_confidence": ab_test["confidence"],
         "total_impressions": ab_test["total_impressions"],
         "winner_id": ab_test.get("winner_id"),
+        "checks_completed": ab_test.get("check_count", 0),
+    }
+
+
+def _ab_status_clock(started_at: float, confidence: float) -> dict:
+    """Fields derived from the wall clock."""
+    # Calculate time remaining
+    elapsed = time.time() - started_at
+    max_duration = 72 * 3600  # 72 hours in seconds
+    time_remaining = max(0, max_duration - elapsed)
+
+    return {
         "elapsed_time_seconds": int(elapsed),
         "estimated_time_remaining": int(time_remaining),
-        "checks_completed": ab_test.get("check_count", 0),
-        "can_declare_early": ab_test["confidence"] > 0.90 or elapsed > 3600,  # 1 hour minimum
+        "can_declare_early": confidence > 0.90 or elapsed > 3600,  # 1 hour minimum
     }
 
 
+def _ab_decision(state: ContentWorkflowState) -> dict:
+    """The keys force_winner() changes, sent as the resume delta."""
+    return {key: state.get(key) for key in ("ab_test", "current_step", "updated_ts")}
+
+
 @router.post("/{workflow_id}/declare-winner", response_model=WorkflowStatusResponse)
 async def declare_winner_manually(
     workflow_id: str,
     request: DeclareWinnerRequest,
     session: AsyncSession = Depends(get_db_session),
     workflow_engine: ContentWorkflow = Depends(get_workflow_engine),
-    cache: RedisCache = Depends(get_cache),
+    persistence: WorkflowPersistence = Depends(get_workflow_persistence),
+    archiver: WorkflowArchiver = Depends(get_workflow_archiver),
 ) -> WorkflowStatusResponse:
     """
     Manual override to declare a winner before statistical significance.
@@ -323,9 +971,9 @@ async def declare_winner_manually(
     record = result.scalar_one_or_none()
 
     if not record:
-        raise HTTPException(status_code=404, detail="Workflow not found")
+        raise await _missing_workflow(session, archiver, workflow_id)
 
-    state = record.state_snapshot
+    state = await persistence.load_state(session, record)
 
     # Validate thumbnail_id exists in variants
     valid_ids = {v["id"] for v in state.get("thumbnail_variants", [])}
@@ -337,18 +985,12 @@ async def declare_winner_manually(
     new_state = await agent.force_winner(state, request.thumbnail_id)
     new_state["updated_ts"] = int(time.time())
 
-    # Resume workflow to completion
-    updated_state = await workflow_engine.run(new_state, thread_id=workflow_id)
-
-    record.status = _map_status(updated_state["current_step"])
-    record.state_snapshot = updated_state
-    record.updated_ts = updated_state["updated_ts"]
+    # Resume workflow to completion from the A/B gate
+    updated_state = await workflow_engine.resume(workflow_id, _ab_decision(new_state), new_state)
 
-    session.add(record)
-    await session.commit()
-    await cache.delete_pattern("workflows_list:*")
+    await persistence.save(session, record, updated_state)
 
-    return _to_response(updated_state)
+    return to_status_response(updated_state)
 
 
 @router.post("/{workflow_id}/stop-test", response_model=WorkflowStatusResponse)
@@ -357,7 +999,8 @@ async def stop_ab_test(
     request: StopTestRequest,
     session: AsyncSession = Depends(get_db_session),
     workflow_engine: ContentWorkflow = Depends(get_workflow_engine),
-    cache: RedisCache = Depends(get_cache),
+    persistence: WorkflowPersistence = Depends(get_workflow_persistence),
+    archiver: WorkflowArchiver = Depends(get_workflow_archiver),
 ) -> WorkflowStatusResponse:
     """
     Stop A/B test early without declaring winner (inconclusive).
@@ -368,9 +1011,9 @@ async def stop_ab_test(
     record = result.scalar_one_or_none()
 
     if not record:
-        raise HTTPException(status_code=404, detail="Workflow not found")
+        raise await _missing_workflow(session, archiver, workflow_id)
 
-    state = record.state_snapshot
+    state = await persistence.load_state(session, record)
     ab_test = state.get("ab_test", {})
 
     if ab_test.get("status") != "running":
@@ -385,17 +1028,11 @@ async def stop_ab_test(
         new_state = await agent.force_winner(state, best["thumbnail_id"])
         new_state["updated_ts"] = int(time.time())
 
-        updated_state = await workflow_engine.run(new_state, thread_id=workflow_id)
-
-        record.status = _map_status(updated_state["current_step"])
-        record.state_snapshot = updated_state
-        record.updated_ts = updated_state["updated_ts"]
+        updated_state = await workflow_engine.resume(workflow_id, _ab_decision(new_state), new_state)
 
-        session.add(record)
-        await session.commit()
-        await cache.delete_pattern("workflows_list:*")
+        await persistence.save(session, record, updated_state)
 
-        return _to_response(updated_state)
+        return to_status_response(updated_state)
 
     raise HTTPException(status_code=400, detail="No variants to evaluate")
 
@@ -403,61 +1040,28 @@ async def stop_ab_test(
 @router.get("/{workflow_id}/results")
 async def get_final_results(
     workflow_id: str,
-    session: AsyncSession = Depends(get_db_session),
+    session: AsyncSession = Depends(get_read_session),
+    persistence: WorkflowPersistence = Depends(get_workflow_persistence),
+    archiver: WorkflowArchiver = Depends(get_workflow_archiver),
 ) -> dict:
     """
     Get complete results after workflow completion.
     Includes winning script, winning thumbnail, and A/B test statistics.
+    Archived workflows are read back from cold storage.
     """
     statement = select(WorkflowRecord).where(WorkflowRecord.id == workflow_id)
     result = await session.execute(statement)
     record = result.scalar_one_or_none()
 
-    if not record:
-        raise HTTPException(status_code=404, detail="Workflow not found")
-
-    state = record.state_snapshot
+    if record:
+        state = await persistence.load_state(session, record)
+    else:
+        archived = await archiver.load(session, workflow_id)
+        if archived is None:
+            raise HTTPException(status_code=404, detail="Workflow not found")
+        state = archived.state
 
     if state["current_step"] != "completed":
         raise HTTPException(status_code=400, detail="Workflow not completed yet")
 
-    # Find winning script
-    scripts = state.get("script_variants", [])
-    winning_script = next(
-        (s for s in scripts if s["id"] == state.get("selected_script_id")),
-        None,
-    )
-
-    # Find winning thumbnail
-    thumbnails = state.get("thumbnail_variants", [])
-    winning_thumb = next(
-        (t for t in thumbnails if t["id"] == state.get("selected_thumbnail_id")),
-        None,
-    )
-
-    ab_stats = state.get("ab_test", {})
-    final_stats = ab_stats.get("final_stats", {})
-
-    return {
-        "workflow_id": workflow_id,
-        "topic": state["topic"],
-        "status": "completed",
-        "winning_content": {
-            "script": winning_script,
-            "thumbnail": winning_thumb,
-            "combined_ctr": final_stats.get("treatment_ctr")
-            or (
-                max(ab_stats.get("variants", []), key=lambda x: x["ctr"], default={}).get("ctr")
-                if ab_stats.get("variants")
-                else None
-            ),
-        },
-        "ab_test_summary": {
-            "duration_hours": (ab_stats.get("last_updated", 0) - ab_stats.get("started_at", 0))
-            / 3600,
-            "total_impressions": ab_stats.get("total_impressions"),
-            "confidence_reached": ab_stats.get("confidence", 0),
-            "was_manual_override": ab_stats.get("status") == "manual_override",
-        },
-        "export_ready": True,
-    }
+    return final_results(state)
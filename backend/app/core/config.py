@@ -39,18 +39,69 @@ class Settings(BaseSettings):
         default="sqlite+aiosqlite:///./data/checkpoints.db",
         validation_alias=AliasChoices("CHECKPOINT_DB_URL", "CHECKPOINT_DB"),
     )
+    # Optional read replica for polling GETs; empty = everything reads the primary.
+    database_read_url: str = Field(default="", alias="DATABASE_READ_URL")
+    # How long a replica freshness probe (MAX(updated_ts)) is reused.
+    database_read_watermark_seconds: float = Field(default=1.0, alias="DATABASE_READ_WATERMARK_SECONDS")
+    # SQLite only. development: a fresh connection per session, default pragmas.
+    # production: small persistent pool, WAL, synchronous=NORMAL, mmap, busy_timeout.
+    sqlite_profile: str = Field(default="development", alias="SQLITE_PROFILE")
+    sqlite_pool_size: int = Field(default=5, alias="SQLITE_POOL_SIZE")
+    sqlite_busy_timeout_ms: int = Field(default=5000, alias="SQLITE_BUSY_TIMEOUT_MS")
+    sqlite_mmap_size_mb: int = Field(default=256, alias="SQLITE_MMAP_SIZE_MB")
     allowed_origins: str = Field(default="http://localhost:5173,http://localhost:3000", alias="ALLOWED_ORIGINS")
 
     # Thumbnail generation
     pollinations_base_url: str = Field(default="https://image.pollinations.ai/prompt", alias="POLLINATIONS_BASE_URL")
     thumbnail_width: int = Field(default=1280, alias="THUMBNAIL_WIDTH")
     thumbnail_height: int = Field(default=720, alias="THUMBNAIL_HEIGHT")
+    # While scripts await approval, prepare and pre-render the thumbnails of every
+    # script variant in the background; approval reuses the chosen script's set.
+    speculative_thumbnails: bool = Field(default=False, alias="SPECULATIVE_THUMBNAILS")
+    # Cost cap: image renders speculation may trigger per hour, shared via Redis when enabled.
+    speculative_thumbnail_renders_per_hour: int = Field(default=300, alias="SPECULATIVE_THUMBNAIL_RENDERS_PER_HOUR")
+    speculative_thumbnail_concurrency: int = Field(default=4, alias="SPECULATIVE_THUMBNAIL_CONCURRENCY")
+    speculative_thumbnail_ttl_seconds: int = Field(default=3600, alias="SPECULATIVE_THUMBNAIL_TTL_SECONDS")
 
     # Redis configuration
     redis_url: str = Field(default="redis://localhost:6379/0", alias="REDIS_URL")
     cache_ttl_seconds: int = Field(default=300, alias="CACHE_TTL_SECONDS")  # 5 minutes default
     enable_cache: bool = Field(default=True, alias="ENABLE_CACHE")
 
+    # Workflow execution: "inline" runs the graph inside the request,
+    # "queued" returns 202 and runs it on background workers.
+    workflow_execution_mode: str = Field(default="inline", alias="WORKFLOW_EXECUTION_MODE")
+    workflow_queue_backend: str = Field(default="memory", alias="WORKFLOW_QUEUE_BACKEND")  # memory, redis
+    workflow_worker_concurrency: int = Field(default=4, alias="WORKFLOW_WORKER_CONCURRENCY")
+    # Per-workflow run lease; heartbeated while the run lasts, lapses this long after a crash.
+    workflow_lease_ttl_seconds: float = Field(default=60.0, alias="WORKFLOW_LEASE_TTL_SECONDS")
+    # Queued mode with the redis backend: each workflow's jobs run on the worker owning its lease.
+    workflow_ownership: bool = Field(default=False, alias="WORKFLOW_OWNERSHIP")
+    # Ownership and worker heartbeat leases; a crashed worker's workflows are taken over after this.
+    workflow_ownership_ttl_seconds: float = Field(default=30.0, alias="WORKFLOW_OWNERSHIP_TTL_SECONDS")
+    # How long an Idempotency-Key replays its stored response.
+    idempotency_ttl_seconds: int = Field(default=86400, alias="IDEMPOTENCY_TTL_SECONDS")
+    # Seconds between deletions of expired Idempotency-Key rows (0 disables).
+    idempotency_purge_interval_seconds: float = Field(default=3600.0, alias="IDEMPOTENCY_PURGE_INTERVAL_SECONDS")
+    # Serve /status, /ab-status and listings as cached orjson bytes per revision.
+    fast_json_responses: bool = Field(default=False, alias="FAST_JSON_RESPONSES")
+    # Checkpoints kept per LangGraph thread; completed workflows keep only their last one.
+    checkpoint_keep_last: int = Field(default=20, alias="CHECKPOINT_KEEP_LAST")
+    # Seconds between background compaction passes of checkpoints.db (0 disables them).
+    checkpoint_compaction_interval_seconds: float = Field(default=3600.0, alias="CHECKPOINT_COMPACTION_INTERVAL_SECONDS")
+    # Free pages returned to the filesystem per pass (PRAGMA incremental_vacuum), once the file
+    # was switched to auto_vacuum=INCREMENTAL by scripts/enable_checkpoint_vacuum.py.
+    checkpoint_vacuum_pages: int = Field(default=2000, alias="CHECKPOINT_VACUUM_PAGES")
+    # Completed workflows older than this move to the compressed archive table (0, the default,
+    # disables). Archived workflows stay readable and listed; mutating endpoints answer 410.
+    workflow_archive_after_days: float = Field(default=0.0, alias="WORKFLOW_ARCHIVE_AFTER_DAYS")
+    workflow_archive_interval_seconds: float = Field(default=3600.0, alias="WORKFLOW_ARCHIVE_INTERVAL_SECONDS")
+    # Seconds between background ticks that check all running A/B tests in one batch (0 disables).
+    ab_tick_interval_seconds: float = Field(default=30.0, alias="AB_TICK_INTERVAL_SECONDS")
+    # json: whole state in workflows.state_snapshot; normalized: variants in their own tables;
+    # checkpoint: the LangGraph checkpoint is the state, workflows rows are a thin index
+    workflow_state_storage: str = Field(default="json", alias="WORKFLOW_STATE_STORAGE")
+
     # Security
     secret_key: str = Field(default="change-this-in-production", alias="SECRET_KEY")
     access_token_expire_minutes: int = Field(default=10080, alias="ACCESS_TOKEN_EXPIRE_MINUTES")  # 7 days
@@ -84,6 +135,25 @@ class Settings(BaseSettings):
             return normalized
         return "ollama"
 
+    @field_validator(
+        "workflow_execution_mode",
+        "workflow_queue_backend",
+        "workflow_state_storage",
+        "sqlite_profile",
+        mode="before",
+    )
+    @classmethod
+    def _normalize_choice(cls, value):
+        return str(value).strip().lower() if value is not None else value
+
+    @property
+    def queued_execution(self) -> bool:
+        return self.workflow_execution_mode == "queued"
+
+    @property
+    def sqlite_tuned(self) -> bool:
+        return self.sqlite_profile == "production"
+
     @property
     def cors_list(self):
         return [origin.strip() for origin in self.allowed_origins.split(",")]
@@ -0,0 +1,86 @@
+import functools
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+
+node_duration_seconds = metrics.histogram(
+    "workflow_node_duration_seconds", "Wall time of one StateGraph node, by node and outcome"
+)
+node_errors = metrics.counter("workflow_node_errors_total", "StateGraph nodes that raised, by node and exception type")
+fallbacks = metrics.counter("workflow_fallbacks_total", "Degraded paths taken (mock data, fallback scripts), by node and path")
+external_call_seconds = metrics.histogram(
+    "external_call_duration_seconds", "Wall time of calls to external APIs and LLMs, by service and outcome"
+)
+checkpoint_io_seconds = metrics.histogram(
+    "workflow_checkpoint_io_seconds", "Wall time of LangGraph checkpointer reads and writes, by operation"
+)
+
+_current_node: ContextVar[str] = ContextVar("workflow_node", default="none")
+
+# Checkpointer coroutines timed by instrument_checkpointer.
+CHECKPOINT_OPERATIONS = ("aget_tuple", "aput")
+
+
+def instrument_node(name: str, node: Callable[[T], Awaitable[T]]) -> Callable[[T], Awaitable[T]]:
+    """Wrap a graph node so its latency, errors and fallbacks are recorded under name."""
+
+    @functools.wraps(node)
+    async def wrapper(state: T) -> T:
+        token = _current_node.set(name)
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            return await node(state)
+        except Exception as exc:
+            outcome = "error"
+            node_errors.inc(node=name, error=type(exc).__name__)
+            raise
+        finally:
+            node_duration_seconds.observe(time.perf_counter() - started, node=name, outcome=outcome)
+            _current_node.reset(token)
+
+    return wrapper
+
+
+def record_fallback(path: str) -> None:
+    """Count a degraded path (e.g. mock_trend_source) against the node currently running."""
+    fallbacks.inc(node=_current_node.get(), path=path)
+
+
+@contextmanager
+def external_call(service: str) -> Iterator[None]:
+    """Time an external API or LLM call made in the with-block, labelled by service and outcome."""
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        external_call_seconds.observe(time.perf_counter() - started, service=service, outcome=outcome)
+
+
+def instrument_checkpointer(checkpointer: Any) -> Any:
+    """Time the checkpointer's async reads and writes in place; returns it for chaining."""
+    for operation in CHECKPOINT_OPERATIONS:
+        method = getattr(checkpointer, operation, None)
+        if method is None:
+            continue
+        setattr(checkpointer, operation, _timed_checkpoint(operation, method))
+    return checkpointer
+
+
+def _timed_checkpoint(operation: str, method: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    @functools.wraps(method)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with checkpoint_io_seconds.time(operation=operation):
+            return await method(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,227 @@
+import bisect
+import math
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._lock = threading.Lock()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, description: str):
+        super().__init__(name, description)
+        self._values: dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> dict[LabelKey, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str):
+        super().__init__(name, description)
+        self._values: dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> dict[LabelKey, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class _HistogramSeries:
+    __slots__ = ("bucket_counts", "count", "total", "maximum")
+
+    def __init__(self, size: int):
+        self.bucket_counts = [0] * size
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, description)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[LabelKey, _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets))
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series.bucket_counts[index] += 1
+            series.count += 1
+            series.total += value
+            series.maximum = max(series.maximum, value)
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the wall time of the with-block, also when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def summary(self, **labels: Any) -> dict[str, float]:
+        series = self._series.get(_label_key(labels))
+        if series is None or series.count == 0:
+            return {"count": 0, "sum": 0.0, "avg": 0.0, "max": 0.0}
+        return {
+            "count": series.count,
+            "sum": round(series.total, 6),
+            "avg": round(series.total / series.count, 6),
+            "max": round(series.maximum, 6),
+        }
+
+    def samples(self) -> dict[LabelKey, _HistogramSeries]:
+        with self._lock:
+            return dict(self._series)
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics registry (counters, gauges, histograms).
+
+    Metrics are created on first use and shared process-wide, so services
+    can record without threading a registry through constructors.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: type[_Metric], name: str, description: str, **kwargs: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, description, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        return self._get_or_create(Counter, name, description)
+
+    def gauge(self, name: str, description: str = "") -> Gauge:
+        return self._get_or_create(Gauge, name, description)
+
+    def histogram(
+        self,
+        name: str,
+        description: str = "",
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, description, buckets=buckets)
+
+    def collect(self) -> list[_Metric]:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def snapshot(self) -> dict[str, Any]:
+        """JSON-friendly view of every metric and label set."""
+        result: dict[str, Any] = {}
+        for metric in self.collect():
+            entries = []
+            for key, value in metric.samples().items():
+                labels = dict(key)
+                if isinstance(metric, Histogram):
+                    entries.append({"labels": labels, **metric.summary(**labels)})
+                else:
+                    entries.append({"labels": labels, "value": value})
+            result[metric.name] = {"type": metric.kind, "description": metric.description, "samples": entries}
+        return result
+
+    def render_prometheus(self) -> str:
+        """Every metric in the Prometheus text exposition format (0.0.4)."""
+        lines: list[str] = []
+        for metric in sorted(self.collect(), key=lambda item: item.name):
+            if metric.description:
+                lines.append(f"# HELP {metric.name} {_escape_help(metric.description)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for key, value in sorted(metric.samples().items()):
+                if isinstance(metric, Histogram):
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets, value.bucket_counts):
+                        cumulative += count
+                        bucket_key = key + (("le", _format_value(bound)),)
+                        lines.append(f"{metric.name}_bucket{_format_labels(bucket_key)} {cumulative}")
+                    lines.append(f"{metric.name}_bucket{_format_labels(key + (('le', '+Inf'),))} {value.count}")
+                    lines.append(f"{metric.name}_sum{_format_labels(key)} {_format_value(value.total)}")
+                    lines.append(f"{metric.name}_count{_format_labels(key)} {value.count}")
+                else:
+                    lines.append(f"{metric.name}{_format_labels(key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in key) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,48 @@
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import Settings
+
+# Page cache per connection, in KiB (negative values are KiB for SQLite).
+CACHE_SIZE_KIB = 16384
+
+
+def sqlite_pragmas(settings: Settings) -> list[str]:
+    """
+    PRAGMAs of the production SQLite profile, run on every new connection.
+
+    WAL lets readers proceed while one writer commits; synchronous=NORMAL is
+    durable across application crashes under WAL (only an OS crash can lose
+    the last commits) and avoids an fsync per transaction; busy_timeout makes
+    a writer wait for the lock instead of failing with "database is locked".
+    """
+    return [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}",
+        f"PRAGMA mmap_size={settings.sqlite_mmap_size_mb * 1024 * 1024}",
+        f"PRAGMA cache_size=-{CACHE_SIZE_KIB}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+
+def install_sqlite_pragmas(sync_engine: Engine, pragmas: list[str]) -> None:
+    """Run pragmas on each DBAPI connection the engine's pool opens."""
+
+    @event.listens_for(sync_engine, "connect")
+    def _apply(dbapi_connection: Any, _connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+async def apply_sqlite_pragmas(connection: Any, pragmas: list[str]) -> None:
+    """Same pragmas on a raw aiosqlite connection (the LangGraph checkpointer)."""
+    for pragma in pragmas:
+        await connection.execute(pragma)
+    await connection.commit()
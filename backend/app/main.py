@@ -1,14 +1,30 @@
 ﻿from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
+from app.api.metrics import router as metrics_router
 from app.api.v1 import api_router
 from app.core.config import get_settings
 from app.core.logger import configure_logging, get_logger
-from app.models.database import init_db
+from app.models.database import ReadSessionLocal, close_db, engine as database_engine, init_db
 from app.orchestration.workflow import ContentWorkflow
+from app.services.ab_ticker import ABTestTicker
+from app.services.archive import WorkflowArchiver
+from app.services.checkpoint_compaction import CheckpointCompactor
+from app.services.events import WorkflowEventBus
+from app.services.idempotency import IdempotencyError, IdempotencyStore
+from app.services.job_queue import JOBS_QUEUE_KEY, WorkflowJobQueue
+from app.services.run_coordinator import WorkflowBusyError, WorkflowRunCoordinator
 from app.services.redis_client import close_redis_cache, get_redis_cache
+from app.services.response_cache import SerializedResponseCache
+from app.services.read_routing import ReadSessionRouter
+from app.services.revisions import RevisionTracker
+from app.services.state_store import CheckpointStateStore, WorkflowStateStore
+from app.services.thumbnail_speculation import ThumbnailSpeculator
+from app.services.workflow_ownership import WorkflowOwnership
+from app.services.workflow_persistence import WorkflowConflictError, WorkflowPersistence
 
 
 @asynccontextmanager
@@ -26,17 +42,134 @@ async def lifespan(app: FastAPI):
     # Initialize Redis cache
     redis_cache = await get_redis_cache()
     app.state.redis_cache = redis_cache
+    app.state.revision_tracker = RevisionTracker(redis_cache)
+    app.state.response_cache = SerializedResponseCache() if settings.fast_json_responses else None
+    # Polling GETs read from DATABASE_READ_URL when set; writes stay on the primary
+    app.state.read_router = ReadSessionRouter(
+        ReadSessionLocal,
+        app.state.revision_tracker,
+        watermark_seconds=settings.database_read_watermark_seconds,
+    )
+
+    # Live change notifications for SSE/WebSocket clients
+    event_bus = WorkflowEventBus(redis_cache)
+    await event_bus.start()
+    app.state.event_bus = event_bus
 
     # Initialize workflow engine
     workflow_engine = ContentWorkflow()
     await workflow_engine.initialize()
     app.state.workflow_engine = workflow_engine
 
+    # Thumbnails for every script variant are prepared while approval is pending
+    thumbnail_speculator = None
+    if settings.speculative_thumbnails:
+        thumbnail_speculator = ThumbnailSpeculator(
+            workflow_engine.visual_engineer,
+            redis_cache,
+            renders_per_hour=settings.speculative_thumbnail_renders_per_hour,
+            concurrency=settings.speculative_thumbnail_concurrency,
+            ttl_seconds=settings.speculative_thumbnail_ttl_seconds,
+        )
+        workflow_engine.thumbnail_speculator = thumbnail_speculator
+
+    # Retention and vacuum of checkpoints.db (CHECKPOINT_KEEP_LAST, CHECKPOINT_COMPACTION_*)
+    checkpoint_compactor = CheckpointCompactor(
+        workflow_engine,
+        keep_last=settings.checkpoint_keep_last,
+        interval_seconds=settings.checkpoint_compaction_interval_seconds,
+        vacuum_pages=settings.checkpoint_vacuum_pages,
+    )
+    await checkpoint_compactor.start()
+    app.state.checkpoint_compactor = checkpoint_compactor
+
+    if settings.workflow_state_storage == "checkpoint":
+        state_store = CheckpointStateStore(workflow_engine)
+    else:
+        state_store = WorkflowStateStore(
+            settings.workflow_state_storage,
+            jsonb_patches=database_engine.dialect.name == "postgresql",
+        )
+    app.state.workflow_persistence = WorkflowPersistence(
+        redis_cache,
+        app.state.revision_tracker,
+        event_bus,
+        state_store,
+    )
+
+    # Moves old completed workflows to cold storage; reads rehydrate them on demand
+    archiver = WorkflowArchiver(
+        app.state.workflow_persistence,
+        max_age_seconds=settings.workflow_archive_after_days * 86400,
+        interval_seconds=settings.workflow_archive_interval_seconds,
+    )
+    await archiver.start()
+    app.state.workflow_archiver = archiver
+
+    # Checks every running A/B test each tick, so metrics move without client requests
+    ab_ticker = ABTestTicker(
+        app.state.workflow_persistence,
+        workflow_engine,
+        interval_seconds=settings.ab_tick_interval_seconds,
+        cache=redis_cache,
+    )
+    await ab_ticker.start()
+    app.state.ab_ticker = ab_ticker
+
+    # Purges expired keys at startup and then every purge interval
+    idempotency_store = IdempotencyStore(
+        redis_cache,
+        ttl_seconds=settings.idempotency_ttl_seconds,
+        purge_interval_seconds=settings.idempotency_purge_interval_seconds,
+    )
+    await idempotency_store.start()
+    app.state.idempotency_store = idempotency_store
+
+    # One graph run per workflow at a time; duplicates share the run in flight
+    app.state.run_coordinator = WorkflowRunCoordinator(
+        redis_cache, lease_ttl_seconds=settings.workflow_lease_ttl_seconds
+    )
+
+    # Background execution of graph runs (WORKFLOW_EXECUTION_MODE=queued)
+    job_queue = None
+    ownership = None
+    if settings.queued_execution:
+        if settings.workflow_ownership and settings.workflow_queue_backend == "redis" and redis_cache.enabled:
+            ownership = WorkflowOwnership(
+                redis_cache,
+                JOBS_QUEUE_KEY,
+                ttl_seconds=settings.workflow_ownership_ttl_seconds,
+            )
+            await ownership.start()
+        job_queue = WorkflowJobQueue(
+            workflow_engine,
+            app.state.workflow_persistence,
+            redis_cache,
+            app.state.run_coordinator,
+            concurrency=settings.workflow_worker_concurrency,
+            backend=settings.workflow_queue_backend,
+            ownership=ownership,
+        )
+        await job_queue.start()
+    app.state.job_queue = job_queue
+
     try:
         yield
     finally:
+        if job_queue:
+            await job_queue.close()
+        if ownership:
+            await ownership.close()
+        await checkpoint_compactor.close()
+        await ab_ticker.close()
+        await idempotency_store.close()
+        await archiver.close()
+        if thumbnail_speculator:
+            await thumbnail_speculator.close()
         await workflow_engine.close()
+        await event_bus.close()
         await close_redis_cache()
+        await close_db()
         logger.info("shutdown")
 
 
@@ -56,10 +189,26 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", "X-Next-Cursor"],
     )
 
+    app.add_exception_handler(WorkflowConflictError, _workflow_conflict_handler)
+    app.add_exception_handler(WorkflowBusyError, _workflow_conflict_handler)
+    app.add_exception_handler(IdempotencyError, _idempotency_error_handler)
+
     app.include_router(api_router, prefix=settings.api_v1_prefix)
+    # Unversioned, where Prometheus scrapes by default.
+    app.include_router(metrics_router)
     return app
 
 
+async def _workflow_conflict_handler(request: Request, exc: Exception) -> JSONResponse:
+    # Lost a compare-and-swap or collided with a different in-flight change.
+    return JSONResponse(status_code=409, content={"detail": str(exc)})
+
+
+async def _idempotency_error_handler(request: Request, exc: IdempotencyError) -> JSONResponse:
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)})
+
+
 app = create_app()
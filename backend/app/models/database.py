@@ -1,41 +1,80 @@
 ﻿from collections.abc import AsyncGenerator
 
-from sqlalchemy import JSON, String, Integer
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine, AsyncSession
+from sqlalchemy import JSON, Float, ForeignKey, Index, LargeBinary, String, Integer
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine, AsyncSession
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from app.core.config import get_settings
 from app.core.logger import get_logger
+from app.core.sqlite import install_sqlite_pragmas, sqlite_pragmas
 
 settings = get_settings()
 logger = get_logger(__name__)
 
-# PostgreSQL connection pooling for production
-# SQLite uses NullPool to avoid connection issues
-if settings.database_url.startswith("postgresql"):
-    engine = create_async_engine(
-        settings.database_url,
-        echo=settings.debug,
-        future=True,
-        pool_size=10,
-        max_overflow=20,
-        pool_pre_ping=True,  # Verify connections before using
-        pool_recycle=3600,   # Recycle connections after 1 hour
-    )
-    logger.info("database_engine_postgresql", pool_size=10)
-else:
+
+def create_engine_for(url: str) -> AsyncEngine:
+    """
+    Engine with this deployment's pool settings for url.
+
+    PostgreSQL gets a pre-pinged connection pool. SQLite uses NullPool in
+    development; the production profile keeps a small pool of connections
+    tuned with WAL pragmas (see app.core.sqlite). Also used for the
+    checkpoint database when it lives on a separate server.
+    """
+    if url.startswith("postgresql"):
+        pg_engine = create_async_engine(
+            url,
+            echo=settings.debug,
+            future=True,
+            pool_size=10,
+            max_overflow=20,
+            pool_pre_ping=True,  # Verify connections before using
+            pool_recycle=3600,   # Recycle connections after 1 hour
+        )
+        logger.info("database_engine_postgresql", pool_size=10)
+        return pg_engine
+
+    if settings.sqlite_tuned:
+        sqlite_engine = create_async_engine(
+            url,
+            echo=settings.debug,
+            future=True,
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=settings.sqlite_pool_size,
+            max_overflow=0,
+            # sqlite3's own lock wait, in seconds; busy_timeout below covers the same ground
+            connect_args={"timeout": settings.sqlite_busy_timeout_ms / 1000},
+        )
+        install_sqlite_pragmas(sqlite_engine.sync_engine, sqlite_pragmas(settings))
+        logger.info("database_engine_sqlite", profile="production", pool_size=settings.sqlite_pool_size)
+        return sqlite_engine
+
     # SQLite with NullPool for development
-    engine = create_async_engine(
-        settings.database_url,
+    sqlite_engine = create_async_engine(
+        url,
         echo=settings.debug,
         future=True,
         poolclass=NullPool,
     )
     logger.info("database_engine_sqlite")
+    return sqlite_engine
+
+
+engine = create_engine_for(settings.database_url)
 
 SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
+# Read-only replica for polling endpoints (DATABASE_READ_URL); None when not configured.
+read_engine = create_engine_for(settings.database_read_url) if settings.database_read_url else None
+
+ReadSessionLocal = (
+    async_sessionmaker(bind=read_engine, class_=AsyncSession, expire_on_commit=False)
+    if read_engine is not None
+    else None
+)
+
 
 class Base(DeclarativeBase):
     pass
@@ -43,15 +82,123 @@ class Base(DeclarativeBase):
 
 class WorkflowRecord(Base):
     __tablename__ = "workflows"
+    __table_args__ = (
+        # Serves the per-user dashboard listing (keyset pagination on updated_ts).
+        Index("ix_workflows_user_id_updated_ts", "user_id", "updated_ts"),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True)
     user_id: Mapped[str] = mapped_column(String, index=True)
     topic: Mapped[str] = mapped_column(String)
     target_platforms: Mapped[list[str]] = mapped_column(JSON, default=list)
     status: Mapped[str] = mapped_column(String, index=True)
-    state_snapshot: Mapped[dict] = mapped_column(JSON, default=dict)
+    # Denormalized from state_snapshot so listings never decode the JSON blob.
+    current_step: Mapped[str] = mapped_column(String, default="init", server_default="init")
+    # JSONB on PostgreSQL so saves can patch changed keys in place (see app.services.state_store).
+    state_snapshot: Mapped[dict] = mapped_column(JSON().with_variant(JSONB(), "postgresql"), default=dict)
     created_ts: Mapped[int] = mapped_column(Integer, index=True)
     updated_ts: Mapped[int] = mapped_column(Integer, index=True)
+    # Bumped on every committed state change; drives ETags for polling endpoints.
+    revision: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+
+    # Compare-and-swap on revision: UPDATEs carry "AND revision = <loaded value>"
+    # and raise StaleDataError when another writer committed first.
+    __mapper_args__ = {"version_id_col": revision, "version_id_generator": False}
+
+
+# Normalized slices of ContentWorkflowState (WORKFLOW_STATE_STORAGE=normalized).
+# The workflows row then keeps only the small remainder of the state.
+
+
+class WorkflowScriptVariant(Base):
+    __tablename__ = "workflow_script_variants"
+
+    workflow_id: Mapped[str] = mapped_column(
+        String, ForeignKey("workflows.id", ondelete="CASCADE"), primary_key=True
+    )
+    variant_id: Mapped[str] = mapped_column(String, primary_key=True)
+    position: Mapped[int] = mapped_column(Integer)
+    data: Mapped[dict] = mapped_column(JSON)
+
+
+class WorkflowThumbnailVariant(Base):
+    __tablename__ = "workflow_thumbnail_variants"
+
+    workflow_id: Mapped[str] = mapped_column(
+        String, ForeignKey("workflows.id", ondelete="CASCADE"), primary_key=True
+    )
+    variant_id: Mapped[str] = mapped_column(String, primary_key=True)
+    position: Mapped[int] = mapped_column(Integer)
+    data: Mapped[dict] = mapped_column(JSON)
+
+
+class WorkflowABVariantMetrics(Base):
+    __tablename__ = "workflow_ab_variants"
+
+    workflow_id: Mapped[str] = mapped_column(
+        String, ForeignKey("workflows.id", ondelete="CASCADE"), primary_key=True
+    )
+    thumbnail_id: Mapped[str] = mapped_column(String, primary_key=True)
+    position: Mapped[int] = mapped_column(Integer)
+    style: Mapped[str | None] = mapped_column(String, nullable=True)
+    impressions: Mapped[int] = mapped_column(Integer, default=0)
+    clicks: Mapped[int] = mapped_column(Integer, default=0)
+    ctr: Mapped[float] = mapped_column(Float, default=0.0)
+    avg_view_duration: Mapped[float] = mapped_column(Float, default=0.0)
+    # Any other per-variant fields, kept verbatim.
+    extra: Mapped[dict] = mapped_column(JSON, default=dict)
+
+
+class ABMetricSample(Base):
+    """Append-only history of A/B variant metrics: one row per variant per check."""
+
+    __tablename__ = "ab_metric_samples"
+
+    workflow_id: Mapped[str] = mapped_column(
+        String, ForeignKey("workflows.id", ondelete="CASCADE"), primary_key=True
+    )
+    variant_id: Mapped[str] = mapped_column(String, primary_key=True)
+    # ab_test["last_updated"] of the check; part of the key so re-saves are no-ops.
+    ts: Mapped[float] = mapped_column(Float, primary_key=True)
+    impressions: Mapped[int] = mapped_column(Integer)
+    clicks: Mapped[int] = mapped_column(Integer)
+
+
+class WorkflowArchiveRecord(Base):
+    """
+    Cold storage for completed workflows moved out of the workflows table.
+
+    payload is the compressed JSON of the full state plus its A/B metric
+    samples; codec names the compression ("zstd" or "zlib").
+    """
+
+    __tablename__ = "workflow_archive"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    user_id: Mapped[str] = mapped_column(String, index=True)
+    topic: Mapped[str] = mapped_column(String)
+    status: Mapped[str] = mapped_column(String)
+    current_step: Mapped[str] = mapped_column(String)
+    created_ts: Mapped[int] = mapped_column(Integer)
+    updated_ts: Mapped[int] = mapped_column(Integer)
+    revision: Mapped[int] = mapped_column(Integer)
+    archived_ts: Mapped[int] = mapped_column(Integer, index=True)
+    codec: Mapped[str] = mapped_column(String)
+    payload: Mapped[bytes] = mapped_column(LargeBinary)
+
+
+class IdempotencyRecord(Base):
+    """Stored outcome of a mutating request sent with an Idempotency-Key header."""
+
+    __tablename__ = "idempotency_keys"
+
+    # "<METHOD> <path>:<client key>" so one key cannot replay across routes.
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    request_hash: Mapped[str] = mapped_column(String)
+    # NULL while the first request is still running.
+    status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    response_body: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    created_ts: Mapped[int] = mapped_column(Integer, index=True)
 
 
 async def init_db() -> None:
@@ -59,6 +206,13 @@ async def init_db() -> None:
         await conn.run_sync(Base.metadata.create_all)
 
 
+async def close_db() -> None:
+    """Close pooled connections (the production SQLite profile keeps them open)."""
+    await engine.dispose()
+    if read_engine is not None:
+        await read_engine.dispose()
+
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as session:
         yield session
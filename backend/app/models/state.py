@@ -91,6 +91,10 @@ class StopTestRequest(BaseModel):
     reason: str = "manual_stop"
 
 
+class WorkflowStatusBatchRequest(BaseModel):
+    workflow_ids: list[str] = Field(min_length=1, max_length=300)
+
+
 class ABTestStatusResponse(BaseModel):
     workflow_id: str
     status: str
@@ -124,3 +128,9 @@ class WorkflowSummaryResponse(BaseModel):
     current_step: str
     created_ts: int
     updated_ts: int
+    archived: bool = False
+
+
+class WorkflowStatusBatchResponse(BaseModel):
+    workflows: list[WorkflowStatusResponse]
+    missing: list[str] = Field(default_factory=list)
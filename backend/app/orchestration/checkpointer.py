@@ -0,0 +1,169 @@
+from collections.abc import AsyncIterator
+from typing import Any, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+)
+from langgraph.checkpoint.sqlite import JsonPlusSerializerCompat
+from sqlalchemy import Column, LargeBinary, MetaData, String, Table, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+checkpoint_metadata = MetaData()
+
+# Same layout as AsyncSqliteSaver's table, so tooling (and compaction SQL) carries over.
+checkpoints_table = Table(
+    "checkpoints",
+    checkpoint_metadata,
+    Column("thread_id", String, primary_key=True),
+    Column("thread_ts", String, primary_key=True),
+    Column("parent_ts", String, nullable=True),
+    Column("checkpoint", LargeBinary),
+    Column("metadata", LargeBinary, nullable=True),
+)
+
+
+def include_in_migrations(name: str | None, type_: str, parent_names: dict[str, Any]) -> bool:
+    """
+    Alembic include_name filter: the checkpointer owns its tables (setup() creates them).
+
+    Without it, autogenerate against a database shared with the checkpointer
+    (CHECKPOINT_DB_URL == DATABASE_URL) would emit drop_table("checkpoints").
+    """
+    if type_ == "table":
+        return name not in checkpoint_metadata.tables
+    if type_ in ("index", "unique_constraint", "foreign_key_constraint", "column"):
+        return parent_names.get("table_name") not in checkpoint_metadata.tables
+    return True
+
+
+def _thread_config(thread_id: str, thread_ts: str | None) -> RunnableConfig | None:
+    if not thread_ts:
+        return None
+    return {"configurable": {"thread_id": thread_id, "thread_ts": thread_ts}}
+
+
+class SQLAlchemyCheckpointSaver(BaseCheckpointSaver):
+    """
+    Async LangGraph checkpointer on a pooled SQLAlchemy engine.
+
+    Used when CHECKPOINT_DB_URL points at PostgreSQL: every replica reads
+    and writes the same table, so any of them can resume any thread, and
+    connections come from the engine's pool instead of one long-lived
+    connection per process. The engine is shared with the application when
+    both URLs are the same.
+    """
+
+    serde = JsonPlusSerializerCompat()
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        *,
+        owns_engine: bool = False,
+        serde: Optional[SerializerProtocol] = None,
+    ):
+        super().__init__(serde=serde)
+        self.engine = engine
+        self.owns_engine = owns_engine
+        self.is_setup = False
+
+    async def setup(self) -> None:
+        if self.is_setup:
+            return
+        async with self.engine.begin() as conn:
+            await conn.run_sync(checkpoint_metadata.create_all)
+        self.is_setup = True
+
+    async def close(self) -> None:
+        if self.owns_engine:
+            await self.engine.dispose()
+
+    def _row_tuple(self, row: Any) -> CheckpointTuple:
+        return CheckpointTuple(
+            {"configurable": {"thread_id": row.thread_id, "thread_ts": row.thread_ts}},
+            self.serde.loads(row.checkpoint),
+            self.serde.loads(row.metadata) if row.metadata is not None else {},
+            _thread_config(row.thread_id, row.parent_ts),
+        )
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        await self.setup()
+        configurable = config["configurable"]
+        statement = select(checkpoints_table).where(
+            checkpoints_table.c.thread_id == str(configurable["thread_id"])
+        )
+        if configurable.get("thread_ts"):
+            statement = statement.where(checkpoints_table.c.thread_ts == str(configurable["thread_ts"]))
+        else:
+            statement = statement.order_by(checkpoints_table.c.thread_ts.desc()).limit(1)
+
+        async with self.engine.connect() as conn:
+            row = (await conn.execute(statement)).first()
+        return self._row_tuple(row) if row is not None else None
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        await self.setup()
+        statement = select(checkpoints_table).order_by(checkpoints_table.c.thread_ts.desc())
+        if config is not None:
+            statement = statement.where(checkpoints_table.c.thread_id == str(config["configurable"]["thread_id"]))
+        if before is not None:
+            statement = statement.where(checkpoints_table.c.thread_ts < str(before["configurable"]["thread_ts"]))
+        if limit and not filter:
+            statement = statement.limit(limit)
+
+        async with self.engine.connect() as conn:
+            rows = (await conn.execute(statement)).all()
+
+        # Metadata is an opaque serialized blob, so filters are applied after loading.
+        yielded = 0
+        for row in rows:
+            checkpoint_tuple = self._row_tuple(row)
+            if filter and any(checkpoint_tuple.metadata.get(key) != value for key, value in filter.items()):
+                continue
+            yield checkpoint_tuple
+            yielded += 1
+            if limit and yielded >= limit:
+                return
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+    ) -> RunnableConfig:
+        await self.setup()
+        thread_id = str(config["configurable"]["thread_id"])
+        values = {
+            "thread_id": thread_id,
+            "thread_ts": checkpoint["id"],
+            "parent_ts": config["configurable"].get("thread_ts"),
+            "checkpoint": self.serde.dumps(checkpoint),
+            "metadata": self.serde.dumps(metadata),
+        }
+        dialect_insert = postgresql_insert if self.engine.dialect.name == "postgresql" else sqlite_insert
+        statement = dialect_insert(checkpoints_table).values(values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[checkpoints_table.c.thread_id, checkpoints_table.c.thread_ts],
+            set_={
+                "parent_ts": statement.excluded.parent_ts,
+                "checkpoint": statement.excluded.checkpoint,
+                "metadata": statement.excluded.metadata,
+            },
+        )
+        async with self.engine.begin() as conn:
+            await conn.execute(statement)
+        return {"configurable": {"thread_id": thread_id, "thread_ts": checkpoint["id"]}}
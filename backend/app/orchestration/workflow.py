@@ -2,19 +2,36 @@
 
 import time
 from pathlib import Path
-from typing import Literal
+from typing import TYPE_CHECKING, Literal
 
+import aiosqlite
 from langgraph.checkpoint.aiosqlite import AsyncSqliteSaver
 from langgraph.checkpoint.memory import MemorySaver
-from langgraph.graph import END, StateGraph
+from langgraph.graph import END, START, StateGraph
+from sqlalchemy.engine import make_url
 
 from app.agents.ab_test_orchestrator import ABTestOrchestratorAgent
 from app.agents.script_architect import ScriptArchitectAgent
 from app.agents.trend_analyst import TrendAnalystAgent
 from app.agents.visual_engineer import VisualEngineerAgent
 from app.core.config import get_settings
+from app.core.instrumentation import instrument_checkpointer, instrument_node
 from app.core.logger import get_logger
+from app.core.sqlite import apply_sqlite_pragmas, sqlite_pragmas
+from app.models import database
 from app.models.state import ContentWorkflowState
+from app.orchestration.checkpointer import SQLAlchemyCheckpointSaver
+
+if TYPE_CHECKING:
+    from app.services.thumbnail_speculation import ThumbnailSpeculator
+
+# Human gates: the graph interrupts before each one, checkpointed, and a human
+# action resumes it there. Values are the node that announces the pause.
+GATES = {
+    "human_gate_scripts": "await_script_approval",
+    "human_gate_thumbnails": "await_thumbnail_selection",
+    "ab_test_gate": "await_ab_result",
+}
 
 
 class ContentWorkflow:
@@ -26,6 +43,8 @@ class ContentWorkflow:
         self.script_architect = ScriptArchitectAgent()
         self.visual_engineer = VisualEngineerAgent()
         self.ab_orchestrator = ABTestOrchestratorAgent()
+        # Set at startup when SPECULATIVE_THUMBNAILS is on.
+        self.thumbnail_speculator: ThumbnailSpeculator | None = None
 
         self.builder = StateGraph(ContentWorkflowState)
         self._build_graph()
@@ -38,61 +57,168 @@ class ContentWorkflow:
         if self.app is not None:
             return
 
-        checkpoint_target = self._checkpoint_target(self.settings.checkpoint_db_url)
-        Path(checkpoint_target).parent.mkdir(parents=True, exist_ok=True)
+        checkpoint_url = self.settings.checkpoint_db_url
+        if checkpoint_url.startswith("postgresql"):
+            checkpoint_target = make_url(checkpoint_url).render_as_string(hide_password=True)
+        else:
+            checkpoint_target = self._checkpoint_target(checkpoint_url)
+            Path(checkpoint_target).parent.mkdir(parents=True, exist_ok=True)
 
         try:
-            self._checkpointer_cm = AsyncSqliteSaver.from_conn_string(checkpoint_target)
-            if hasattr(self._checkpointer_cm, "__aenter__"):
-                self._checkpointer = await self._checkpointer_cm.__aenter__()
-            else:  # pragma: no cover - compatibility fallback
-                self._checkpointer = self._checkpointer_cm
+            if checkpoint_url.startswith("postgresql"):
+                self._checkpointer = self._sqlalchemy_checkpointer(checkpoint_url)
+                await self._checkpointer.setup()
+            else:
+                self._checkpointer_cm = AsyncSqliteSaver.from_conn_string(checkpoint_target)
+                if hasattr(self._checkpointer_cm, "__aenter__"):
+                    self._checkpointer = await self._checkpointer_cm.__aenter__()
+                else:  # pragma: no cover - compatibility fallback
+                    self._checkpointer = self._checkpointer_cm
+                if self.settings.sqlite_tuned:
+                    # setup() opens the connection; the saver keeps that one connection for its lifetime.
+                    await self._checkpointer.setup()
+                    await apply_sqlite_pragmas(self._checkpointer.conn, sqlite_pragmas(self.settings))
         except Exception as exc:  # pragma: no cover - startup fallback
             self.logger.warning("checkpointer_fallback", reason=str(exc))
             self._checkpointer_cm = None
             self._checkpointer = MemorySaver()
 
-        self.app = self.builder.compile(checkpointer=self._checkpointer)
-        self.logger.info("workflow_initialized", checkpoint=checkpoint_target)
+        instrument_checkpointer(self._checkpointer)
+        self.app = self.builder.compile(checkpointer=self._checkpointer, interrupt_before=list(GATES))
+        self.logger.info("workflow_initialized", checkpoint=checkpoint_target, backend=self.checkpoint_backend)
+
+    def _sqlalchemy_checkpointer(self, url: str) -> SQLAlchemyCheckpointSaver:
+        # Same database as the app: share its pool rather than opening a second one.
+        if url == self.settings.database_url:
+            return SQLAlchemyCheckpointSaver(database.engine)
+        return SQLAlchemyCheckpointSaver(database.create_engine_for(url), owns_engine=True)
+
+    @property
+    def checkpoint_backend(self) -> str:
+        if isinstance(self._checkpointer, SQLAlchemyCheckpointSaver):
+            return self._checkpointer.engine.dialect.name
+        if isinstance(self._checkpointer, AsyncSqliteSaver):
+            return "sqlite"
+        return "memory"
 
     async def close(self) -> None:
         if self._checkpointer_cm and hasattr(self._checkpointer_cm, "__aexit__"):
             await self._checkpointer_cm.__aexit__(None, None, None)
+        if isinstance(self._checkpointer, SQLAlchemyCheckpointSaver):
+            await self._checkpointer.close()
 
     async def run(self, state: ContentWorkflowState, thread_id: str) -> ContentWorkflowState:
+        """
+        Advance a workflow given its full state.
+
+        A thread paused at a gate is resumed with only the keys that differ
+        from its checkpoint. A new thread runs from the start; one
+        checkpointed before gates were interrupts is first placed at the
+        gate its state is waiting on.
+        """
         if self.app is None:
             await self.initialize()
 
         config = {"configurable": {"thread_id": thread_id}}
-        result = await self.app.ainvoke(state, config=config)
-        return result
+        snapshot = await self.app.aget_state(config)
+        if self._paused_gate(snapshot.next):
+            delta = {key: value for key, value in state.items() if snapshot.values.get(key) != value}
+            return await self._resume(config, snapshot.next, delta)
+
+        announce_node = GATES.get(self._legacy_gate(state))
+        if announce_node is None:
+            return self._values(await self.app.ainvoke(state, config=config))
+        await self.app.aupdate_state(config, dict(state), as_node=announce_node)
+        return self._values(await self.app.ainvoke(None, config=config))
+
+    async def resume(
+        self,
+        thread_id: str,
+        delta: dict,
+        state: ContentWorkflowState,
+    ) -> ContentWorkflowState:
+        """
+        Resume a thread paused at a gate with only the changed keys (delta).
+
+        state, the full state with delta applied, is only sent when the
+        thread has no paused checkpoint (see run()).
+        """
+        if self.app is None:
+            await self.initialize()
 
-    def _build_graph(self) -> None:
-        self.builder.add_node("entry_router", self._entry_router)
-        self.builder.add_node("analyze_trends", self.trend_analyst.run)
-        self.builder.add_node("generate_scripts", self.script_architect.run)
-        self.builder.add_node("human_gate_scripts", self._human_gate_scripts)
-        self.builder.add_node("generate_thumbnails", self.visual_engineer.run)
-        self.builder.add_node("human_gate_thumbnails", self._human_gate_thumbnails)
-        self.builder.add_node("run_ab_test", self._run_ab_test)
-        self.builder.add_node("check_ab_status", self._check_ab_status)
-        self.builder.add_node("finalize", self._finalize)
-
-        self.builder.set_entry_point("entry_router")
+        config = {"configurable": {"thread_id": thread_id}}
+        snapshot = await self.app.aget_state(config)
+        if not self._paused_gate(snapshot.next):
+            return await self.run(state, thread_id)
+        return await self._resume(config, snapshot.next, delta)
 
-        self.builder.add_conditional_edges(
-            "entry_router",
-            self._route_from_entry,
-            {
-                "from_start": "analyze_trends",
-                "from_script_gate": "human_gate_scripts",
-                "from_thumbnail_gate": "human_gate_thumbnails",
-                "from_ab_test": "run_ab_test",
-            },
-        )
+    async def _resume(self, config: dict, paused_at: tuple[str, ...], delta: dict) -> ContentWorkflowState:
+        if delta:
+            # Written as the announcing node, whose only edge leads back into the gate.
+            await self.app.aupdate_state(config, delta, as_node=GATES[self._paused_gate(paused_at)])
+        return self._values(await self.app.ainvoke(None, config=config))
+
+    @staticmethod
+    def _paused_gate(next_nodes: tuple[str, ...]) -> str | None:
+        return next((node for node in next_nodes if node in GATES), None)
+
+    @staticmethod
+    def _values(values: dict) -> ContentWorkflowState:
+        # Channels that only ever held None are absent from graph output and checkpoints.
+        return {key: values.get(key) for key in ContentWorkflowState.__annotations__}
+
+    async def checkpoint_connection(self) -> aiosqlite.Connection | None:
+        """Connection of the SQLite checkpointer; None when running on the in-memory fallback."""
+        if not isinstance(self._checkpointer, AsyncSqliteSaver):
+            return None
+        await self._checkpointer.setup()
+        return self._checkpointer.conn
+
+    async def get_state(self, thread_id: str) -> ContentWorkflowState:
+        """Latest checkpointed state of a thread; empty if it was never checkpointed."""
+        if self.app is None:
+            await self.initialize()
+
+        snapshot = await self.app.aget_state({"configurable": {"thread_id": thread_id}})
+        if not snapshot.values:
+            return {}
+        return self._values(snapshot.values)
+
+    async def put_state(self, thread_id: str, state: ContentWorkflowState) -> None:
+        """Checkpoint a state written outside a graph run (approvals, queued input, failures)."""
+        if self.app is None:
+            await self.initialize()
+
+        # Written at the gate the state waits on, so the thread stays (or becomes) paused there.
+        config = {"configurable": {"thread_id": thread_id}}
+        snapshot = await self.app.aget_state(config)
+        gate = self._paused_gate(snapshot.next) or self._legacy_gate(state)
+        await self.app.aupdate_state(config, dict(state), as_node=GATES.get(gate, START))
+
+    def _build_graph(self) -> None:
+        nodes = {
+            "analyze_trends": self.trend_analyst.run,
+            "generate_scripts": self.script_architect.run,
+            "await_script_approval": self._await_script_approval,
+            "human_gate_scripts": self._human_gate_scripts,
+            "generate_thumbnails": self._generate_thumbnails,
+            "await_thumbnail_selection": self._await_thumbnail_selection,
+            "human_gate_thumbnails": self._human_gate_thumbnails,
+            "run_ab_test": self._run_ab_test,
+            "check_ab_status": self._check_ab_status,
+            "await_ab_result": self._await_ab_result,
+            "ab_test_gate": self._ab_test_gate,
+            "finalize": self._finalize,
+        }
+        for name, node in nodes.items():
+            # Latency, errors and fallbacks per node, scraped from /metrics.
+            self.builder.add_node(name, instrument_node(name, node))
+
+        self.builder.set_entry_point("analyze_trends")
 
         self.builder.add_edge("analyze_trends", "generate_scripts")
-        self.builder.add_edge("generate_scripts", "human_gate_scripts")
+        self.builder.add_edge("generate_scripts", "await_script_approval")
+        self.builder.add_edge("await_script_approval", "human_gate_scripts")
 
         self.builder.add_conditional_edges(
             "human_gate_scripts",
@@ -100,17 +226,18 @@ class ContentWorkflow:
             {
                 "approved": "generate_thumbnails",
                 "rejected": "generate_scripts",
-                "pending": END,
+                "pending": "await_script_approval",
             },
         )
 
-        self.builder.add_edge("generate_thumbnails", "human_gate_thumbnails")
+        self.builder.add_edge("generate_thumbnails", "await_thumbnail_selection")
+        self.builder.add_edge("await_thumbnail_selection", "human_gate_thumbnails")
         self.builder.add_conditional_edges(
             "human_gate_thumbnails",
             self._route_after_thumbnail_gate,
             {
                 "selected": "run_ab_test",
-                "pending": END,
+                "pending": "await_thumbnail_selection",
             },
         )
 
@@ -120,7 +247,17 @@ class ContentWorkflow:
             "check_ab_status",
             self._route_after_ab_check,
             {
-                "running": END,  # Exit to allow polling, will re-enter via entry_router
+                "running": "await_ab_result",  # Pause until a manual decision or the next check
+                "completed": "finalize",
+                "error": END,
+            },
+        )
+        self.builder.add_edge("await_ab_result", "ab_test_gate")
+        self.builder.add_conditional_edges(
+            "ab_test_gate",
+            self._route_after_ab_check,
+            {
+                "running": "run_ab_test",
                 "completed": "finalize",
                 "error": END,
             },
@@ -128,43 +265,40 @@ class ContentWorkflow:
 
         self.builder.add_edge("finalize", END)
 
-    async def _entry_router(self, state: ContentWorkflowState) -> ContentWorkflowState:
-        state["updated_ts"] = int(time.time())
-        return state
-
-    def _route_from_entry(
-        self, state: ContentWorkflowState
-    ) -> Literal["from_start", "from_script_gate", "from_thumbnail_gate", "from_ab_test"]:
-        approval = state.get("human_approval_status", {})
-        has_scripts = bool(state.get("script_variants"))
-        has_thumbnails = bool(state.get("thumbnail_variants"))
-        selected_thumbnail = state.get("selected_thumbnail_id")
-        ab_test = state.get("ab_test")
-
-        # Check if we're in A/B testing phase
-        if ab_test is not None:
-            return "from_ab_test"
+    @staticmethod
+    def _legacy_gate(state: ContentWorkflowState) -> str | None:
+        """
+        The gate a state is waiting on, derived from its fields.
 
-        if state.get("current_step") in ["ab_testing", "ab_test_complete"]:
-            return "from_ab_test"
+        Only used for threads that are not paused at a gate: workflows
+        checkpointed before the gates were interrupts, imported ones, or a
+        lost checkpoint. None means the workflow starts from the beginning.
+        """
+        approval = state.get("human_approval_status") or {}
 
-        if selected_thumbnail and ab_test is None:
-            # Just selected thumbnail, need to start AB test
-            return "from_thumbnail_gate"
+        if state.get("ab_test") is not None or state.get("current_step") in ["ab_testing", "ab_test_complete"]:
+            return "ab_test_gate"
 
-        if state.get("current_step") == "awaiting_thumbnail_selection":
-            return "from_thumbnail_gate"
+        if state.get("selected_thumbnail_id") or state.get("current_step") == "awaiting_thumbnail_selection":
+            return "human_gate_thumbnails"
 
-        if has_thumbnails and approval.get("scripts_approved"):
-            return "from_thumbnail_gate"
+        if state.get("thumbnail_variants") and approval.get("scripts_approved"):
+            return "human_gate_thumbnails"
 
-        if has_scripts:
-            return "from_script_gate"
+        if state.get("script_variants"):
+            return "human_gate_scripts"
 
         if approval.get("scripts_approved") or approval.get("scripts_rejected"):
-            return "from_script_gate"
+            return "human_gate_scripts"
 
-        return "from_start"
+        return None
+
+    async def _await_script_approval(self, state: ContentWorkflowState) -> ContentWorkflowState:
+        state["current_step"] = "awaiting_approval"
+        state["updated_ts"] = int(time.time())
+        if self.thumbnail_speculator is not None:
+            self.thumbnail_speculator.schedule(state)
+        return state
 
     async def _human_gate_scripts(self, state: ContentWorkflowState) -> ContentWorkflowState:
         approval = state.get("human_approval_status", {})
@@ -176,8 +310,6 @@ class ContentWorkflow:
             state["thumbnail_variants"] = []
             state["selected_thumbnail_id"] = None
             state["human_approval_status"]["thumbnails_approved"] = False
-        else:
-            state["current_step"] = "awaiting_approval"
 
         state["updated_ts"] = int(time.time())
         return state
@@ -192,17 +324,25 @@ class ContentWorkflow:
             return "rejected"
         return "pending"
 
-    async def _human_gate_thumbnails(self, state: ContentWorkflowState) -> ContentWorkflowState:
-        selected_thumbnail_id = state.get("selected_thumbnail_id")
+    async def _generate_thumbnails(self, state: ContentWorkflowState) -> ContentWorkflowState:
+        if self.thumbnail_speculator is not None:
+            script_id = self.visual_engineer.resolve_script(state)["id"]
+            prepared = await self.thumbnail_speculator.take(state["workflow_id"], script_id)
+            if prepared is not None:
+                return self.visual_engineer.apply_thumbnails(state, prepared)
+        return await self.visual_engineer.run(state)
+
+    async def _await_thumbnail_selection(self, state: ContentWorkflowState) -> ContentWorkflowState:
+        state["human_approval_status"]["thumbnails_approved"] = False
+        state["current_step"] = "awaiting_thumbnail_selection"
+        state["updated_ts"] = int(time.time())
+        return state
 
-        if selected_thumbnail_id:
+    async def _human_gate_thumbnails(self, state: ContentWorkflowState) -> ContentWorkflowState:
+        if state.get("selected_thumbnail_id"):
             state["human_approval_status"]["thumbnails_approved"] = True
             state["current_step"] = "thumbnail_selected"
-        else:
-            state["human_approval_status"]["thumbnails_approved"] = False
-            state["current_step"] = "awaiting_thumbnail_selection"
-
-        state["updated_ts"] = int(time.time())
+            state["updated_ts"] = int(time.time())
         return state
 
     def _route_after_thumbnail_gate(self, state: ContentWorkflowState) -> Literal["selected", "pending"]:
@@ -219,6 +359,14 @@ class ContentWorkflow:
         state["updated_ts"] = int(time.time())
         return state
 
+    async def _await_ab_result(self, state: ContentWorkflowState) -> ContentWorkflowState:
+        """Pause point while the test runs; current_step stays ab_testing."""
+        return state
+
+    async def _ab_test_gate(self, state: ContentWorkflowState) -> ContentWorkflowState:
+        """A manual decision finalizes directly; otherwise the test takes another check."""
+        return state
+
     def _route_after_ab_check(
         self, state: ContentWorkflowState
     ) -> Literal["running", "completed", "error"]:
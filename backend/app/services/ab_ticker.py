@@ -0,0 +1,152 @@
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.agents.ab_test_orchestrator import ABTestOrchestratorAgent
+from app.core.logger import get_logger
+from app.core.metrics import metrics
+from app.models.database import SessionLocal, WorkflowRecord
+from app.models.state import ContentWorkflowState
+from app.orchestration.workflow import ContentWorkflow
+from app.services.redis_client import RedisCache
+from app.services.workflow_persistence import WorkflowConflictError, WorkflowPersistence
+
+logger = get_logger(__name__)
+
+TICK_LEASE_KEY = "ab_ticker"
+
+tick_duration_seconds = metrics.histogram("ab_tick_duration_seconds", "Wall time of one background A/B tick")
+tick_workflows = metrics.counter("ab_tick_workflows_total", "A/B tests checked by the background ticker, by result")
+running_tests = metrics.gauge("ab_tests_running", "Running A/B tests seen by the last tick")
+ticks_skipped = metrics.counter("ab_ticks_skipped_total", "Ticks skipped because another process holds the tick lease")
+
+
+class ABTestTicker:
+    """
+    Advances every running A/B test in the background.
+
+    Every interval_seconds all workflows in A/B testing are loaded with one
+    query. Tests whose check is due (the agent's check_interval_seconds)
+    collect their metrics, and significance is computed for all of them in
+    one vectorized batch. Tests that keep running are written back with one
+    versioned UPDATE (WorkflowPersistence.save_batch); the few that found a
+    winner or timed out resume their graph to finalize, as declare-winner
+    does. A workflow written by someone else meanwhile is left for the next
+    tick.
+
+    Every API process runs a ticker, so with Redis each tick first takes the
+    ab_ticker lease for interval_seconds and is skipped while another
+    process holds it: one process ticks per interval. Without Redis every
+    process ticks, which is only safe for a single process.
+    """
+
+    def __init__(
+        self,
+        persistence: WorkflowPersistence,
+        engine: ContentWorkflow,
+        interval_seconds: float = 30.0,
+        session_factory: async_sessionmaker[AsyncSession] = SessionLocal,
+        cache: RedisCache | None = None,
+    ):
+        self.persistence = persistence
+        self.engine = engine
+        self.interval_seconds = interval_seconds
+        self.cache = cache
+        self._token = uuid.uuid4().hex
+        self.session_factory = session_factory
+        self.agent = ABTestOrchestratorAgent()
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self.interval_seconds <= 0:
+            return
+        self._task = asyncio.create_task(self._loop(), name="ab-test-ticker")
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.tick_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("ab_tick_failed", error=str(exc))
+
+    async def tick_once(self, now: float | None = None) -> int:
+        """Check every due A/B test once; returns how many were checked (0 when skipped)."""
+        if self.cache is not None:
+            # Kept until it expires, not released, so the interval spaces ticks across processes.
+            acquired = await self.cache.acquire_lease(TICK_LEASE_KEY, self._token, self.interval_seconds)
+            if acquired is False:
+                ticks_skipped.inc()
+                return 0
+        started = time.perf_counter()
+        try:
+            return await self._tick(now or time.time())
+        finally:
+            tick_duration_seconds.observe(time.perf_counter() - started)
+
+    async def _tick(self, now: float) -> int:
+        async with self.session_factory() as session:
+            statement = select(WorkflowRecord).where(
+                WorkflowRecord.status == "ab_testing",
+                WorkflowRecord.current_step == "ab_testing",
+            )
+            records = list((await session.execute(statement)).scalars())
+            running_tests.set(len(records))
+            if not records:
+                return 0
+
+            states = await self.persistence.load_states(session, records)
+            due = [
+                record
+                for record in records
+                if (ab_test := states[record.id].get("ab_test"))
+                and ab_test.get("status") == "running"
+                and self.agent.is_due(ab_test, now)
+            ]
+            if not due:
+                return 0
+
+            current = await asyncio.gather(*(self.agent.collect_metrics(states[record.id]) for record in due))
+            results = self.agent.statistics.calculate_multi_variant_batch(list(current))
+
+            running, finished = [], []
+            for record, current_metrics, stats_result in zip(due, current, results):
+                state = self.agent.apply_check(states[record.id], current_metrics, stats_result)
+                state["updated_ts"] = int(time.time())
+                (running if state["current_step"] == "ab_testing" else finished).append(record)
+
+            saved = await self.persistence.save_batch(session, running, states)
+            tick_workflows.inc(len(saved), result="updated")
+            tick_workflows.inc(len(running) - len(saved), result="conflict")
+
+            for record in finished:
+                await self._finish(session, record, states[record.id])
+
+        logger.info("ab_tick_completed", checked=len(due), updated=len(saved), finished=len(finished))
+        return len(due)
+
+    async def _finish(self, session: AsyncSession, record: WorkflowRecord, state: ContentWorkflowState) -> None:
+        """Resume the graph past the A/B gate with the final check, then save as usual."""
+        delta = {key: state.get(key) for key in ("ab_test", "current_step", "updated_ts")}
+        try:
+            await self.persistence.ensure_current(record)
+            final_state = await self.engine.resume(record.id, delta, state)
+            await self.persistence.save(session, record, final_state)
+        except WorkflowConflictError:
+            tick_workflows.inc(result="conflict")
+            return
+        tick_workflows.inc(result="finished")
@@ -0,0 +1,167 @@
+from collections.abc import Iterable, Sequence
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.database import ABMetricSample
+
+
+def lttb(points: Sequence[tuple[float, float]], threshold: int) -> list[int]:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Returns the indices of at most threshold points that preserve the visual
+    shape of the series; the first and last points are always kept.
+    """
+    if threshold < 3:
+        raise ValueError("LTTB needs a threshold of at least 3 points")
+    count = len(points)
+    if threshold >= count:
+        return list(range(count))
+
+    selected = [0]
+    bucket_size = (count - 2) / (threshold - 2)
+    previous = 0
+
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+
+        # Average of the next bucket is the third triangle vertex.
+        next_start = end
+        next_end = min(int((bucket + 2) * bucket_size) + 1, count)
+        if next_start >= next_end:
+            next_start, next_end = count - 1, count
+        span = next_end - next_start
+        avg_x = sum(points[index][0] for index in range(next_start, next_end)) / span
+        avg_y = sum(points[index][1] for index in range(next_start, next_end)) / span
+
+        prev_x, prev_y = points[previous]
+        best_index, best_area = start, -1.0
+        for index in range(start, end):
+            x, y = points[index]
+            area = abs((prev_x - avg_x) * (y - prev_y) - (prev_x - x) * (avg_y - prev_y))
+            if area > best_area:
+                best_index, best_area = index, area
+
+        selected.append(best_index)
+        previous = best_index
+
+    selected.append(count - 1)
+    return selected
+
+
+async def record_ab_samples(session: AsyncSession, workflow_id: str, ab_test: dict) -> None:
+    """
+    Append one sample per variant for the check that produced ab_test.
+
+    Staged in the caller's transaction as a single multi-row INSERT; saving
+    the same check twice is ignored thanks to the (workflow, variant, ts) key.
+    """
+    await record_ab_samples_many(session, {workflow_id: ab_test})
+
+
+async def record_ab_samples_many(session: AsyncSession, ab_tests: dict[str, dict]) -> None:
+    """record_ab_samples for several workflows (workflow_id -> ab_test) in one INSERT."""
+    rows = [
+        {
+            "workflow_id": workflow_id,
+            "variant_id": variant["thumbnail_id"],
+            "ts": ab_test["last_updated"],
+            "impressions": variant.get("impressions", 0),
+            "clicks": variant.get("clicks", 0),
+        }
+        for workflow_id, ab_test in ab_tests.items()
+        if ab_test.get("last_updated") is not None
+        for variant in ab_test.get("variants") or []
+    ]
+    await insert_ab_samples(session, rows)
+
+
+async def insert_ab_samples(session: AsyncSession, rows: list[dict]) -> None:
+    """
+    Stage sample rows (workflow_id, variant_id, ts, impressions, clicks) as
+    one multi-row INSERT; rows already stored are ignored.
+    """
+    if not rows:
+        return
+
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement = postgresql_insert(ABMetricSample).values(rows).on_conflict_do_nothing()
+    elif dialect == "sqlite":
+        statement = sqlite_insert(ABMetricSample).values(rows).on_conflict_do_nothing()
+    else:
+        statement = insert(ABMetricSample).values(rows)
+    await session.execute(statement)
+
+
+async def load_ab_samples(session: AsyncSession, workflow_ids: Sequence[str]) -> dict[str, list[dict]]:
+    """Raw samples of several workflows (workflow_id -> samples ordered by variant and ts) in one query."""
+    samples: dict[str, list[dict]] = {workflow_id: [] for workflow_id in workflow_ids}
+    if not samples:
+        return samples
+    statement = (
+        select(ABMetricSample)
+        .where(ABMetricSample.workflow_id.in_(list(samples)))
+        .order_by(ABMetricSample.workflow_id, ABMetricSample.variant_id, ABMetricSample.ts)
+    )
+    for sample in (await session.execute(statement)).scalars():
+        samples[sample.workflow_id].append(
+            {
+                "variant_id": sample.variant_id,
+                "ts": sample.ts,
+                "impressions": sample.impressions,
+                "clicks": sample.clicks,
+            }
+        )
+    return samples
+
+
+async def load_ab_timeline(session: AsyncSession, workflow_id: str, max_points: int) -> list[dict]:
+    """Per-variant CTR series, each downsampled with LTTB to at most max_points samples."""
+    statement = (
+        select(ABMetricSample.variant_id, ABMetricSample.ts, ABMetricSample.impressions, ABMetricSample.clicks)
+        .where(ABMetricSample.workflow_id == workflow_id)
+        .order_by(ABMetricSample.variant_id, ABMetricSample.ts)
+    )
+    rows = (await session.execute(statement)).all()
+    return build_ab_timeline(
+        (
+            {"variant_id": variant_id, "ts": ts, "impressions": impressions, "clicks": clicks}
+            for variant_id, ts, impressions, clicks in rows
+        ),
+        max_points,
+    )
+
+
+def build_ab_timeline(samples: Iterable[dict], max_points: int) -> list[dict]:
+    """
+    load_ab_timeline over raw sample dicts (variant_id, ts, impressions,
+    clicks) ordered by variant and ts, e.g. the samples of an archived workflow.
+    """
+    by_variant: dict[str, list[dict]] = {}
+    for sample in samples:
+        impressions, clicks = sample["impressions"], sample["clicks"]
+        by_variant.setdefault(sample["variant_id"], []).append(
+            {
+                "ts": sample["ts"],
+                "impressions": impressions,
+                "clicks": clicks,
+                "ctr": round(clicks / impressions, 4) if impressions else 0.0,
+            }
+        )
+
+    series = []
+    for variant_id, variant_samples in by_variant.items():
+        keep = lttb([(sample["ts"], sample["ctr"]) for sample in variant_samples], max_points)
+        series.append(
+            {
+                "variant_id": variant_id,
+                "total_samples": len(variant_samples),
+                "samples": [variant_samples[index] for index in keep],
+            }
+        )
+    return series
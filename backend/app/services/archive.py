@@ -0,0 +1,203 @@
+import asyncio
+import json
+import time
+import zlib
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.core.logger import get_logger
+from app.core.metrics import metrics
+from app.models.database import (
+    ABMetricSample,
+    SessionLocal,
+    WorkflowABVariantMetrics,
+    WorkflowArchiveRecord,
+    WorkflowRecord,
+    WorkflowScriptVariant,
+    WorkflowThumbnailVariant,
+)
+from app.models.state import ContentWorkflowState
+from app.services.ab_timeline import load_ab_samples
+from app.services.response_cache import dumps
+from app.services.workflow_persistence import WorkflowPersistence, list_cache_scope
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional, zlib is used instead
+    zstandard = None
+
+logger = get_logger(__name__)
+
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 9
+
+workflows_archived = metrics.counter("workflows_archived_total", "Completed workflows moved to the archive")
+archive_reads = metrics.counter("workflow_archive_reads_total", "Archived workflows rehydrated for a request")
+
+
+def compress(data: bytes) -> tuple[str, bytes]:
+    """Compress with zstd when zstandard is installed, zlib otherwise; returns (codec, payload)."""
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return "zlib", zlib.compress(data, ZLIB_LEVEL)
+
+
+def decompress(codec: str, payload: bytes) -> bytes:
+    if codec == "zlib":
+        return zlib.decompress(payload)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Archived workflow is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    raise ValueError(f"Unknown archive codec: {codec}")
+
+
+def read_payload(record: WorkflowArchiveRecord) -> tuple[ContentWorkflowState, list[dict[str, Any]]]:
+    """The archived state and A/B samples of record."""
+    content = json.loads(decompress(record.codec, record.payload))
+    return content["state"], content["ab_samples"]
+
+
+@dataclass
+class ArchivedWorkflow:
+    record: WorkflowArchiveRecord
+    state: ContentWorkflowState
+    ab_samples: list[dict[str, Any]]
+
+
+class WorkflowArchiver:
+    """
+    Moves completed workflows out of the hot workflows table.
+
+    Every interval_seconds, workflows that completed more than
+    max_age_seconds ago are written, state and A/B samples together, as one
+    compressed row of workflow_archive; their workflows row and variant and
+    sample rows are then deleted in the same transaction. Disabled unless
+    max_age_seconds is positive.
+
+    Archived workflows are read-only. Every read endpoint (list, status,
+    results, ab-status, ab-timeline, ab-stream, /ws) falls back to
+    load()/load_many() when a workflow is not in the hot table, and the
+    list marks them archived. Mutating endpoints (approve, select-thumbnail,
+    declare-winner, stop-test) answer 410 Gone for an archived workflow and
+    404 only when the id is unknown.
+    """
+
+    def __init__(
+        self,
+        persistence: WorkflowPersistence,
+        max_age_seconds: float = 0.0,
+        interval_seconds: float = 3600.0,
+        batch_size: int = 200,
+        session_factory: async_sessionmaker[AsyncSession] = SessionLocal,
+    ):
+        self.persistence = persistence
+        self.max_age_seconds = max_age_seconds
+        self.interval_seconds = interval_seconds
+        self.batch_size = max(1, batch_size)
+        self.session_factory = session_factory
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self.max_age_seconds <= 0 or self.interval_seconds <= 0:
+            return
+        self._task = asyncio.create_task(self._loop(), name="workflow-archiver")
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                # Drain the backlog batch by batch, then wait for the next interval.
+                while await self.archive_once() == self.batch_size:
+                    await asyncio.sleep(0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("workflow_archive_failed", error=str(exc))
+            await asyncio.sleep(self.interval_seconds)
+
+    async def archive_once(self, now: float | None = None) -> int:
+        """Archive one batch of eligible workflows; returns how many were moved."""
+        cutoff = int((now or time.time()) - self.max_age_seconds)
+        async with self.session_factory() as session:
+            statement = (
+                select(WorkflowRecord)
+                .where(WorkflowRecord.status == "completed", WorkflowRecord.updated_ts < cutoff)
+                .order_by(WorkflowRecord.updated_ts)
+                .limit(self.batch_size)
+            )
+            records = list((await session.execute(statement)).scalars())
+            if not records:
+                return 0
+
+            ids = [record.id for record in records]
+            states = await self.persistence.load_states(session, records)
+            samples = await load_ab_samples(session, ids)
+
+            archived_ts = int(time.time())
+            for record in records:
+                codec, payload = compress(dumps({"state": states[record.id], "ab_samples": samples[record.id]}))
+                session.add(
+                    WorkflowArchiveRecord(
+                        id=record.id,
+                        user_id=record.user_id,
+                        topic=record.topic,
+                        status=record.status,
+                        current_step=record.current_step,
+                        created_ts=record.created_ts,
+                        updated_ts=record.updated_ts,
+                        revision=record.revision,
+                        archived_ts=archived_ts,
+                        codec=codec,
+                        payload=payload,
+                    )
+                )
+
+            # Explicit deletes: SQLite does not enforce the ON DELETE CASCADE of these tables.
+            for model in (WorkflowScriptVariant, WorkflowThumbnailVariant, WorkflowABVariantMetrics, ABMetricSample):
+                await session.execute(delete(model).where(model.workflow_id.in_(ids)))
+            for record in records:
+                # Versioned delete: a workflow changed since it was read stays hot until the next pass.
+                await session.delete(record)
+            try:
+                await session.commit()
+            except StaleDataError:
+                await session.rollback()
+                logger.info("workflow_archive_conflict", count=len(ids))
+                return 0
+
+        workflows_archived.inc(len(ids))
+        users = {record.user_id for record in records}
+        await self.persistence.cache.bump_generation(*(list_cache_scope(user) for user in users), list_cache_scope(None))
+        logger.info("workflows_archived", count=len(ids))
+        return len(ids)
+
+    async def is_archived(self, session: AsyncSession, workflow_id: str) -> bool:
+        statement = select(WorkflowArchiveRecord.id).where(WorkflowArchiveRecord.id == workflow_id)
+        return (await session.execute(statement)).scalar_one_or_none() is not None
+
+    async def load(self, session: AsyncSession, workflow_id: str) -> ArchivedWorkflow | None:
+        return (await self.load_many(session, [workflow_id])).get(workflow_id)
+
+    async def load_many(self, session: AsyncSession, workflow_ids: Sequence[str]) -> dict[str, ArchivedWorkflow]:
+        if not workflow_ids:
+            return {}
+        statement = select(WorkflowArchiveRecord).where(WorkflowArchiveRecord.id.in_(list(workflow_ids)))
+        found = {}
+        for record in (await session.execute(statement)).scalars():
+            found[record.id] = ArchivedWorkflow(record, *read_payload(record))
+        archive_reads.inc(len(found))
+        return found
@@ -0,0 +1,214 @@
+import asyncio
+import time
+from typing import Any
+
+import aiosqlite
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.logger import get_logger
+from app.core.metrics import metrics
+from app.models.database import SessionLocal, WorkflowRecord
+from app.orchestration.workflow import ContentWorkflow
+
+logger = get_logger(__name__)
+
+# Rows deleted per statement, so one pass never holds the write lock for long.
+DELETE_BATCH_SIZE = 5000
+# Bound on the "thread_id IN (...)" lists (SQLite's default variable limit is 999).
+THREAD_CHUNK_SIZE = 500
+
+# PRAGMA auto_vacuum value of a file that supports PRAGMA incremental_vacuum.
+AUTO_VACUUM_INCREMENTAL = 2
+
+checkpoints_deleted = metrics.counter(
+    "checkpoints_compacted_total", "Checkpoints removed by compaction, by reason"
+)
+checkpoint_db_bytes = metrics.gauge("checkpoint_db_size_bytes", "Size of checkpoints.db, free pages included")
+checkpoint_rows = metrics.gauge("checkpoint_rows", "Checkpoints stored")
+checkpoint_threads = metrics.gauge("checkpoint_threads", "LangGraph threads with at least one checkpoint")
+
+_RETENTION_SQL = """
+DELETE FROM checkpoints WHERE rowid IN (
+    SELECT rowid FROM (
+        SELECT rowid, ROW_NUMBER() OVER (PARTITION BY thread_id ORDER BY thread_ts DESC) AS position
+        FROM checkpoints
+    )
+    WHERE position > ?
+    LIMIT ?
+)
+"""
+
+_COLLAPSE_SQL = """
+DELETE FROM checkpoints
+WHERE thread_id IN ({placeholders})
+  AND thread_ts < (
+      SELECT MAX(latest.thread_ts) FROM checkpoints AS latest
+      WHERE latest.thread_id = checkpoints.thread_id
+  )
+"""
+
+
+class CheckpointCompactor:
+    """
+    Bounds the growth of the LangGraph checkpoint database.
+
+    Each pass keeps the newest keep_last checkpoints of every thread,
+    collapses workflows that completed since the previous pass to their
+    final checkpoint, and returns up to vacuum_pages free pages to the
+    filesystem with PRAGMA incremental_vacuum. Passes run every
+    interval_seconds on the checkpointer's own connection, so they
+    interleave with graph runs instead of competing for the file lock.
+
+    incremental_vacuum needs auto_vacuum=INCREMENTAL, which an existing
+    file only gets through a full VACUUM. That rewrite is never done here;
+    run scripts/enable_checkpoint_vacuum.py once (see
+    enable_incremental_vacuum). Until then passes only delete rows.
+    """
+
+    def __init__(
+        self,
+        engine: ContentWorkflow,
+        keep_last: int = 20,
+        interval_seconds: float = 3600.0,
+        vacuum_pages: int = 2000,
+        session_factory: async_sessionmaker[AsyncSession] = SessionLocal,
+    ):
+        self.engine = engine
+        self.keep_last = max(1, keep_last)
+        self.interval_seconds = interval_seconds
+        self.vacuum_pages = vacuum_pages
+        self.session_factory = session_factory
+        self._task: asyncio.Task | None = None
+        # updated_ts lower bound for "completed since the last pass"; 0 = all of them.
+        self._completed_since = 0
+        self._last_pass: dict[str, Any] | None = None
+        self._warned_no_vacuum = False
+
+    async def start(self) -> None:
+        if self.interval_seconds <= 0 or await self.engine.checkpoint_connection() is None:
+            return
+        self._task = asyncio.create_task(self._loop(), name="checkpoint-compaction")
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.compact()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("checkpoint_compaction_failed", error=str(exc))
+            await asyncio.sleep(self.interval_seconds)
+
+    async def compact(self) -> dict[str, Any]:
+        """Run one compaction pass and return what it removed."""
+        conn = await self.engine.checkpoint_connection()
+        if conn is None:
+            return {"backend": self.engine.checkpoint_backend}
+
+        started = time.perf_counter()
+        pass_started_ts = int(time.time())
+
+        retention = 0
+        while True:
+            cursor = await conn.execute(_RETENTION_SQL, (self.keep_last, DELETE_BATCH_SIZE))
+            await conn.commit()
+            retention += cursor.rowcount
+            if cursor.rowcount < DELETE_BATCH_SIZE:
+                break
+
+        collapsed = 0
+        completed = await self._completed_workflows()
+        for offset in range(0, len(completed), THREAD_CHUNK_SIZE):
+            chunk = completed[offset:offset + THREAD_CHUNK_SIZE]
+            cursor = await conn.execute(_COLLAPSE_SQL.format(placeholders=",".join("?" * len(chunk))), chunk)
+            await conn.commit()
+            collapsed += cursor.rowcount
+        # A workflow can complete while this pass runs; the overlap re-checks it next time.
+        self._completed_since = pass_started_ts - 1
+
+        vacuumed = await self._pragma(conn, "auto_vacuum") == AUTO_VACUUM_INCREMENTAL
+        if vacuumed:
+            async with conn.execute(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)})") as cursor:
+                await cursor.fetchall()
+        elif not self._warned_no_vacuum:
+            self._warned_no_vacuum = True
+            logger.warning("checkpoint_db_incremental_vacuum_off", hint="run scripts/enable_checkpoint_vacuum.py once")
+
+        checkpoints_deleted.inc(retention, reason="retention")
+        checkpoints_deleted.inc(collapsed, reason="completed")
+        self._last_pass = {
+            "at": pass_started_ts,
+            "deleted_retention": retention,
+            "deleted_completed": collapsed,
+            "vacuumed": vacuumed,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info("checkpoint_compaction", **self._last_pass)
+        return self._last_pass
+
+    async def stats(self) -> dict[str, Any]:
+        conn = await self.engine.checkpoint_connection()
+        if conn is None:
+            return {"backend": self.engine.checkpoint_backend}
+
+        page_size = await self._pragma(conn, "page_size")
+        page_count = await self._pragma(conn, "page_count")
+        async with conn.execute("SELECT COUNT(*), COUNT(DISTINCT thread_id) FROM checkpoints") as cursor:
+            rows, threads = await cursor.fetchone()
+
+        checkpoint_db_bytes.set(page_size * page_count)
+        checkpoint_rows.set(rows)
+        checkpoint_threads.set(threads)
+        return {
+            "backend": "sqlite",
+            "size_bytes": page_size * page_count,
+            "free_bytes": page_size * await self._pragma(conn, "freelist_count"),
+            "incremental_vacuum": await self._pragma(conn, "auto_vacuum") == AUTO_VACUUM_INCREMENTAL,
+            "checkpoints": rows,
+            "threads": threads,
+            "keep_last": self.keep_last,
+            "interval_seconds": self.interval_seconds,
+            "last_pass": self._last_pass,
+        }
+
+    async def _completed_workflows(self) -> list[str]:
+        async with self.session_factory() as session:
+            statement = select(WorkflowRecord.id).where(
+                WorkflowRecord.status == "completed",
+                WorkflowRecord.updated_ts >= self._completed_since,
+            )
+            return list((await session.execute(statement)).scalars())
+
+    @staticmethod
+    async def _pragma(conn: aiosqlite.Connection, name: str) -> int:
+        async with conn.execute(f"PRAGMA {name}") as cursor:
+            return (await cursor.fetchone())[0]
+
+
+async def enable_incremental_vacuum(path: str, busy_timeout_ms: int = 60_000) -> bool:
+    """
+    Switch a checkpoint file to auto_vacuum=INCREMENTAL; returns False if it already was.
+
+    An existing file needs a full VACUUM, which rewrites it and holds an
+    exclusive lock throughout, so this is an explicit admin step run on
+    its own connection (scripts/enable_checkpoint_vacuum.py), preferably
+    while the API is stopped.
+    """
+    async with aiosqlite.connect(path) as conn:
+        await conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        if await CheckpointCompactor._pragma(conn, "auto_vacuum") == AUTO_VACUUM_INCREMENTAL:
+            return False
+        await conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        await conn.execute("VACUUM")
+    logger.info("checkpoint_db_incremental_vacuum_enabled", path=path)
+    return True
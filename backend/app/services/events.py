@@ -0,0 +1,152 @@
+import asyncio
+import json
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Any
+
+from app.core.logger import get_logger
+from app.services.redis_client import RedisCache
+
+logger = get_logger(__name__)
+
+EVENTS_CHANNEL = "workflow_events"
+
+
+class WorkflowSubscription:
+    """A bounded queue of change events for a set of workflow IDs."""
+
+    def __init__(self, bus: "WorkflowEventBus", workflow_ids: Iterable[str], max_pending: int = 100):
+        self._bus = bus
+        self.workflow_ids: set[str] = set()
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=max_pending)
+        self.add(workflow_ids)
+
+    def add(self, workflow_ids: Iterable[str]) -> None:
+        for workflow_id in workflow_ids:
+            if workflow_id not in self.workflow_ids:
+                self.workflow_ids.add(workflow_id)
+                self._bus._register(workflow_id, self)
+
+    def discard(self, workflow_ids: Iterable[str]) -> None:
+        for workflow_id in workflow_ids:
+            if workflow_id in self.workflow_ids:
+                self.workflow_ids.discard(workflow_id)
+                self._bus._unregister(workflow_id, self)
+
+    def close(self) -> None:
+        self.discard(list(self.workflow_ids))
+
+    def deliver(self, event: dict[str, Any]) -> None:
+        # A slow consumer only ever needs the newest state, so drop the oldest event.
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(event)
+
+    async def get(self, timeout: float | None = None) -> dict[str, Any] | None:
+        """Wait for the next event; returns None if the timeout elapses first."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class WorkflowEventBus:
+    """
+    Fan-out of committed workflow changes to live subscribers (SSE, WebSocket).
+
+    Events are published after the database commit. With Redis enabled they are
+    relayed through pub/sub so that every API process sees every change;
+    otherwise they are dispatched in-process. A relay that dies on a Redis
+    error is logged and restarted with backoff; meanwhile local events are
+    dispatched directly.
+    """
+
+    def __init__(self, cache: RedisCache, retry_seconds: float = 1.0, max_retry_seconds: float = 30.0):
+        self.cache = cache
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self._subscribers: defaultdict[str, set[WorkflowSubscription]] = defaultdict(set)
+        self._relay_task: asyncio.Task | None = None
+        self._restart_task: asyncio.Task | None = None
+        self._closed = False
+
+    async def start(self) -> None:
+        await self._start_relay()
+
+    async def close(self) -> None:
+        self._closed = True
+        for task in (self._restart_task, self._relay_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._restart_task = None
+        self._relay_task = None
+
+    def subscribe(self, workflow_ids: Iterable[str] = ()) -> WorkflowSubscription:
+        return WorkflowSubscription(self, workflow_ids)
+
+    async def publish(self, event: dict[str, Any]) -> None:
+        if self._relay_task is None:
+            self._dispatch(event)
+            return
+        await self.cache.publish_json(EVENTS_CHANNEL, event)
+        if self._relay_task.done():
+            # Relay down and restarting: still reach this process's subscribers.
+            self._dispatch(event)
+
+    def _register(self, workflow_id: str, subscription: WorkflowSubscription) -> None:
+        self._subscribers[workflow_id].add(subscription)
+
+    def _unregister(self, workflow_id: str, subscription: WorkflowSubscription) -> None:
+        subscribers = self._subscribers.get(workflow_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[workflow_id]
+
+    def _dispatch(self, event: dict[str, Any]) -> None:
+        for subscription in list(self._subscribers.get(event["workflow_id"], ())):
+            subscription.deliver(event)
+
+    async def _start_relay(self) -> None:
+        pubsub = await self.cache.subscribe(EVENTS_CHANNEL)
+        if pubsub is None:
+            return
+        self._relay_task = asyncio.create_task(self._relay(pubsub), name="workflow-event-relay")
+        self._relay_task.add_done_callback(self._relay_done)
+
+    def _relay_done(self, task: asyncio.Task) -> None:
+        if task.cancelled() or self._closed:
+            return
+        error = task.exception()
+        logger.warning("workflow_event_relay_stopped", error=str(error) if error else "stream ended")
+        self._restart_task = asyncio.create_task(self._restart_relay(), name="workflow-event-relay-restart")
+
+    async def _restart_relay(self) -> None:
+        delay = self.retry_seconds
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self._start_relay()
+            except Exception as exc:
+                logger.warning("workflow_event_relay_restart_failed", error=str(exc))
+                delay = min(delay * 2, self.max_retry_seconds)
+                continue
+            logger.info("workflow_event_relay_restarted")
+            return
+
+    async def _relay(self, pubsub) -> None:
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    self._dispatch(json.loads(message["data"]))
+                except (ValueError, KeyError) as exc:
+                    logger.warning("workflow_event_decode_failed", error=str(exc))
+        finally:
+            await pubsub.aclose()
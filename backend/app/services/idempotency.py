@@ -0,0 +1,225 @@
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.logger import get_logger
+from app.models.database import IdempotencyRecord, SessionLocal
+from app.services.redis_client import RedisCache
+
+logger = get_logger(__name__)
+
+
+class IdempotencyError(Exception):
+    """A request carrying an Idempotency-Key that cannot be processed."""
+
+    status_code = 409
+
+
+class IdempotencyInProgressError(IdempotencyError):
+    def __init__(self):
+        super().__init__("A request with this Idempotency-Key is still being processed")
+
+
+class IdempotencyKeyReusedError(IdempotencyError):
+    status_code = 422
+
+    def __init__(self):
+        super().__init__("This Idempotency-Key was already used with a different request payload")
+
+
+@dataclass
+class StoredResponse:
+    status_code: int
+    body: dict
+
+    def to_response(self) -> JSONResponse:
+        return JSONResponse(
+            status_code=self.status_code,
+            content=self.body,
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+
+def request_fingerprint(payload: BaseModel | dict | None) -> str:
+    if isinstance(payload, BaseModel):
+        payload = payload.model_dump(mode="json")
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Remembers the response of mutating requests by Idempotency-Key.
+
+    The database row is authoritative: inserting it claims the key, so only
+    one request per key ever runs the handler. Completed responses are also
+    written to Redis so that retries replay without touching the database.
+    Keys expire after ttl_seconds: an expired key is replaced when reused,
+    and a background task deletes expired rows every
+    purge_interval_seconds. Failed requests release their key so the client
+    can retry.
+    """
+
+    def __init__(
+        self,
+        cache: RedisCache,
+        ttl_seconds: int = 86400,
+        session_factory: async_sessionmaker[AsyncSession] = SessionLocal,
+        purge_interval_seconds: float = 3600.0,
+    ):
+        self.cache = cache
+        self.ttl_seconds = ttl_seconds
+        self.session_factory = session_factory
+        self.purge_interval_seconds = purge_interval_seconds
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self.purge_interval_seconds <= 0:
+            return
+        self._task = asyncio.create_task(self._purge_loop(), name="idempotency-purge")
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _purge_loop(self) -> None:
+        while True:
+            try:
+                await self.purge_expired()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("idempotency_purge_failed", error=str(exc))
+            await asyncio.sleep(self.purge_interval_seconds)
+
+    @staticmethod
+    def _cache_key(key: str) -> str:
+        return f"idempotency:{key}"
+
+    async def claim(self, key: str, request_hash: str) -> StoredResponse | None:
+        """
+        Claim key for a new request, or return the stored response of a finished one.
+
+        Returns None when the caller now owns the key and must run the handler.
+        """
+        cached = await self.cache.get_json(self._cache_key(key))
+        if cached is not None:
+            return self._replay(cached["request_hash"], cached["status_code"], cached["body"], request_hash)
+
+        now = int(time.time())
+        async with self.session_factory() as session:
+            record = await session.get(IdempotencyRecord, key)
+            if record is not None and record.created_ts < now - self.ttl_seconds:
+                await session.delete(record)
+                await session.flush()
+                record = None
+
+            if record is None:
+                session.add(IdempotencyRecord(key=key, request_hash=request_hash, created_ts=now))
+                try:
+                    await session.commit()
+                    return None
+                except IntegrityError:
+                    # Another request claimed the key between our read and insert.
+                    await session.rollback()
+                    record = await session.get(IdempotencyRecord, key)
+                    if record is None:
+                        raise IdempotencyInProgressError()
+
+            return self._replay(record.request_hash, record.status_code, record.response_body, request_hash)
+
+    def _replay(
+        self,
+        stored_hash: str,
+        status_code: int | None,
+        body: dict | None,
+        request_hash: str,
+    ) -> StoredResponse:
+        if stored_hash != request_hash:
+            raise IdempotencyKeyReusedError()
+        if status_code is None:
+            raise IdempotencyInProgressError()
+        return StoredResponse(status_code=status_code, body=body or {})
+
+    async def complete(self, key: str, status_code: int, body: dict[str, Any]) -> None:
+        async with self.session_factory() as session:
+            record = await session.get(IdempotencyRecord, key)
+            if record is None:
+                return
+            record.status_code = status_code
+            record.response_body = body
+            await session.commit()
+            request_hash = record.request_hash
+
+        await self.cache.set_json(
+            self._cache_key(key),
+            {"request_hash": request_hash, "status_code": status_code, "body": body},
+            ttl=self.ttl_seconds,
+        )
+
+    async def release(self, key: str) -> None:
+        """Forget an unfinished claim so a retry can run the handler again."""
+        async with self.session_factory() as session:
+            await session.execute(
+                delete(IdempotencyRecord).where(
+                    IdempotencyRecord.key == key,
+                    IdempotencyRecord.status_code.is_(None),
+                )
+            )
+            await session.commit()
+
+    async def purge_expired(self) -> int:
+        cutoff = int(time.time()) - self.ttl_seconds
+        async with self.session_factory() as session:
+            result = await session.execute(
+                delete(IdempotencyRecord).where(IdempotencyRecord.created_ts < cutoff)
+            )
+            await session.commit()
+        if result.rowcount:
+            logger.info("idempotency_keys_purged", count=result.rowcount)
+        return result.rowcount
+
+
+class IdempotentRequest:
+    """Per-request handle: the route calls begin() first and complete() with its result."""
+
+    def __init__(self, store: IdempotencyStore, key: str | None):
+        self.store = store
+        self.key = key
+        self._claimed = False
+
+    async def begin(self, payload: BaseModel | dict | None) -> JSONResponse | None:
+        """Return the stored response to replay, or None to run the handler."""
+        if self.key is None:
+            return None
+        stored = await self.store.claim(self.key, request_fingerprint(payload))
+        if stored is not None:
+            logger.info("idempotent_replay", key=self.key)
+            return stored.to_response()
+        self._claimed = True
+        return None
+
+    async def complete(self, status_code: int | None, result: BaseModel) -> None:
+        if not self._claimed:
+            return
+        await self.store.complete(self.key, status_code or 200, result.model_dump(mode="json"))
+        self._claimed = False
+
+    async def abandon(self) -> None:
+        if self._claimed:
+            await self.store.release(self.key)
+            self._claimed = False
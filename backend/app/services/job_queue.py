@@ -0,0 +1,271 @@
+import asyncio
+import time
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.logger import get_logger
+from app.core.metrics import metrics
+from app.models.database import SessionLocal, WorkflowRecord
+from app.orchestration.workflow import ContentWorkflow
+from app.services.redis_client import RedisCache
+from app.services.run_coordinator import WorkflowRunCoordinator
+from app.services.workflow_ownership import (
+    WorkflowOwnership,
+    new_worker_id,
+    worker_processing_key,
+    worker_queue_key,
+)
+from app.services.workflow_persistence import WorkflowPersistence
+
+logger = get_logger(__name__)
+
+JOBS_QUEUE_KEY = "workflow_jobs"
+# One process per interval re-enqueues the workflows left queued in the database.
+RECOVERY_LEASE_KEY = "workflow_jobs_recovery"
+RECOVERY_LEASE_SECONDS = 60.0
+PROCESSING_TTL_SECONDS = 86400
+
+queue_wait_seconds = metrics.histogram(
+    "workflow_queue_wait_seconds", "Time a workflow job waited before a worker picked it up"
+)
+job_duration_seconds = metrics.histogram(
+    "workflow_job_duration_seconds", "Wall time of one queued ContentWorkflow.run"
+)
+jobs_total = metrics.counter("workflow_jobs_total", "Queued workflow jobs by outcome")
+queue_depth = metrics.gauge("workflow_queue_depth", "Jobs waiting for a worker")
+
+
+class WorkflowJobQueue:
+    """
+    Runs ContentWorkflow off the request path.
+
+    Endpoints persist the pending input (approval flags, selections) and
+    enqueue only the workflow ID; a worker then loads the latest snapshot,
+    runs the graph and persists the result through WorkflowPersistence.
+    The "memory" backend is per-process; the "redis" backend shares one
+    list between all API processes.
+
+    With ownership (redis backend only), each workflow's jobs run on the
+    worker holding its lease: new jobs are routed to the owner's own list,
+    and a job popped by another worker is passed on to the owner.
+
+    No accepted job is lost to a restart or crash. On start, workflows
+    still queued in the database are enqueued again (jobs whose input was
+    already run are skipped). The redis backend pops reliably: a job moves
+    to this worker's processing list and is removed only once it has run;
+    close() and the ownership reaper put unfinished ones back on the queue.
+    """
+
+    def __init__(
+        self,
+        engine: ContentWorkflow,
+        persistence: WorkflowPersistence,
+        cache: RedisCache,
+        coordinator: WorkflowRunCoordinator,
+        concurrency: int = 4,
+        backend: str = "memory",
+        session_factory: async_sessionmaker[AsyncSession] = SessionLocal,
+        ownership: WorkflowOwnership | None = None,
+    ):
+        self.engine = engine
+        self.persistence = persistence
+        self.cache = cache
+        self.coordinator = coordinator
+        self.concurrency = max(1, concurrency)
+        self.backend = backend
+        self.session_factory = session_factory
+        self.ownership = ownership
+        self.worker_id = ownership.worker_id if ownership else new_worker_id()
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        self._workers: list[asyncio.Task] = []
+        self._running = 0
+
+    async def start(self) -> None:
+        if self.backend == "redis" and not self.cache.enabled:
+            logger.warning("workflow_queue_redis_unavailable", fallback="memory")
+            self.backend = "memory"
+        if self.backend != "redis":
+            self.ownership = None
+
+        self._workers = [
+            asyncio.create_task(self._worker(index), name=f"workflow-worker-{index}")
+            for index in range(self.concurrency)
+        ]
+        await self.recover()
+        logger.info(
+            "workflow_queue_started",
+            backend=self.backend,
+            concurrency=self.concurrency,
+            worker_id=self.ownership.worker_id if self.ownership else None,
+        )
+
+    async def close(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self.backend == "redis":
+            # Jobs interrupted mid-run go back for another worker.
+            await self.cache.move_list(self.processing_key, JOBS_QUEUE_KEY)
+
+    @property
+    def processing_key(self) -> str:
+        return worker_processing_key(self.worker_id)
+
+    async def recover(self) -> int:
+        """Enqueue workflows left queued by a previous process; returns how many."""
+        if self.backend == "redis":
+            if not await self.cache.acquire_lease(RECOVERY_LEASE_KEY, self.worker_id, RECOVERY_LEASE_SECONDS):
+                return 0
+        async with self.session_factory() as session:
+            statement = select(WorkflowRecord.id).where(WorkflowRecord.current_step == "queued")
+            workflow_ids = list((await session.execute(statement)).scalars())
+        for workflow_id in workflow_ids:
+            await self.enqueue(workflow_id)
+        if workflow_ids:
+            logger.info("workflow_jobs_recovered", count=len(workflow_ids))
+        return len(workflow_ids)
+
+    async def enqueue(self, workflow_id: str) -> None:
+        job = {"workflow_id": workflow_id, "enqueued_at": time.time()}
+        if self.backend == "redis":
+            queue_key = await self.ownership.route(workflow_id) if self.ownership else JOBS_QUEUE_KEY
+            if await self.cache.push_json(queue_key, job):
+                return
+        self._queue.put_nowait(job)
+
+    async def depth(self) -> int:
+        depth = self._queue.qsize()
+        if self.backend == "redis":
+            depth += await self.cache.list_length(JOBS_QUEUE_KEY)
+        if self.ownership:
+            depth += await self.cache.list_length(self.ownership.queue_key)
+        queue_depth.set(depth)
+        return depth
+
+    async def stats(self) -> dict[str, Any]:
+        return {
+            "mode": "queued",
+            "backend": self.backend,
+            "concurrency": self.concurrency,
+            "depth": await self.depth(),
+            "running": self._running,
+            "wait_seconds": queue_wait_seconds.summary(),
+            "run_seconds": job_duration_seconds.summary(),
+            "jobs": {
+                "succeeded": int(jobs_total.value(outcome="succeeded")),
+                "failed": int(jobs_total.value(outcome="failed")),
+                "forwarded": int(jobs_total.value(outcome="forwarded")),
+            },
+            "ownership": await self.ownership.stats() if self.ownership else None,
+        }
+
+    async def _next_job(self) -> tuple[dict[str, Any], bytes | None] | None:
+        """The next job and, for jobs claimed from Redis, the receipt to ack it with."""
+        if self.backend == "memory":
+            return await self._queue.get(), None
+        if not self._queue.empty():
+            # Jobs kept locally because a Redis push failed.
+            return self._queue.get_nowait(), None
+
+        # A worker's own list (jobs routed to it as owner) comes first.
+        keys = [self.ownership.queue_key, JOBS_QUEUE_KEY] if self.ownership else [JOBS_QUEUE_KEY]
+        try:
+            return await self.cache.claim_json(
+                keys, self.processing_key, timeout=1.0, processing_ttl=PROCESSING_TTL_SECONDS
+            )
+        except Exception as exc:
+            logger.warning("workflow_queue_pop_failed", error=str(exc))
+            await asyncio.sleep(1.0)
+            return None
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            claimed = await self._next_job()
+            if claimed is None:
+                continue
+
+            job, receipt = claimed
+            await self._handle(index, job)
+            # Not reached when cancelled mid-run: the job stays on the processing list for close().
+            if receipt is not None:
+                await self.cache.ack_json(self.processing_key, receipt)
+
+    async def _handle(self, index: int, job: dict[str, Any]) -> None:
+        workflow_id = job["workflow_id"]
+        if self.ownership and not await self._owns(job):
+            return
+        queue_wait_seconds.observe(max(0.0, time.time() - job["enqueued_at"]))
+        self._running += 1
+        started = time.perf_counter()
+        outcome = "succeeded"
+        try:
+            await self._execute(workflow_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            outcome = "failed"
+            logger.warning("workflow_job_failed", workflow_id=workflow_id, worker=index, error=str(exc))
+            await self._mark_failed(workflow_id, exc)
+        finally:
+            self._running -= 1
+            if self.ownership:
+                self.ownership.done(workflow_id)
+            job_duration_seconds.observe(time.perf_counter() - started)
+            jobs_total.inc(outcome=outcome)
+
+    async def _owns(self, job: dict[str, Any]) -> bool:
+        """Claim the job's workflow for this worker, or pass the job on to its owner."""
+        owner = await self.ownership.claim(job["workflow_id"])
+        if owner == self.ownership.worker_id:
+            return True
+        if owner is None:
+            # Held by a worker that stopped heartbeating; its lease expires shortly.
+            await asyncio.sleep(1.0)
+            await self.cache.push_json(JOBS_QUEUE_KEY, job)
+        else:
+            await self.cache.push_json(worker_queue_key(owner), job)
+        jobs_total.inc(outcome="forwarded")
+        return False
+
+    async def _execute(self, workflow_id: str) -> None:
+        async with self.session_factory() as session:
+            record = await session.get(WorkflowRecord, workflow_id)
+            if record is None:
+                logger.warning("workflow_job_missing", workflow_id=workflow_id)
+                return
+            if record.current_step != "queued":
+                # A duplicate job whose input was already run by another worker.
+                logger.info("workflow_job_skipped", workflow_id=workflow_id, step=record.current_step)
+                return
+            # Release the connection while the graph (and any LLM call) runs.
+            await session.commit()
+
+            async def execute() -> None:
+                state = await self.persistence.load_state(session, record)
+                result = await self.engine.run(state, thread_id=workflow_id)
+                await self.persistence.save(session, record, result)
+
+            async def load_latest() -> None:
+                # The run lease was held elsewhere; if that run died, our input is still pending.
+                await session.refresh(record)
+                if record.current_step == "queued":
+                    await self.enqueue(workflow_id)
+
+            await self.coordinator.run(workflow_id, "job", execute, load_latest)
+
+    async def _mark_failed(self, workflow_id: str, exc: Exception) -> None:
+        try:
+            async with self.session_factory() as session:
+                record = await session.get(WorkflowRecord, workflow_id)
+                if record is None:
+                    return
+                state = dict(await self.persistence.load_state(session, record))
+                state["errors"] = [*state.get("errors", []), f"job_failed: {exc}"]
+                state["current_step"] = "failed"
+                state["updated_ts"] = int(time.time())
+                await self.persistence.save(session, record, state)
+        except Exception as save_exc:  # pragma: no cover - best effort
+            logger.warning("workflow_job_mark_failed_error", workflow_id=workflow_id, error=str(save_exc))
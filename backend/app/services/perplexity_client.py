@@ -5,6 +5,7 @@ import httpx
 from pydantic import BaseModel
 
 from app.core.config import get_settings
+from app.core.instrumentation import external_call
 from app.core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -68,8 +69,9 @@ class PerplexityClient:
 
         try:
             async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(self.base_url, json=payload, headers=headers)
-                response.raise_for_status()
+                with external_call("perplexity"):
+                    response = await client.post(self.base_url, json=payload, headers=headers)
+                    response.raise_for_status()
 
                 data = response.json()
                 content = data["choices"][0]["message"]["content"].strip()
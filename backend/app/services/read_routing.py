@@ -0,0 +1,101 @@
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.logger import get_logger
+from app.core.metrics import metrics
+from app.models.database import SessionLocal, WorkflowRecord
+from app.services.revisions import RevisionTracker
+
+logger = get_logger(__name__)
+
+read_sessions = metrics.counter("db_read_sessions_total", "Polling read sessions, by database and reason")
+
+
+class ReadSessionRouter:
+    """
+    Sends polling reads to the read replica, and back to the primary when
+    the replica may not have a write the caller depends on.
+
+    The primary is used when:
+    - the client's last-seen updated_ts (X-Min-Updated-Ts) is newer than
+      the replica's watermark, MAX(workflows.updated_ts), which is re-read
+      at most every watermark_seconds and only while it is behind;
+    - the request targets a workflow whose committed revision (from the
+      RevisionTracker) the replica has not caught up with yet, so a
+      lagging replica can never put an older state back into the caches.
+    Without a replica every read goes to the primary.
+    """
+
+    def __init__(
+        self,
+        replica_factory: async_sessionmaker[AsyncSession] | None,
+        revisions: RevisionTracker,
+        watermark_seconds: float = 1.0,
+        primary_factory: async_sessionmaker[AsyncSession] = SessionLocal,
+    ):
+        self.replica_factory = replica_factory
+        self.revisions = revisions
+        self.watermark_seconds = watermark_seconds
+        self.primary_factory = primary_factory
+        self._watermark = 0
+        self._watermark_read_at = float("-inf")
+
+    @property
+    def enabled(self) -> bool:
+        return self.replica_factory is not None
+
+    @asynccontextmanager
+    async def session(
+        self,
+        min_updated_ts: int | None = None,
+        workflow_id: str | None = None,
+    ) -> AsyncIterator[AsyncSession]:
+        """A session on the replica if it is fresh enough for this read, else on the primary."""
+        if not self.enabled:
+            async with self.primary_factory() as session:
+                yield session
+            return
+
+        async with self.replica_factory() as replica:
+            reason = await self._primary_reason(replica, min_updated_ts, workflow_id)
+            if reason is None:
+                read_sessions.inc(database="replica", reason="fresh")
+                yield replica
+                return
+
+        read_sessions.inc(database="primary", reason=reason)
+        async with self.primary_factory() as session:
+            yield session
+
+    async def _primary_reason(
+        self,
+        replica: AsyncSession,
+        min_updated_ts: int | None,
+        workflow_id: str | None,
+    ) -> str | None:
+        if min_updated_ts and await self._watermark_behind(replica, min_updated_ts):
+            return "client_ts"
+
+        if workflow_id:
+            committed = await self.revisions.get(workflow_id)
+            if committed is not None:
+                statement = select(WorkflowRecord.revision).where(WorkflowRecord.id == workflow_id)
+                replicated = (await replica.execute(statement)).scalar_one_or_none()
+                if replicated is None or replicated < committed:
+                    return "revision"
+        return None
+
+    async def _watermark_behind(self, replica: AsyncSession, min_updated_ts: int) -> bool:
+        if self._watermark >= min_updated_ts:
+            return False
+        now = time.monotonic()
+        if now - self._watermark_read_at >= self.watermark_seconds:
+            # Marked before the query so concurrent requests reuse the value instead of piling on.
+            self._watermark_read_at = now
+            watermark = (await replica.execute(select(func.max(WorkflowRecord.updated_ts)))).scalar()
+            self._watermark = max(self._watermark, watermark or 0)
+        return self._watermark < min_updated_ts
@@ -9,6 +9,45 @@ from app.core.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Compare-and-delete so an expired holder never frees a lease it no longer owns.
+_RELEASE_LEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Compare-and-expire: only the current holder can keep a lease alive.
+_EXTEND_LEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Monotonic writes: a stale reader or a slow writer never moves a value back.
+_SET_MAX_SCRIPT = """
+local current = tonumber(redis.call("get", KEYS[1]))
+if current ~= nil and current >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call("set", KEYS[1], ARGV[1], "EX", ARGV[2])
+return 1
+"""
+
+_SET_JSON_IF_NEWER_SCRIPT = """
+local current = redis.call("get", KEYS[1])
+if current then
+    local ok, decoded = pcall(cjson.decode, current)
+    if ok and type(decoded) == "table" and tonumber(decoded["revision"]) ~= nil
+        and tonumber(decoded["revision"]) >= tonumber(ARGV[1]) then
+        return 0
+    end
+end
+redis.call("set", KEYS[1], ARGV[2], "EX", ARGV[3])
+return 1
+"""
+
 
 class RedisCache:
     """
@@ -51,6 +90,11 @@ class RedisCache:
             await self._client.close()
             logger.info("redis_disconnected")
 
+    @property
+    def enabled(self) -> bool:
+        """True when a live Redis connection is available."""
+        return self._enabled and self._client is not None
+
     def _make_key(self, key: str, namespace: str = "cat") -> str:
         """Create a namespaced key."""
         return f"{namespace}:{key}"
@@ -105,20 +149,65 @@ class RedisCache:
             return False
 
     async def delete_pattern(self, pattern: str, namespace: str = "cat") -> int:
-        """Delete all keys matching pattern."""
+        """
+        Delete all keys matching pattern.
+
+        Walks the keyspace incrementally with SCAN instead of KEYS so Redis is
+        never blocked, but it is still O(keyspace): prefer generation counters
+        (get_generation/bump_generation) for routine invalidation.
+        """
         if not self._enabled or not self._client:
             return 0
 
         try:
             full_pattern = self._make_key(pattern, namespace)
-            keys = await self._client.keys(full_pattern)
-            if keys:
-                return await self._client.delete(*keys)
-            return 0
+            deleted = 0
+            batch: list[bytes] = []
+            async for key in self._client.scan_iter(match=full_pattern, count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    deleted += await self._client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await self._client.unlink(*batch)
+            return deleted
         except Exception as e:
             logger.warning("redis_delete_pattern_error", pattern=pattern, error=str(e))
             return 0
 
+    async def get_generation(self, scope: str, namespace: str = "cat") -> int | None:
+        """
+        Current generation of a cache scope.
+
+        Embed it in cache keys; bumping the generation makes every key built
+        from the old value unreachable, and those keys then age out via TTL.
+        Returns None when Redis is unavailable or errors: the generation is
+        unknown, so callers must bypass the cache rather than fall back to
+        keys that may predate a bump.
+        """
+        if not self._enabled or not self._client:
+            return None
+
+        try:
+            value = await self._client.get(self._make_key(f"gen:{scope}", namespace))
+            return int(value) if value is not None else 0
+        except Exception as e:
+            logger.warning("redis_get_generation_error", scope=scope, error=str(e))
+            return None
+
+    async def bump_generation(self, *scopes: str, namespace: str = "cat") -> None:
+        """Invalidate cache scopes with one INCR each, sent in a single round trip."""
+        if not self._enabled or not self._client or not scopes:
+            return
+
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                for scope in scopes:
+                    pipe.incr(self._make_key(f"gen:{scope}", namespace))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("redis_bump_generation_error", scopes=list(scopes), error=str(e))
+
     async def exists(self, key: str, namespace: str = "cat") -> bool:
         """Check if key exists in cache."""
         if not self._enabled or not self._client:
@@ -192,6 +281,315 @@ class RedisCache:
             logger.warning("redis_set_json_error", key=key, error=str(e))
             return False
 
+    async def set_json_if_newer(
+        self,
+        key: str,
+        value: dict,
+        ttl: int | None = None,
+        namespace: str = "cat",
+    ) -> bool:
+        """
+        Set a JSON object carrying a "revision" field, unless the stored one
+        already has the same or a newer revision.
+        """
+        return await self.set_many_json_if_newer({key: value}, ttl=ttl, namespace=namespace)
+
+    async def set_many_json_if_newer(
+        self,
+        values: dict[str, dict],
+        ttl: int | None = None,
+        namespace: str = "cat",
+    ) -> bool:
+        """set_json_if_newer for several keys in one pipelined round trip; True if any was written."""
+        if not self._enabled or not self._client or not values:
+            return False
+
+        try:
+            ttl = ttl or self.settings.cache_ttl_seconds
+            async with self._client.pipeline(transaction=False) as pipe:
+                for key, value in values.items():
+                    pipe.eval(
+                        _SET_JSON_IF_NEWER_SCRIPT,
+                        1,
+                        self._make_key(key, namespace),
+                        int(value["revision"]),
+                        json.dumps(value).encode('utf-8'),
+                        ttl,
+                    )
+                return any(await pipe.execute())
+        except Exception as e:
+            logger.warning("redis_set_json_if_newer_error", count=len(values), error=str(e))
+            return False
+
+    async def get_int(self, key: str, namespace: str = "cat") -> int | None:
+        """Integer written by set_max; None when missing, not an integer or Redis is unavailable."""
+        if not self._enabled or not self._client:
+            return None
+
+        try:
+            value = await self._client.get(self._make_key(key, namespace))
+            return int(value) if value is not None else None
+        except ValueError:
+            return None
+        except Exception as e:
+            logger.warning("redis_get_int_error", key=key, error=str(e))
+            return None
+
+    async def set_max(self, key: str, value: int, ttl: int | None = None, namespace: str = "cat") -> bool:
+        """Store value only if it is greater than the stored integer; True when it was written."""
+        if not self._enabled or not self._client:
+            return False
+
+        try:
+            ttl = ttl or self.settings.cache_ttl_seconds
+            return bool(await self._client.eval(_SET_MAX_SCRIPT, 1, self._make_key(key, namespace), int(value), ttl))
+        except Exception as e:
+            logger.warning("redis_set_max_error", key=key, error=str(e))
+            return False
+
+    async def get_many_json(self, keys: list[str], namespace: str = "cat") -> list[Any | None]:
+        """Get several JSON values in one MGET. Missing or undecodable keys yield None."""
+        if not self._enabled or not self._client or not keys:
+            return [None] * len(keys)
+
+        try:
+            full_keys = [self._make_key(key, namespace) for key in keys]
+            values = await self._client.mget(full_keys)
+        except Exception as e:
+            logger.warning("redis_get_many_json_error", count=len(keys), error=str(e))
+            return [None] * len(keys)
+
+        results: list[Any | None] = []
+        for value in values:
+            try:
+                results.append(json.loads(value.decode('utf-8')) if value is not None else None)
+            except ValueError:
+                results.append(None)
+        return results
+
+    async def push_json(self, key: str, value: dict, namespace: str = "cat") -> bool:
+        """Append a JSON value to a list used as a FIFO queue (pairs with claim_json)."""
+        if not self._enabled or not self._client:
+            return False
+
+        try:
+            await self._client.lpush(self._make_key(key, namespace), json.dumps(value).encode('utf-8'))
+            return True
+        except Exception as e:
+            logger.warning("redis_push_json_error", key=key, error=str(e))
+            return False
+
+    async def claim_json(
+        self,
+        keys: list[str],
+        processing_key: str,
+        timeout: float = 1.0,
+        processing_ttl: int | None = None,
+        namespace: str = "cat",
+    ) -> tuple[dict, bytes] | None:
+        """
+        Reliable pop from the first non-empty list in keys: the item is moved
+        onto processing_key (LMOVE/BLMOVE) instead of removed, so it survives
+        a consumer crash until ack_json() is called with the returned receipt.
+
+        keys are tried in order and only the last one blocks, since BLMOVE
+        takes a single source. Returns (value, receipt) or None when the
+        timeout elapses. Errors are propagated so that queue consumers can
+        back off.
+        """
+        if not self._enabled or not self._client:
+            return None
+
+        processing = self._make_key(processing_key, namespace)
+        data = None
+        for key in keys[:-1]:
+            data = await self._client.lmove(self._make_key(key, namespace), processing, "RIGHT", "LEFT")
+            if data is not None:
+                break
+        else:
+            data = await self._client.blmove(self._make_key(keys[-1], namespace), processing, timeout, "RIGHT", "LEFT")
+        if data is None:
+            return None
+        if processing_ttl:
+            # Only reached by the lists of consumers that died without being reaped.
+            await self._client.expire(processing, processing_ttl)
+        return json.loads(data.decode('utf-8')), data
+
+    async def ack_json(self, processing_key: str, receipt: bytes, namespace: str = "cat") -> bool:
+        """Drop an item claimed with claim_json from its processing list."""
+        if not self._enabled or not self._client:
+            return False
+
+        try:
+            return bool(await self._client.lrem(self._make_key(processing_key, namespace), 1, receipt))
+        except Exception as e:
+            logger.warning("redis_ack_json_error", key=processing_key, error=str(e))
+            return False
+
+    async def list_length(self, key: str, namespace: str = "cat") -> int:
+        """Length of a list, 0 when missing or Redis is unavailable."""
+        if not self._enabled or not self._client:
+            return 0
+
+        try:
+            return await self._client.llen(self._make_key(key, namespace))
+        except Exception as e:
+            logger.warning("redis_list_length_error", key=key, error=str(e))
+            return 0
+
+    async def acquire_lease(
+        self,
+        key: str,
+        token: str,
+        ttl_seconds: float,
+        namespace: str = "cat",
+    ) -> bool | None:
+        """
+        Try to take an exclusive, expiring lease (SET NX PX).
+
+        Returns True/False for acquired/held elsewhere, or None when Redis is
+        unavailable so that callers can fall back to process-local locking.
+        """
+        if not self._enabled or not self._client:
+            return None
+
+        try:
+            acquired = await self._client.set(
+                self._make_key(key, namespace), token.encode('utf-8'), nx=True, px=int(ttl_seconds * 1000)
+            )
+            return bool(acquired)
+        except Exception as e:
+            logger.warning("redis_acquire_lease_error", key=key, error=str(e))
+            return None
+
+    async def release_lease(self, key: str, token: str, namespace: str = "cat") -> bool:
+        """Release a lease only if it is still held by token."""
+        if not self._enabled or not self._client:
+            return False
+
+        try:
+            released = await self._client.eval(
+                _RELEASE_LEASE_SCRIPT, 1, self._make_key(key, namespace), token.encode('utf-8')
+            )
+            return bool(released)
+        except Exception as e:
+            logger.warning("redis_release_lease_error", key=key, error=str(e))
+            return False
+
+    async def extend_lease(self, key: str, token: str, ttl_seconds: float, namespace: str = "cat") -> bool:
+        """Reset a lease's expiry (heartbeat); False when token no longer holds it."""
+        if not self._enabled or not self._client:
+            return False
+
+        try:
+            extended = await self._client.eval(
+                _EXTEND_LEASE_SCRIPT,
+                1,
+                self._make_key(key, namespace),
+                token.encode('utf-8'),
+                int(ttl_seconds * 1000),
+            )
+            return bool(extended)
+        except Exception as e:
+            logger.warning("redis_extend_lease_error", key=key, error=str(e))
+            return False
+
+    async def lease_holder(self, key: str, namespace: str = "cat") -> str | None:
+        """Token currently holding a lease, None when it is free (or Redis is unavailable)."""
+        if not self._enabled or not self._client:
+            return None
+
+        try:
+            token = await self._client.get(self._make_key(key, namespace))
+            return token.decode('utf-8') if token is not None else None
+        except Exception as e:
+            logger.warning("redis_lease_holder_error", key=key, error=str(e))
+            return None
+
+    async def add_members(self, key: str, *members: str, namespace: str = "cat") -> bool:
+        """Add members to a set."""
+        if not self._enabled or not self._client or not members:
+            return False
+
+        try:
+            await self._client.sadd(self._make_key(key, namespace), *(member.encode('utf-8') for member in members))
+            return True
+        except Exception as e:
+            logger.warning("redis_add_members_error", key=key, error=str(e))
+            return False
+
+    async def remove_members(self, key: str, *members: str, namespace: str = "cat") -> bool:
+        """Remove members from a set."""
+        if not self._enabled or not self._client or not members:
+            return False
+
+        try:
+            await self._client.srem(self._make_key(key, namespace), *(member.encode('utf-8') for member in members))
+            return True
+        except Exception as e:
+            logger.warning("redis_remove_members_error", key=key, error=str(e))
+            return False
+
+    async def members(self, key: str, namespace: str = "cat") -> frozenset[str]:
+        """Members of a set, empty when missing or Redis is unavailable."""
+        if not self._enabled or not self._client:
+            return frozenset()
+
+        try:
+            members = await self._client.smembers(self._make_key(key, namespace))
+            return frozenset(member.decode('utf-8') for member in members)
+        except Exception as e:
+            logger.warning("redis_members_error", key=key, error=str(e))
+            return frozenset()
+
+    async def move_list(self, source: str, destination: str, namespace: str = "cat") -> int:
+        """
+        Move every item of one queue list onto another (pairs with push_json/claim_json).
+
+        Items move one LMOVE at a time, oldest first, so none is lost if the
+        caller dies halfway. Returns how many were moved.
+        """
+        if not self._enabled or not self._client:
+            return 0
+
+        moved = 0
+        try:
+            source_key, destination_key = self._make_key(source, namespace), self._make_key(destination, namespace)
+            while await self._client.lmove(source_key, destination_key, "RIGHT", "LEFT") is not None:
+                moved += 1
+        except Exception as e:
+            logger.warning("redis_move_list_error", source=source, destination=destination, error=str(e))
+        return moved
+
+    async def publish_json(self, channel: str, value: dict, namespace: str = "cat") -> int:
+        """Publish a JSON message on a pub/sub channel. Returns receiver count."""
+        if not self._enabled or not self._client:
+            return 0
+
+        try:
+            full_channel = self._make_key(channel, namespace)
+            return await self._client.publish(full_channel, json.dumps(value).encode('utf-8'))
+        except Exception as e:
+            logger.warning("redis_publish_error", channel=channel, error=str(e))
+            return 0
+
+    async def subscribe(self, *channels: str, namespace: str = "cat") -> "redis.client.PubSub | None":
+        """
+        Pub/sub handle listening on channels (as published by publish_json).
+
+        Returns None when Redis is disabled. Errors are propagated so that
+        listeners can retry.
+        """
+        if not self._enabled or not self._client:
+            return None
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(*(self._make_key(channel, namespace) for channel in channels))
+        except Exception:
+            await pubsub.aclose()
+            raise
+        return pubsub
+
 
 # Global instance
 _redis_cache: RedisCache | None = None
@@ -0,0 +1,79 @@
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def dumps(value: Any) -> bytes:
+    """Serialize to compact JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def merge_json_objects(base: bytes, extra: dict[str, Any]) -> bytes:
+    """Append the keys of extra to an already serialized JSON object."""
+    if not extra:
+        return base
+    tail = dumps(extra)
+    if base == b"{}":
+        return tail
+    return base[:-1] + b"," + tail[1:]
+
+
+class JSONBytesResponse(Response):
+    """
+    JSON response that accepts pre-serialized bytes.
+
+    Routes returning this skip FastAPI's response-model validation and
+    jsonable_encoder pass; plain values are serialized with dumps().
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+
+class SerializedResponseCache:
+    """
+    Process-local LRU of response bodies keyed by what makes them current.
+
+    Keys always embed a revision (or list-cache generation), so entries are
+    never invalidated explicitly: a new revision simply misses and the old
+    entry ages out.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
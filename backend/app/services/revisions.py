@@ -0,0 +1,62 @@
+from collections import OrderedDict
+
+from app.core.logger import get_logger
+from app.services.redis_client import RedisCache
+
+logger = get_logger(__name__)
+
+
+class RevisionTracker:
+    """
+    Tracks the latest committed revision of each workflow.
+
+    Polling endpoints use it to answer conditional GETs (If-None-Match)
+    without touching the database. When Redis is available it is the
+    shared source of truth across processes; otherwise a bounded
+    in-process map is used, which is only safe for a single process.
+    """
+
+    def __init__(self, cache: RedisCache, max_entries: int = 10_000, ttl_seconds: int = 86400):
+        self.cache = cache
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._local: OrderedDict[str, int] = OrderedDict()
+
+    @staticmethod
+    def _key(workflow_id: str) -> str:
+        return f"workflow_rev:{workflow_id}"
+
+    @property
+    def shared(self) -> bool:
+        return self.cache.enabled
+
+    async def get(self, workflow_id: str) -> int | None:
+        """Return the last known revision, or None if it must be read from the database."""
+        if self.shared:
+            return await self.cache.get_int(self._key(workflow_id))
+
+        revision = self._local.get(workflow_id)
+        if revision is not None:
+            self._local.move_to_end(workflow_id)
+        return revision
+
+    async def set(self, workflow_id: str, revision: int) -> None:
+        """
+        Record a committed revision.
+
+        Only ever advances: a reader that saw an older revision (replica
+        lag, a lost race) cannot move the tracker back behind a newer save.
+        """
+        if self.shared:
+            await self.cache.set_max(self._key(workflow_id), revision, ttl=self.ttl_seconds)
+            return
+
+        current = self._local.get(workflow_id)
+        if current is not None and current >= revision:
+            self._local.move_to_end(workflow_id)
+            return
+        self._local[workflow_id] = revision
+        self._local.move_to_end(workflow_id)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
@@ -0,0 +1,131 @@
+import asyncio
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.core.logger import get_logger
+from app.core.metrics import metrics
+from app.services.redis_client import RedisCache
+
+logger = get_logger(__name__)
+
+runs_coalesced_total = metrics.counter(
+    "workflow_runs_coalesced_total", "Duplicate graph runs answered by a run already in flight"
+)
+
+
+class WorkflowBusyError(Exception):
+    """A different change to the workflow is already being run."""
+
+    def __init__(self, workflow_id: str):
+        super().__init__(f"Workflow {workflow_id} is already being updated")
+        self.workflow_id = workflow_id
+
+
+class WorkflowRunCoordinator:
+    """
+    Allows at most one graph run per workflow at a time.
+
+    Concurrent requests carrying the same change (same fingerprint) await the
+    run already in flight and share its result instead of paying for a second
+    LLM pass; a different change is rejected with WorkflowBusyError. With
+    Redis enabled a lease extends this across API processes. Its value is
+    "<fingerprint>:<uuid>", so a request that finds the lease held elsewhere
+    can tell the two apart: the same change waits for the release and returns
+    the committed state from load_latest, and a different change is rejected
+    with WorkflowBusyError as in-process. The lease is heartbeated every third of
+    lease_ttl_seconds while the run lasts, so a process that dies mid-run
+    frees it within lease_ttl_seconds.
+    """
+
+    def __init__(
+        self,
+        cache: RedisCache,
+        lease_ttl_seconds: float = 60.0,
+        poll_interval_seconds: float = 0.1,
+    ):
+        self.cache = cache
+        self.lease_ttl_seconds = lease_ttl_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self._inflight: dict[str, tuple[str, asyncio.Future]] = {}
+
+    async def run(
+        self,
+        workflow_id: str,
+        fingerprint: str,
+        execute: Callable[[], Awaitable[Any]],
+        load_latest: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        inflight = self._inflight.get(workflow_id)
+        if inflight is not None:
+            running_fingerprint, future = inflight
+            if running_fingerprint != fingerprint:
+                raise WorkflowBusyError(workflow_id)
+            runs_coalesced_total.inc(scope="local")
+            # Shielded so a disconnecting duplicate cannot cancel the shared run.
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[workflow_id] = (fingerprint, future)
+        try:
+            result = await self._run_leased(workflow_id, fingerprint, execute, load_latest)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark retrieved; waiters (if any) still receive the exception.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(workflow_id, None)
+
+    async def _run_leased(
+        self,
+        workflow_id: str,
+        fingerprint: str,
+        execute: Callable[[], Awaitable[Any]],
+        load_latest: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        lease_key = f"workflow_lease:{workflow_id}"
+        token = f"{fingerprint}:{uuid.uuid4().hex}"
+        while True:
+            acquired = await self.cache.acquire_lease(lease_key, token, self.lease_ttl_seconds)
+            if acquired is None:
+                # No Redis: the in-flight map above is the only guard.
+                return await execute()
+            if acquired:
+                break
+
+            holder = await self.cache.lease_holder(lease_key)
+            if holder is None:
+                # Released between the two reads; try to take it.
+                continue
+            if holder.rpartition(":")[0] != fingerprint:
+                raise WorkflowBusyError(workflow_id)
+            runs_coalesced_total.inc(scope="remote")
+            logger.info("workflow_lease_wait", workflow_id=workflow_id)
+            await self._wait_for_release(lease_key)
+            return await load_latest()
+
+        heartbeat = asyncio.create_task(self._heartbeat(lease_key, token))
+        try:
+            return await execute()
+        finally:
+            heartbeat.cancel()
+            await self.cache.release_lease(lease_key, token)
+
+    async def _heartbeat(self, lease_key: str, token: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_ttl_seconds / 3)
+            if not await self.cache.extend_lease(lease_key, token, self.lease_ttl_seconds):
+                logger.warning("workflow_lease_lost", lease=lease_key)
+                return
+
+    async def _wait_for_release(self, lease_key: str) -> None:
+        # The holder heartbeats while it runs; the lease lapses within its TTL if the holder dies.
+        while await self.cache.exists(lease_key):
+            await asyncio.sleep(self.poll_interval_seconds)
@@ -0,0 +1,452 @@
+import asyncio
+import copy
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import Text, bindparam, case, func, inspect, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import flag_modified, set_committed_value
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.database import (
+    WorkflowABVariantMetrics,
+    WorkflowRecord,
+    WorkflowScriptVariant,
+    WorkflowThumbnailVariant,
+)
+from app.models.state import ContentWorkflowState
+from app.orchestration.workflow import ContentWorkflow
+
+AB_METRIC_FIELDS = ("style", "impressions", "clicks", "ctr", "avg_view_duration")
+
+
+def _variant_rows(variants: list[dict]) -> dict[str, dict[str, Any]]:
+    return {
+        variant["id"]: {"position": position, "data": variant}
+        for position, variant in enumerate(variants)
+    }
+
+
+def _ab_variant_rows(variants: list[dict]) -> dict[str, dict[str, Any]]:
+    rows = {}
+    for position, variant in enumerate(variants):
+        rows[variant["thumbnail_id"]] = {
+            "position": position,
+            "style": variant.get("style"),
+            "impressions": variant.get("impressions", 0),
+            "clicks": variant.get("clicks", 0),
+            "ctr": variant.get("ctr", 0.0),
+            "avg_view_duration": variant.get("avg_view_duration", 0),
+            "extra": {
+                key: value
+                for key, value in variant.items()
+                if key != "thumbnail_id" and key not in AB_METRIC_FIELDS
+            },
+        }
+    return rows
+
+
+def snapshot_patch(old: dict, new: dict) -> tuple[list[str], dict[str, Any], dict[str, dict[str, Any]]]:
+    """
+    Difference between two snapshots as (removed keys, replaced keys, nested patches).
+
+    A dict value that only gained or changed keys (e.g. ab_test after an A/B
+    check) becomes a nested patch of just those keys; anything else is
+    replaced whole.
+    """
+    removed = [key for key in old if key not in new]
+    replaced: dict[str, Any] = {}
+    nested: dict[str, dict[str, Any]] = {}
+    for key, value in new.items():
+        previous = old.get(key)
+        if key in old and previous == value:
+            continue
+        if isinstance(previous, dict) and isinstance(value, dict) and previous.keys() <= value.keys():
+            nested[key] = {sub: item for sub, item in value.items() if sub not in previous or previous[sub] != item}
+        else:
+            replaced[key] = value
+    return removed, replaced, nested
+
+
+def jsonb_patch_expression(
+    column: ColumnElement,
+    removed: list[str],
+    replaced: dict[str, Any],
+    nested: dict[str, dict[str, Any]],
+) -> ColumnElement:
+    """
+    SQL that turns the stored JSONB snapshot into the new one:
+    (column - removed) || replaced, then jsonb_set(..., '{key}', column->'key' || patch)
+    for every nested patch. Only the changed values are sent.
+    """
+    expression = column
+    if removed:
+        expression = expression.op("-", return_type=JSONB)(literal(removed, ARRAY(Text)))
+    if replaced:
+        expression = expression.op("||", return_type=JSONB)(literal(replaced, JSONB))
+    for key, patch in nested.items():
+        expression = func.jsonb_set(
+            expression,
+            literal([key], ARRAY(Text)),
+            column[key].op("||", return_type=JSONB)(literal(patch, JSONB)),
+            type_=JSONB,
+        )
+    return expression
+
+
+def _ab_variant_dict(row: WorkflowABVariantMetrics) -> dict:
+    return {
+        "thumbnail_id": row.thumbnail_id,
+        **{field: getattr(row, field) for field in AB_METRIC_FIELDS},
+        **copy.deepcopy(row.extra or {}),
+    }
+
+
+class WorkflowStateStore:
+    """
+    Maps ContentWorkflowState onto the workflows table.
+
+    In "json" mode the whole state lives in workflows.state_snapshot. In
+    "normalized" mode script variants, thumbnail variants and A/B variant
+    metrics move to their own tables and the snapshot keeps the remainder,
+    so a save only writes the rows that actually changed and /ab-status can
+    read just the A/B slice.
+
+    Reads work in both modes: a snapshot that still contains a slice (one
+    written in json mode) is used as is, and is split on its next save.
+
+    With jsonb_patches (PostgreSQL), a save of an existing workflow sends
+    only the changed keys as a JSONB patch in the versioned UPDATE instead
+    of the whole re-serialized snapshot. Loaded snapshots are then copied,
+    so in-place edits of a state cannot hide a change from the diff.
+    """
+
+    def __init__(self, storage: str = "json", jsonb_patches: bool = False):
+        self.normalized = storage == "normalized"
+        self.jsonb_patches = jsonb_patches
+
+    async def load(self, session: AsyncSession, record: WorkflowRecord) -> ContentWorkflowState:
+        return (await self.load_many(session, [record]))[record.id]
+
+    async def load_many(
+        self,
+        session: AsyncSession,
+        records: Sequence[WorkflowRecord],
+    ) -> dict[str, ContentWorkflowState]:
+        """Full states for records, reading each normalized table once for all of them."""
+        states: dict[str, ContentWorkflowState] = {}
+        split: list[str] = []
+        for record in records:
+            snapshot = copy.deepcopy(record.state_snapshot) if self.jsonb_patches else record.state_snapshot
+            if "script_variants" in snapshot:
+                states[record.id] = snapshot
+                continue
+            state = dict(snapshot)
+            state["script_variants"] = []
+            state["thumbnail_variants"] = []
+            if state.get("ab_test") is not None:
+                state["ab_test"] = {**state["ab_test"], "variants": []}
+            states[record.id] = state
+            split.append(record.id)
+
+        if not split:
+            return states
+
+        for model, key in (
+            (WorkflowScriptVariant, "script_variants"),
+            (WorkflowThumbnailVariant, "thumbnail_variants"),
+        ):
+            statement = (
+                select(model)
+                .where(model.workflow_id.in_(split))
+                .order_by(model.workflow_id, model.position)
+            )
+            for row in (await session.execute(statement)).scalars():
+                # Copied so in-place edits of the state still register as changes on save.
+                states[row.workflow_id][key].append(copy.deepcopy(row.data))
+
+        with_ab = [workflow_id for workflow_id in split if states[workflow_id].get("ab_test") is not None]
+        if with_ab:
+            for row in await self._ab_rows(session, with_ab):
+                states[row.workflow_id]["ab_test"]["variants"].append(_ab_variant_dict(row))
+
+        return states
+
+    async def load_ab_test(self, session: AsyncSession, record: WorkflowRecord) -> dict | None:
+        """Only the A/B test slice of the state."""
+        ab_test = record.state_snapshot.get("ab_test")
+        if not ab_test or "variants" in ab_test:
+            return ab_test
+        rows = await self._ab_rows(session, [record.id])
+        return {**ab_test, "variants": [_ab_variant_dict(row) for row in rows]}
+
+    async def write(self, session: AsyncSession, record: WorkflowRecord, state: ContentWorkflowState) -> None:
+        """Stage state on record (and, when normalized, the changed variant rows); the caller commits."""
+        if not self.normalized:
+            await self._write_snapshot(session, record, state)
+            return
+
+        ab_test = state.get("ab_test")
+        # A workflow that was never flushed cannot have rows yet.
+        is_new = inspect(record).transient or inspect(record).pending
+        await self._write_snapshot(session, record, self._core(state))
+
+        await self._sync(
+            session,
+            WorkflowScriptVariant,
+            record.id,
+            _variant_rows(state.get("script_variants") or []),
+            is_new,
+        )
+        await self._sync(
+            session,
+            WorkflowThumbnailVariant,
+            record.id,
+            _variant_rows(state.get("thumbnail_variants") or []),
+            is_new,
+        )
+        await self._sync(
+            session,
+            WorkflowABVariantMetrics,
+            record.id,
+            _ab_variant_rows((ab_test or {}).get("variants") or []),
+            is_new,
+            key_column="thumbnail_id",
+        )
+
+    async def after_commit(self, record: WorkflowRecord, state: ContentWorkflowState) -> None:
+        """Nothing left to write: the state was committed with the row."""
+
+    async def write_batch(
+        self,
+        session: AsyncSession,
+        records: Sequence[WorkflowRecord],
+        states: dict[str, ContentWorkflowState],
+        columns: dict[str, dict[str, Any]],
+    ) -> list[WorkflowRecord]:
+        """
+        Write many states in one UPDATE of workflows; the caller commits.
+
+        columns holds each record's new index columns (status, current_step,
+        updated_ts). Like write(), the UPDATE bumps revision and only matches
+        rows still at the revision they were loaded at; it returns the ids it
+        matched, and only those records are returned (and updated in the
+        session). Meant for changes that keep the variant sets as they are
+        (A/B checks): in normalized mode the written workflows' A/B metric
+        rows follow in one executemany UPDATE.
+        """
+        if not records:
+            return []
+        table = WorkflowRecord.__table__
+        snapshots = {
+            record.id: self._core(states[record.id]) if self.normalized else states[record.id] for record in records
+        }
+
+        def per_row(values: dict[str, Any], type_: Any = None) -> ColumnElement:
+            return case({key: literal(value, type_) for key, value in values.items()}, value=table.c.id)
+
+        snapshot_value: ColumnElement = per_row(snapshots, table.c.state_snapshot.type)
+        if self.jsonb_patches:
+            patches = {}
+            for record in records:
+                old, new = record.state_snapshot, snapshots[record.id]
+                if any(key not in new for key in old):
+                    break
+                patches[record.id] = {key: value for key, value in new.items() if key not in old or old[key] != value}
+            else:
+                # Only the changed top-level keys travel, merged in with ||.
+                snapshot_value = table.c.state_snapshot.op("||", return_type=JSONB)(per_row(patches, JSONB))
+
+        statement = (
+            update(table)
+            .where(
+                table.c.id.in_(list(snapshots)),
+                table.c.revision == per_row({record.id: record.revision or 0 for record in records}),
+            )
+            .values(
+                status=per_row({key: value["status"] for key, value in columns.items()}),
+                current_step=per_row({key: value["current_step"] for key, value in columns.items()}),
+                updated_ts=per_row({key: value["updated_ts"] for key, value in columns.items()}),
+                revision=table.c.revision + 1,
+                state_snapshot=snapshot_value,
+            )
+            .returning(table.c.id)
+        )
+        matched = set((await session.execute(statement)).scalars())
+        written = [record for record in records if record.id in matched]
+
+        for record in written:
+            for column, value in columns[record.id].items():
+                set_committed_value(record, column, value)
+            set_committed_value(record, "revision", (record.revision or 0) + 1)
+            snapshot = snapshots[record.id]
+            set_committed_value(record, "state_snapshot", copy.deepcopy(snapshot) if self.jsonb_patches else snapshot)
+
+        if self.normalized and written:
+            metrics_table = WorkflowABVariantMetrics.__table__
+            rows = [
+                {"b_workflow_id": record.id, "b_thumbnail_id": thumbnail_id, **values}
+                for record in written
+                for thumbnail_id, values in _ab_variant_rows(
+                    (states[record.id].get("ab_test") or {}).get("variants") or []
+                ).items()
+            ]
+            if rows:
+                await session.execute(
+                    update(metrics_table).where(
+                        metrics_table.c.workflow_id == bindparam("b_workflow_id"),
+                        metrics_table.c.thumbnail_id == bindparam("b_thumbnail_id"),
+                    ),
+                    rows,
+                )
+        return written
+
+    @staticmethod
+    def _core(state: ContentWorkflowState) -> dict:
+        """The part of state kept on the workflows row in normalized mode."""
+        core = {
+            key: value
+            for key, value in state.items()
+            if key not in ("script_variants", "thumbnail_variants")
+        }
+        ab_test = state.get("ab_test")
+        if ab_test is not None:
+            core["ab_test"] = {key: value for key, value in ab_test.items() if key != "variants"}
+        return core
+
+    async def _write_snapshot(self, session: AsyncSession, record: WorkflowRecord, snapshot: dict) -> None:
+        state = inspect(record)
+        if not self.jsonb_patches or state.transient or state.pending or "state_snapshot" not in state.dict:
+            record.state_snapshot = snapshot
+            flag_modified(record, "state_snapshot")
+            return
+
+        removed, replaced, nested = snapshot_patch(record.state_snapshot, snapshot)
+        if removed or replaced or nested:
+            record.state_snapshot = jsonb_patch_expression(WorkflowRecord.state_snapshot, removed, replaced, nested)
+            # Flushed here: an attribute set to SQL is expired afterwards and must not be lazy-loaded.
+            await session.flush()
+            set_committed_value(record, "state_snapshot", copy.deepcopy(snapshot))
+
+    async def _ab_rows(self, session: AsyncSession, workflow_ids: list[str]) -> list[WorkflowABVariantMetrics]:
+        statement = (
+            select(WorkflowABVariantMetrics)
+            .where(WorkflowABVariantMetrics.workflow_id.in_(workflow_ids))
+            .order_by(WorkflowABVariantMetrics.workflow_id, WorkflowABVariantMetrics.position)
+        )
+        return list((await session.execute(statement)).scalars())
+
+    async def _sync(
+        self,
+        session: AsyncSession,
+        model: type,
+        workflow_id: str,
+        wanted: dict[str, dict[str, Any]],
+        is_new: bool,
+        key_column: str = "variant_id",
+    ) -> None:
+        """
+        Insert, update or delete rows so the table matches wanted.
+
+        Values are assigned attribute by attribute; the ORM only emits an
+        UPDATE for rows whose values differ from what was loaded.
+        """
+        existing = {}
+        if not is_new:
+            statement = select(model).where(model.workflow_id == workflow_id)
+            existing = {getattr(row, key_column): row for row in (await session.execute(statement)).scalars()}
+
+        for key, values in wanted.items():
+            row = existing.pop(key, None)
+            if row is None:
+                session.add(model(workflow_id=workflow_id, **{key_column: key}, **values))
+                continue
+            for column, value in values.items():
+                if getattr(row, column) != value:
+                    setattr(row, column, value)
+
+        for row in existing.values():
+            await session.delete(row)
+
+
+# Scalars kept on the workflows row in checkpoint mode; the listing reads the columns.
+CHECKPOINT_INDEX_FIELDS = (
+    "workflow_id",
+    "user_id",
+    "topic",
+    "current_step",
+    "selected_script_id",
+    "selected_thumbnail_id",
+    "updated_ts",
+)
+
+
+class CheckpointStateStore:
+    """
+    Makes the LangGraph checkpoint the single copy of the workflow state.
+
+    The graph already checkpoints every step, so a save after a run only
+    updates the workflows row, which becomes a thin index (status columns,
+    revision and CHECKPOINT_INDEX_FIELDS). States written outside a run
+    (approval input, queued jobs, failures) are checkpointed with
+    ContentWorkflow.put_state after the index update commits, so reads never
+    see two diverging copies and a losing writer never reaches the checkpoint.
+
+    Workflows without a checkpoint (written in json or normalized mode) are
+    read from their snapshot.
+    """
+
+    def __init__(self, engine: ContentWorkflow, fallback: WorkflowStateStore | None = None):
+        self.engine = engine
+        self.fallback = fallback or WorkflowStateStore()
+
+    async def load(self, session: AsyncSession, record: WorkflowRecord) -> ContentWorkflowState:
+        state = await self.engine.get_state(record.id)
+        if not state:
+            return await self.fallback.load(session, record)
+        return state
+
+    async def load_many(
+        self,
+        session: AsyncSession,
+        records: Sequence[WorkflowRecord],
+    ) -> dict[str, ContentWorkflowState]:
+        """Checkpoints fetched together; workflows without one are read from their snapshots in one batch."""
+        checkpointed = await asyncio.gather(*(self.engine.get_state(record.id) for record in records))
+        states = {record.id: state for record, state in zip(records, checkpointed) if state}
+        missing = [record for record in records if record.id not in states]
+        if missing:
+            states.update(await self.fallback.load_many(session, missing))
+        return {record.id: states[record.id] for record in records}
+
+    async def load_ab_test(self, session: AsyncSession, record: WorkflowRecord) -> dict | None:
+        return (await self.load(session, record)).get("ab_test")
+
+    async def write(self, session: AsyncSession, record: WorkflowRecord, state: ContentWorkflowState) -> None:
+        """Stage the index row; the state itself is checkpointed by after_commit()."""
+        record.state_snapshot = {field: state.get(field) for field in CHECKPOINT_INDEX_FIELDS}
+        flag_modified(record, "state_snapshot")
+
+    async def after_commit(self, record: WorkflowRecord, state: ContentWorkflowState) -> None:
+        """
+        Checkpoint state unless it is what the graph last checkpointed.
+
+        Only called once the revision-checked index update committed, so a
+        writer that lost the race never overwrites the winner's checkpoint.
+        """
+        if await self.engine.get_state(record.id) != state:
+            await self.engine.put_state(record.id, state)
+
+    async def write_batch(
+        self,
+        session: AsyncSession,
+        records: Sequence[WorkflowRecord],
+        states: dict[str, ContentWorkflowState],
+        columns: dict[str, dict[str, Any]],
+    ) -> list[WorkflowRecord]:
+        """One UPDATE of the index rows; states are checkpointed by after_commit() for those written."""
+        index = {
+            record.id: {field: states[record.id].get(field) for field in CHECKPOINT_INDEX_FIELDS} for record in records
+        }
+        return await self.fallback.write_batch(session, records, index, columns)
@@ -0,0 +1,187 @@
+import asyncio
+import copy
+import time
+from collections import OrderedDict
+
+import httpx
+
+from app.agents.visual_engineer import VisualEngineerAgent
+from app.core.logger import get_logger
+from app.core.metrics import metrics
+from app.models.state import ContentWorkflowState, ThumbnailVariant
+from app.services.redis_client import RedisCache
+
+logger = get_logger(__name__)
+
+speculative_sets = metrics.counter(
+    "speculative_thumbnail_sets_total", "Thumbnail generations after approval, by whether a prepared set was used"
+)
+speculative_discarded = metrics.counter(
+    "speculative_thumbnail_sets_discarded_total", "Prepared thumbnail sets thrown away (script not chosen, expired)"
+)
+speculative_renders = metrics.counter("speculative_thumbnail_renders_total", "Speculative image renders, by result")
+speculative_skipped = metrics.counter(
+    "speculative_thumbnail_skipped_total", "Script variants not prepared speculatively, by reason"
+)
+
+
+class ThumbnailSpeculator:
+    """
+    Prepares thumbnails for every script variant while the scripts await approval.
+
+    schedule() is called when the graph stops at the script gate. In the
+    background it builds the thumbnail set of each script variant and
+    fetches each image URL once so the renderer has it cached, storing the
+    sets per workflow (in Redis when enabled, so any worker can use them).
+    take() is called by the thumbnail node after approval: it returns the
+    chosen script's set, if ready, and discards the rest.
+
+    Renders are the expensive part and are capped at renders_per_hour across
+    all workflows; a script whose renders do not fit the budget is skipped
+    and generated inline after approval as before.
+    """
+
+    def __init__(
+        self,
+        agent: VisualEngineerAgent,
+        cache: RedisCache,
+        renders_per_hour: int = 300,
+        concurrency: int = 4,
+        ttl_seconds: int = 3600,
+        render_timeout_seconds: float = 60.0,
+        max_local_entries: int = 1000,
+    ):
+        self.agent = agent
+        self.cache = cache
+        self.renders_per_hour = renders_per_hour
+        self.ttl_seconds = ttl_seconds
+        self.render_timeout_seconds = render_timeout_seconds
+        self.max_local_entries = max_local_entries
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._tasks: dict[str, asyncio.Task] = {}
+        # Used without Redis: workflow_id -> (expires_at, {script_id: thumbnails}).
+        self._local: OrderedDict[str, tuple[float, dict[str, list[ThumbnailVariant]]]] = OrderedDict()
+        self._window = (0, 0)  # (hour, renders reserved) when Redis is unavailable
+
+    @staticmethod
+    def _key(workflow_id: str) -> str:
+        return f"speculative_thumbnails:{workflow_id}"
+
+    def schedule(self, state: ContentWorkflowState) -> None:
+        """Start preparing thumbnails for state's script variants, replacing earlier work."""
+        workflow_id = state["workflow_id"]
+        previous = self._tasks.pop(workflow_id, None)
+        if previous is not None:
+            previous.cancel()
+        snapshot = {
+            "workflow_id": workflow_id,
+            "topic": state["topic"],
+            "script_variants": copy.deepcopy(state.get("script_variants") or []),
+        }
+        task = asyncio.create_task(self.prepare(snapshot), name=f"speculative-thumbnails-{workflow_id}")
+        self._tasks[workflow_id] = task
+        task.add_done_callback(lambda done: self._forget(workflow_id, done))
+
+    def _forget(self, workflow_id: str, task: asyncio.Task) -> None:
+        if self._tasks.get(workflow_id) is task:
+            del self._tasks[workflow_id]
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("speculative_thumbnails_failed", workflow_id=workflow_id, error=str(task.exception()))
+
+    async def prepare(self, state: ContentWorkflowState) -> int:
+        """Build and render the set of each script variant; returns how many were stored."""
+        workflow_id = state["workflow_id"]
+        await self._discard(workflow_id)
+        prepared: dict[str, list[ThumbnailVariant]] = {}
+        async with httpx.AsyncClient(timeout=self.render_timeout_seconds) as client:
+            for script in state["script_variants"]:
+                thumbnails = self.agent.build_thumbnails(state, script)
+                if not await self._reserve(len(thumbnails)):
+                    speculative_skipped.inc(reason="budget")
+                    continue
+                await asyncio.gather(*(self._render(client, thumbnail["image_url"]) for thumbnail in thumbnails))
+                prepared[script["id"]] = thumbnails
+                # Stored after each script so an early approval can already use it.
+                await self._store(workflow_id, prepared)
+        logger.info("speculative_thumbnails_prepared", workflow_id=workflow_id, scripts=len(prepared))
+        return len(prepared)
+
+    async def take(self, workflow_id: str, script_id: str | None) -> list[ThumbnailVariant] | None:
+        """The prepared set for script_id, or None; every other prepared set is discarded."""
+        task = self._tasks.pop(workflow_id, None)
+        if task is not None:
+            task.cancel()
+        prepared = await self._load(workflow_id)
+        await self._delete(workflow_id)
+
+        thumbnails = prepared.pop(script_id, None) if script_id else None
+        speculative_sets.inc(result="hit" if thumbnails is not None else "miss")
+        if prepared:
+            speculative_discarded.inc(len(prepared))
+        return thumbnails
+
+    async def drain(self) -> None:
+        """Wait for in-flight preparations to finish."""
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def close(self) -> None:
+        for task in list(self._tasks.values()):
+            task.cancel()
+        await self.drain()
+        self._tasks.clear()
+
+    async def _render(self, client: httpx.AsyncClient, url: str) -> None:
+        async with self._semaphore:
+            try:
+                response = await client.get(url)
+                response.raise_for_status()
+                speculative_renders.inc(result="ok")
+            except httpx.HTTPError as exc:
+                # The URL is still valid; it renders when the browser first loads it.
+                speculative_renders.inc(result="error")
+                logger.debug("speculative_thumbnail_render_failed", error=str(exc))
+
+    async def _reserve(self, renders: int) -> bool:
+        hour = int(time.time() // 3600)
+        if self.cache.enabled:
+            key = f"speculative_thumbnail_budget:{hour}"
+            used = await self.cache.increment(key, renders)
+            if used == renders:
+                await self.cache.expire(key, 3600)
+            return used <= self.renders_per_hour
+
+        window_hour, used = self._window
+        if window_hour != hour:
+            used = 0
+        if used + renders > self.renders_per_hour:
+            return False
+        self._window = (hour, used + renders)
+        return True
+
+    async def _load(self, workflow_id: str) -> dict[str, list[ThumbnailVariant]]:
+        if self.cache.enabled:
+            return await self.cache.get_json(self._key(workflow_id)) or {}
+        expires_at, prepared = self._local.get(workflow_id, (0.0, {}))
+        return dict(prepared) if expires_at > time.monotonic() else {}
+
+    async def _store(self, workflow_id: str, prepared: dict[str, list[ThumbnailVariant]]) -> None:
+        if self.cache.enabled:
+            await self.cache.set_json(self._key(workflow_id), prepared, ttl=self.ttl_seconds)
+            return
+        self._local[workflow_id] = (time.monotonic() + self.ttl_seconds, dict(prepared))
+        self._local.move_to_end(workflow_id)
+        while len(self._local) > self.max_local_entries:
+            _, (_, evicted) = self._local.popitem(last=False)
+            speculative_discarded.inc(len(evicted))
+
+    async def _delete(self, workflow_id: str) -> None:
+        if self.cache.enabled:
+            await self.cache.delete(self._key(workflow_id))
+            return
+        self._local.pop(workflow_id, None)
+
+    async def _discard(self, workflow_id: str) -> None:
+        stale = await self._load(workflow_id)
+        if stale:
+            speculative_discarded.inc(len(stale))
+            await self._delete(workflow_id)
@@ -0,0 +1,223 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+
+from app.core.logger import get_logger
+from app.core.metrics import metrics
+from app.services.redis_client import RedisCache
+
+logger = get_logger(__name__)
+
+WORKERS_KEY = "workflow_workers"
+
+ownership_claims = metrics.counter("workflow_ownership_claims_total", "Ownership checks by queue workers, by result")
+ownership_takeovers = metrics.counter(
+    "workflow_ownership_takeovers_total", "Workflows requeued after their owning worker stopped heartbeating"
+)
+owned_workflows = metrics.gauge("workflow_owned", "Workflows owned by this worker")
+
+
+def worker_queue_key(worker_id: str) -> str:
+    """Redis list holding the jobs routed to one worker."""
+    return f"workflow_jobs:{worker_id}"
+
+
+def worker_processing_key(worker_id: str) -> str:
+    """Redis list holding the jobs one worker has popped but not finished yet."""
+    return f"workflow_jobs:{worker_id}:processing"
+
+
+def new_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+def _owner_key(workflow_id: str) -> str:
+    return f"workflow_owner:{workflow_id}"
+
+
+def _heartbeat_key(worker_id: str) -> str:
+    return f"workflow_worker:{worker_id}"
+
+
+def _owned_key(worker_id: str) -> str:
+    return f"workflow_worker_owned:{worker_id}"
+
+
+class WorkflowOwnership:
+    """
+    Per-workflow ownership leases for queue workers in several processes.
+
+    A worker owns a workflow through an expiring Redis lease
+    (workflow_owner:<id> = worker id) that it heartbeats every third of
+    ttl_seconds while it runs jobs for it, and for idle_seconds after the
+    last one, so a burst of jobs for one workflow stays on one worker and
+    its LLM calls are never paid twice. Jobs for an owned workflow are
+    routed to the owner's own queue.
+
+    Workers heartbeat a key of their own as well. When it expires (crash,
+    kill -9) another worker takes over: the dead worker's queue, the jobs it
+    had popped but not finished, and the workflows it owned are pushed back
+    onto the shared queue, and the first
+    worker to pick them up becomes their owner once the old leases expire.
+    """
+
+    def __init__(
+        self,
+        cache: RedisCache,
+        shared_queue_key: str,
+        ttl_seconds: float = 30.0,
+        idle_seconds: float | None = None,
+        worker_id: str | None = None,
+    ):
+        self.cache = cache
+        self.shared_queue_key = shared_queue_key
+        self.ttl_seconds = ttl_seconds
+        self.idle_seconds = ttl_seconds if idle_seconds is None else idle_seconds
+        self.worker_id = worker_id or new_worker_id()
+        # workflow_id -> (jobs running, monotonic time of the last job end)
+        self._owned: dict[str, tuple[int, float]] = {}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def queue_key(self) -> str:
+        return worker_queue_key(self.worker_id)
+
+    async def start(self) -> None:
+        await self.cache.acquire_lease(_heartbeat_key(self.worker_id), self.worker_id, self.ttl_seconds)
+        await self.cache.add_members(WORKERS_KEY, self.worker_id)
+        self._task = asyncio.create_task(self._loop(), name="workflow-ownership-heartbeat")
+        logger.info("workflow_worker_registered", worker_id=self.worker_id)
+
+    async def close(self) -> None:
+        """Hand pending jobs back to the shared queue and release every lease."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.cache.move_list(self.queue_key, self.shared_queue_key)
+        for workflow_id in list(self._owned):
+            await self._release(workflow_id)
+        await self.cache.delete(_owned_key(self.worker_id))
+        await self.cache.remove_members(WORKERS_KEY, self.worker_id)
+        await self.cache.release_lease(_heartbeat_key(self.worker_id), self.worker_id)
+
+    async def owner(self, workflow_id: str) -> str | None:
+        """The live worker owning workflow_id, if any."""
+        holder = await self.cache.lease_holder(_owner_key(workflow_id))
+        if holder is None or holder == self.worker_id:
+            return holder
+        # A lease outliving its worker's heartbeat is about to expire; nobody to route to.
+        return holder if await self.cache.exists(_heartbeat_key(holder)) else None
+
+    async def route(self, workflow_id: str) -> str:
+        """Queue a new job for workflow_id goes to: its owner's, or the shared one."""
+        holder = await self.owner(workflow_id)
+        return worker_queue_key(holder) if holder else self.shared_queue_key
+
+    async def claim(self, workflow_id: str) -> str | None:
+        """
+        Own workflow_id for a job, or report who does.
+
+        Returns this worker's id when the job may run here (call done()
+        afterwards), another live worker's id when the job belongs there, or
+        None when the lease is held by a dead worker (or vanished meanwhile)
+        and the job should be retried shortly.
+        """
+        acquired = await self.cache.acquire_lease(_owner_key(workflow_id), self.worker_id, self.ttl_seconds)
+        if acquired or workflow_id in self._owned:
+            holder = self.worker_id if acquired else await self.owner(workflow_id)
+            if holder == self.worker_id:
+                running, _ = self._owned.get(workflow_id, (0, 0.0))
+                self._owned[workflow_id] = (running + 1, time.monotonic())
+                if acquired:
+                    await self.cache.add_members(_owned_key(self.worker_id), workflow_id)
+                    owned_workflows.set(len(self._owned))
+                ownership_claims.inc(result="owned")
+                return self.worker_id
+            # Our lease expired and someone else took the workflow.
+            self._forget(workflow_id)
+
+        holder = await self.owner(workflow_id)
+        ownership_claims.inc(result="elsewhere" if holder else "retry")
+        return holder
+
+    def done(self, workflow_id: str) -> None:
+        """A job claimed with claim() finished; the lease is kept for idle_seconds."""
+        entry = self._owned.get(workflow_id)
+        if entry is not None:
+            self._owned[workflow_id] = (max(0, entry[0] - 1), time.monotonic())
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl_seconds / 3)
+            try:
+                await self.heartbeat()
+                await self.reap()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("workflow_ownership_heartbeat_failed", error=str(exc))
+
+    async def heartbeat(self) -> None:
+        """Keep this worker and its active workflows alive; let idle leases go."""
+        heartbeat_key = _heartbeat_key(self.worker_id)
+        if not await self.cache.extend_lease(heartbeat_key, self.worker_id, self.ttl_seconds):
+            # Expired after a stall: register again so other workers stop reaping us.
+            logger.warning("workflow_worker_heartbeat_lost", worker_id=self.worker_id)
+            await self.cache.acquire_lease(heartbeat_key, self.worker_id, self.ttl_seconds)
+            await self.cache.add_members(WORKERS_KEY, self.worker_id)
+
+        now = time.monotonic()
+        for workflow_id, (running, last_active) in list(self._owned.items()):
+            if not running and now - last_active >= self.idle_seconds:
+                await self._release(workflow_id)
+            elif not await self.cache.extend_lease(_owner_key(workflow_id), self.worker_id, self.ttl_seconds):
+                logger.warning("workflow_ownership_lost", workflow_id=workflow_id, worker_id=self.worker_id)
+                self._forget(workflow_id)
+
+    async def reap(self) -> int:
+        """Requeue the work of workers whose heartbeat expired; returns how many workers were reaped."""
+        reaped = 0
+        for worker_id in await self.cache.members(WORKERS_KEY) - {self.worker_id}:
+            if await self.cache.exists(_heartbeat_key(worker_id)):
+                continue
+            # One reaper per dead worker; the others skip it.
+            reap_lease = f"workflow_reap:{worker_id}"
+            if not await self.cache.acquire_lease(reap_lease, self.worker_id, self.ttl_seconds):
+                continue
+            moved = await self.cache.move_list(worker_processing_key(worker_id), self.shared_queue_key)
+            moved += await self.cache.move_list(worker_queue_key(worker_id), self.shared_queue_key)
+            orphaned = await self.cache.members(_owned_key(worker_id))
+            for workflow_id in orphaned:
+                # Jobs for workflows that are no longer queued are skipped by the worker.
+                await self.cache.push_json(
+                    self.shared_queue_key, {"workflow_id": workflow_id, "enqueued_at": time.time()}
+                )
+            await self.cache.delete(_owned_key(worker_id))
+            await self.cache.remove_members(WORKERS_KEY, worker_id)
+            ownership_takeovers.inc(len(orphaned))
+            logger.warning("workflow_worker_reaped", worker_id=worker_id, jobs=moved, workflows=len(orphaned))
+            reaped += 1
+        return reaped
+
+    async def _release(self, workflow_id: str) -> None:
+        await self.cache.release_lease(_owner_key(workflow_id), self.worker_id)
+        await self.cache.remove_members(_owned_key(self.worker_id), workflow_id)
+        self._forget(workflow_id)
+
+    def _forget(self, workflow_id: str) -> None:
+        self._owned.pop(workflow_id, None)
+        owned_workflows.set(len(self._owned))
+
+    async def stats(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "owned": len(self._owned),
+            "workers": len(await self.cache.members(WORKERS_KEY)),
+            "takeovers": int(ownership_takeovers.value()),
+        }
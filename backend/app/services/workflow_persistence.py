@@ -0,0 +1,243 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.models.database import WorkflowArchiveRecord, WorkflowRecord
+from app.services.ab_timeline import record_ab_samples, record_ab_samples_many
+from app.models.state import ContentWorkflowState, WorkflowStatusResponse
+from app.services.events import WorkflowEventBus
+from app.services.redis_client import RedisCache
+from app.services.revisions import RevisionTracker
+from app.services.state_store import CheckpointStateStore, WorkflowStateStore
+
+
+class WorkflowConflictError(Exception):
+    """The workflow was committed by another writer since it was loaded."""
+
+    def __init__(self, workflow_id: str):
+        super().__init__(f"Workflow {workflow_id} was modified concurrently")
+        self.workflow_id = workflow_id
+
+
+def map_status(step: str) -> str:
+    if step == "completed":
+        return "completed"
+    if step == "awaiting_approval":
+        return "awaiting_approval"
+    if step == "awaiting_thumbnail_selection":
+        return "awaiting_thumbnail_selection"
+    if step in ["ab_testing", "ab_test_complete"]:
+        return "ab_testing"
+    if step in ["queued", "failed"]:
+        return step
+    return "running"
+
+
+def to_status_response(state: dict) -> WorkflowStatusResponse:
+    step = state.get("current_step", "unknown")
+    if step == "awaiting_approval":
+        requires_action = "script_approval"
+    elif step == "awaiting_thumbnail_selection":
+        requires_action = "thumbnail_selection"
+    elif step in ["ab_testing", "ab_test_complete"]:
+        requires_action = "ab_test_monitoring"
+    else:
+        requires_action = None
+
+    return WorkflowStatusResponse(
+        workflow_id=state["workflow_id"],
+        status=map_status(step),
+        current_step=step,
+        requires_action=requires_action,
+        scripts=state.get("script_variants", []),
+        selected_script_id=state.get("selected_script_id"),
+        thumbnails=state.get("thumbnail_variants", []),
+        selected_thumbnail_id=state.get("selected_thumbnail_id"),
+        token_usage=state.get("token_usage", {}),
+    )
+
+
+def final_results(state: dict) -> dict:
+    """Winning script and thumbnail plus A/B summary of a completed workflow."""
+    # Find winning script
+    scripts = state.get("script_variants", [])
+    winning_script = next(
+        (s for s in scripts if s["id"] == state.get("selected_script_id")),
+        None,
+    )
+
+    # Find winning thumbnail
+    thumbnails = state.get("thumbnail_variants", [])
+    winning_thumb = next(
+        (t for t in thumbnails if t["id"] == state.get("selected_thumbnail_id")),
+        None,
+    )
+
+    ab_stats = state.get("ab_test", {})
+    final_stats = ab_stats.get("final_stats", {})
+
+    return {
+        "workflow_id": state["workflow_id"],
+        "topic": state["topic"],
+        "status": "completed",
+        "winning_content": {
+            "script": winning_script,
+            "thumbnail": winning_thumb,
+            "combined_ctr": final_stats.get("treatment_ctr")
+            or (
+                max(ab_stats.get("variants", []), key=lambda x: x["ctr"], default={}).get("ctr")
+                if ab_stats.get("variants")
+                else None
+            ),
+        },
+        "ab_test_summary": {
+            "duration_hours": (ab_stats.get("last_updated", 0) - ab_stats.get("started_at", 0))
+            / 3600,
+            "total_impressions": ab_stats.get("total_impressions"),
+            "confidence_reached": ab_stats.get("confidence", 0),
+            "was_manual_override": ab_stats.get("status") == "manual_override",
+        },
+        "export_ready": True,
+    }
+
+
+def status_cache_key(workflow_id: str) -> str:
+    return f"workflow_status:{workflow_id}"
+
+
+def status_cache_entry(record: WorkflowRecord | WorkflowArchiveRecord, state: ContentWorkflowState) -> dict:
+    return {
+        "revision": record.revision,
+        "status": to_status_response(state).model_dump(),
+    }
+
+
+def list_cache_scope(user_id: str | None) -> str:
+    return f"workflows_list:{user_id or 'all'}"
+
+
+class WorkflowPersistence:
+    """
+    Commits workflow state and propagates the new revision.
+
+    Shared by the API routes and the background job workers so that every
+    write bumps the revision, refreshes the status cache, invalidates the
+    owner's list cache and notifies live subscribers the same way.
+    """
+
+    def __init__(
+        self,
+        cache: RedisCache,
+        revisions: RevisionTracker,
+        events: WorkflowEventBus,
+        state_store: WorkflowStateStore | CheckpointStateStore | None = None,
+    ):
+        self.cache = cache
+        self.revisions = revisions
+        self.events = events
+        self.state_store = state_store or WorkflowStateStore()
+
+    async def load_state(self, session: AsyncSession, record: WorkflowRecord) -> ContentWorkflowState:
+        return await self.state_store.load(session, record)
+
+    async def load_states(
+        self,
+        session: AsyncSession,
+        records: list[WorkflowRecord],
+    ) -> dict[str, ContentWorkflowState]:
+        return await self.state_store.load_many(session, records)
+
+    async def load_ab_test(self, session: AsyncSession, record: WorkflowRecord) -> dict | None:
+        return await self.state_store.load_ab_test(session, record)
+
+    async def ensure_current(self, record: WorkflowRecord) -> None:
+        """
+        Raise WorkflowConflictError if a newer revision is already known.
+
+        Checked before paying for a graph run; save() enforces the same rule
+        in the database.
+        """
+        latest = await self.revisions.get(record.id)
+        if latest is not None and latest > (record.revision or 0):
+            raise WorkflowConflictError(record.id)
+
+    async def save(
+        self,
+        session: AsyncSession,
+        record: WorkflowRecord,
+        state: ContentWorkflowState,
+    ) -> None:
+        """
+        Write the graph result back to the record and publish the new revision.
+
+        The UPDATE is conditional on the revision the record was loaded at;
+        WorkflowConflictError is raised (and the session rolled back) if
+        another writer got there first.
+        """
+        workflow_id = state["workflow_id"]
+        record.status = map_status(state["current_step"])
+        record.current_step = state["current_step"]
+        record.updated_ts = state["updated_ts"]
+        record.revision = (record.revision or 0) + 1
+
+        session.add(record)
+        try:
+            await self.state_store.write(session, record, state)
+            if state.get("ab_test"):
+                await record_ab_samples(session, workflow_id, state["ab_test"])
+            await session.commit()
+        except StaleDataError as exc:
+            await session.rollback()
+            raise WorkflowConflictError(workflow_id) from exc
+        await self.state_store.after_commit(record, state)
+        await self._publish(record, state)
+        # Only this user's listings (and the unfiltered one) go stale.
+        await self.cache.bump_generation(list_cache_scope(record.user_id), list_cache_scope(None))
+
+    async def save_batch(
+        self,
+        session: AsyncSession,
+        records: list[WorkflowRecord],
+        states: dict[str, ContentWorkflowState],
+    ) -> list[WorkflowRecord]:
+        """
+        save() for many workflows in one versioned UPDATE (plus one sample INSERT).
+
+        A workflow another writer changed since it was loaded is skipped
+        instead of raising WorkflowConflictError; the saved records are returned.
+        """
+        columns = {
+            record.id: {
+                "status": map_status(states[record.id]["current_step"]),
+                "current_step": states[record.id]["current_step"],
+                "updated_ts": states[record.id]["updated_ts"],
+            }
+            for record in records
+        }
+        written = await self.state_store.write_batch(session, records, states, columns)
+        await record_ab_samples_many(
+            session,
+            {record.id: states[record.id]["ab_test"] for record in written if states[record.id].get("ab_test")},
+        )
+        await session.commit()
+
+        for record in written:
+            await self.state_store.after_commit(record, states[record.id])
+            await self._publish(record, states[record.id])
+        if written:
+            users = {record.user_id for record in written}
+            await self.cache.bump_generation(*(list_cache_scope(user) for user in users), list_cache_scope(None))
+        return written
+
+    async def _publish(self, record: WorkflowRecord, state: ContentWorkflowState) -> None:
+        await self.revisions.set(record.id, record.revision)
+        await self.cache.set_json_if_newer(status_cache_key(record.id), status_cache_entry(record, state))
+        await self.events.publish(
+            {
+                "workflow_id": record.id,
+                "revision": record.revision,
+                "status": record.status,
+                "current_step": state["current_step"],
+                "updated_ts": record.updated_ts,
+                "ab_test": state.get("ab_test"),
+            }
+        )
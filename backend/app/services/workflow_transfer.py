@@ -0,0 +1,227 @@
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.logger import get_logger
+from app.models.database import SessionLocal, WorkflowArchiveRecord, WorkflowRecord
+from app.models.state import ContentWorkflowState
+from app.services.ab_timeline import insert_ab_samples, load_ab_samples
+from app.services.archive import read_payload
+from app.services.response_cache import dumps
+from app.services.workflow_persistence import (
+    WorkflowPersistence,
+    final_results,
+    list_cache_scope,
+    map_status,
+)
+
+logger = get_logger(__name__)
+
+# Rows per fetch from the server-side cursor, and records per INSERT batch on import.
+EXPORT_CHUNK_SIZE = 500
+IMPORT_BATCH_SIZE = 500
+# Import errors reported back in the response body; the rest are only counted.
+MAX_REPORTED_ERRORS = 100
+SAMPLE_FIELDS = frozenset({"variant_id", "ts", "impressions", "clicks"})
+
+
+def _export_line(
+    record: WorkflowRecord | WorkflowArchiveRecord,
+    state: ContentWorkflowState,
+    ab_samples: list[dict[str, Any]],
+    archived: bool,
+) -> bytes:
+    return dumps(
+        {
+            "workflow_id": record.id,
+            "user_id": record.user_id,
+            "topic": record.topic,
+            "target_platforms": state.get("target_platforms", []),
+            "status": record.status,
+            "current_step": record.current_step,
+            "created_ts": record.created_ts,
+            "updated_ts": record.updated_ts,
+            "revision": record.revision,
+            "archived": archived,
+            "state": state,
+            "results": final_results(state) if state.get("current_step") == "completed" else None,
+            "ab_samples": ab_samples,
+        }
+    ) + b"\n"
+
+
+async def export_ndjson(
+    persistence: WorkflowPersistence,
+    user_id: str | None = None,
+    include_archived: bool = True,
+    session_factory: async_sessionmaker[AsyncSession] = SessionLocal,
+) -> AsyncIterator[bytes]:
+    """
+    Yield every workflow as one NDJSON line, hot rows first, then archived ones.
+
+    Each line carries the workflow's A/B metric samples, so an import
+    restores its /ab-timeline. Rows come from a server-side cursor
+    EXPORT_CHUNK_SIZE at a time; each chunk's states and samples are loaded
+    in one batch and dropped from the session before the next fetch, so
+    memory does not grow with the row count.
+    """
+    async with session_factory() as stream_session, session_factory() as load_session:
+        statement = select(WorkflowRecord).order_by(WorkflowRecord.created_ts, WorkflowRecord.id)
+        if user_id:
+            statement = statement.where(WorkflowRecord.user_id == user_id)
+        result = await stream_session.stream_scalars(statement.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        async for records in result.partitions():
+            states = await persistence.load_states(load_session, records)
+            samples = await load_ab_samples(load_session, [record.id for record in records])
+            yield b"".join(
+                _export_line(record, states[record.id], samples[record.id], archived=False) for record in records
+            )
+            stream_session.expunge_all()
+            load_session.expunge_all()
+
+        if not include_archived:
+            return
+
+        statement = select(WorkflowArchiveRecord).order_by(WorkflowArchiveRecord.created_ts, WorkflowArchiveRecord.id)
+        if user_id:
+            statement = statement.where(WorkflowArchiveRecord.user_id == user_id)
+        result = await stream_session.stream_scalars(statement.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        async for records in result.partitions():
+            yield b"".join(_export_line(record, *read_payload(record), archived=True) for record in records)
+            stream_session.expunge_all()
+
+
+async def _ndjson_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, bytes]]:
+    """Split a byte stream into (line number, line) pairs without buffering the whole body."""
+    pending = b""
+    line_number = 0
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+    if pending.strip():
+        yield line_number + 1, pending
+
+
+def _parse_line(line: bytes) -> dict[str, Any]:
+    item = json.loads(line)
+    state = item["state"]
+    if not isinstance(state, dict) or not state.get("workflow_id"):
+        raise ValueError("state.workflow_id is required")
+    samples = item.setdefault("ab_samples", [])
+    if not isinstance(samples, list) or not all(
+        isinstance(sample, dict) and SAMPLE_FIELDS <= sample.keys() for sample in samples
+    ):
+        raise ValueError(f"ab_samples must be a list of objects with {', '.join(sorted(SAMPLE_FIELDS))}")
+    item["workflow_id"] = state["workflow_id"]
+    return item
+
+
+async def import_ndjson(
+    chunks: AsyncIterable[bytes],
+    persistence: WorkflowPersistence,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    session_factory: async_sessionmaker[AsyncSession] = SessionLocal,
+) -> dict[str, Any]:
+    """
+    Insert workflows from an export stream, batch_size records per transaction.
+
+    Workflows that already exist (hot or archived) are skipped, so an import
+    can be re-run after a partial failure. Malformed lines are reported and
+    skipped. A/B metric samples are inserted with their workflow; lines
+    from older exports without ab_samples import with an empty timeline.
+    """
+    totals: dict[str, Any] = {"imported": 0, "skipped": 0, "failed": 0, "errors": []}
+    users: set[str] = set()
+    batch: dict[str, dict[str, Any]] = {}
+
+    async def flush() -> None:
+        inserted = await _insert_batch(list(batch.values()), persistence, session_factory)
+        totals["imported"] += len(inserted)
+        totals["skipped"] += len(batch) - len(inserted)
+        users.update(record.user_id for record in inserted)
+        batch.clear()
+
+    async for line_number, line in _ndjson_lines(chunks):
+        try:
+            item = _parse_line(line)
+        except (ValueError, KeyError, TypeError) as exc:
+            totals["failed"] += 1
+            if len(totals["errors"]) < MAX_REPORTED_ERRORS:
+                totals["errors"].append({"line": line_number, "error": str(exc)})
+            continue
+        if item["workflow_id"] in batch:
+            totals["skipped"] += 1
+            continue
+        batch[item["workflow_id"]] = item
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+
+    if users:
+        await persistence.cache.bump_generation(*(list_cache_scope(user) for user in users), list_cache_scope(None))
+    logger.info("workflows_imported", imported=totals["imported"], skipped=totals["skipped"], failed=totals["failed"])
+    return totals
+
+
+async def _insert_batch(
+    items: list[dict[str, Any]],
+    persistence: WorkflowPersistence,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> list[WorkflowRecord]:
+    ids = [item["workflow_id"] for item in items]
+    async with session_factory() as session:
+        existing = set(
+            (await session.execute(select(WorkflowRecord.id).where(WorkflowRecord.id.in_(ids)))).scalars()
+        )
+        existing.update(
+            (await session.execute(select(WorkflowArchiveRecord.id).where(WorkflowArchiveRecord.id.in_(ids)))).scalars()
+        )
+
+        records, states, samples = [], [], []
+        for item in items:
+            if item["workflow_id"] in existing:
+                continue
+            state = item["state"]
+            step = state.get("current_step") or item.get("current_step") or "init"
+            record = WorkflowRecord(
+                id=item["workflow_id"],
+                user_id=item.get("user_id") or state.get("user_id") or "",
+                topic=item.get("topic") or state.get("topic") or "",
+                target_platforms=state.get("target_platforms") or item.get("target_platforms") or [],
+                status=map_status(step),
+                current_step=step,
+                created_ts=item.get("created_ts") or state.get("created_ts") or 0,
+                updated_ts=state.get("updated_ts") or item.get("updated_ts") or 0,
+                revision=item.get("revision") or 1,
+            )
+            # Goes through the state store so normalized/checkpoint storage get their rows too.
+            await persistence.state_store.write(session, record, state)
+            records.append(record)
+            states.append(state)
+            samples.extend(
+                {
+                    "workflow_id": record.id,
+                    "variant_id": sample["variant_id"],
+                    "ts": sample["ts"],
+                    "impressions": sample["impressions"],
+                    "clicks": sample["clicks"],
+                }
+                for sample in item["ab_samples"]
+            )
+
+        # One multi-row INSERT per table for the whole batch (SQLAlchemy insertmanyvalues).
+        session.add_all(records)
+        await session.flush()
+        await insert_ab_samples(session, samples)
+        await session.commit()
+    for record, state in zip(records, states):
+        await persistence.state_store.after_commit(record, state)
+    return records
@@ -3,6 +3,7 @@ import googleapiclient.discovery
 import googleapiclient.errors
 
 from app.core.config import get_settings
+from app.core.instrumentation import external_call, record_fallback
 from app.core.logger import get_logger
 from app.services.redis_client import get_redis_cache
 
@@ -48,7 +49,8 @@ class YouTubeClient:
                 maxResults=5,
                 order="viewCount"
             )
-            search_response = search_request.execute()
+            with external_call("youtube"):
+                search_response = search_request.execute()
 
             if not search_response.get("items"):
                 return self._mock_analytics(query)
@@ -62,7 +64,8 @@ class YouTubeClient:
                 part="statistics,contentDetails",
                 id=",".join(video_ids)
             )
-            stats_response = stats_request.execute()
+            with external_call("youtube"):
+                stats_response = stats_request.execute()
 
             # Aggregate statistics
             total_views = 0
@@ -98,6 +101,7 @@ class YouTubeClient:
 
     def _mock_analytics(self, query: str) -> dict[str, Any]:
         """Return fake data if API fails or is not configured."""
+        record_fallback("mock_youtube_analytics")
         import random
         rng = random.Random(query)
         return {
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: per-request CPU of hot read endpoints, with and without FAST_JSON_RESPONSES.
+
+Polls /status, /ab-status and the workflow listing against a throwaway
+SQLite database. CPU is measured with time.process_time(), so the numbers
+cover routing, model construction and serialization on both the client
+and server threads, not wall-clock waits.
+
+Run: python scripts/bench_fast_json.py [--requests 2000]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_status_batch import _snapshot  # noqa: E402
+
+
+def _ab_test(variant_count: int = 4) -> dict:
+    now = time.time()
+    return {
+        "started_at": now - 1800,
+        "last_updated": now,
+        "status": "running",
+        "variants": [
+            {
+                "thumbnail_id": f"thumb-{index}",
+                "style": "bold",
+                "impressions": 1000 + index,
+                "clicks": 50 + index,
+                "ctr": 0.05,
+                "avg_view_duration": 42,
+            }
+            for index in range(variant_count)
+        ],
+        "winner_id": None,
+        "confidence": 0.42,
+        "total_impressions": 4006,
+        "check_count": 12,
+    }
+
+
+async def _seed() -> str:
+    from app.models.database import SessionLocal, WorkflowRecord
+
+    now = int(time.time())
+    async with SessionLocal() as session:
+        for index in range(50):
+            workflow_id = f"bench-{index:05d}"
+            snapshot = _snapshot(workflow_id, now)
+            snapshot["ab_test"] = _ab_test()
+            snapshot["current_step"] = "ab_testing"
+            session.add(
+                WorkflowRecord(
+                    id=workflow_id,
+                    user_id="bench_user",
+                    topic="Benchmark topic",
+                    target_platforms=["youtube"],
+                    status="ab_testing",
+                    current_step="ab_testing",
+                    state_snapshot=snapshot,
+                    created_ts=now,
+                    updated_ts=now + index,
+                    revision=1,
+                )
+            )
+        await session.commit()
+    return "bench-00000"
+
+
+def _measure(fast: bool, requests: int, seed: bool) -> dict[str, float]:
+    os.environ["FAST_JSON_RESPONSES"] = "true" if fast else "false"
+
+    from fastapi.testclient import TestClient
+
+    from app.core.config import get_settings
+    from app.main import create_app
+
+    get_settings.cache_clear()
+    results = {}
+    with TestClient(create_app()) as client:
+        # configure_logging() runs in the lifespan; keep request logs out of the numbers.
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        logging.getLogger().setLevel(logging.WARNING)
+        workflow_id = client.portal.call(_seed) if seed else "bench-00000"
+        urls = {
+            "GET /status": f"/api/v1/workflows/{workflow_id}/status",
+            "GET /ab-status": f"/api/v1/workflows/{workflow_id}/ab-status",
+            "GET /workflows": "/api/v1/workflows?user_id=bench_user",
+        }
+        for name, url in urls.items():
+            assert client.get(url).status_code == 200  # warm caches
+            started = time.process_time()
+            for _ in range(requests):
+                client.get(url)
+            results[name] = (time.process_time() - started) / requests * 1e6
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="cat-bench-"))
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{(workdir / 'app.db').as_posix()}"
+    os.environ["CHECKPOINT_DB_URL"] = f"sqlite+aiosqlite:///{(workdir / 'checkpoints.db').as_posix()}"
+    os.environ["LLM_PROVIDER"] = "mock"
+    os.environ.setdefault("DEBUG", "false")
+
+    before = _measure(fast=False, requests=args.requests, seed=True)
+    after = _measure(fast=True, requests=args.requests, seed=False)
+
+    print(f"requests per endpoint: {args.requests}  (CPU us/request)")
+    print(f"{'endpoint':<18}{'default':>10}{'fast path':>12}{'saved':>9}")
+    for name in before:
+        saved = 1 - after[name] / before[name]
+        print(f"{name:<18}{before[name]:10.0f}{after[name]:12.0f}{saved:9.0%}")
+    print("(listing bytes are only reused with Redis enabled; without it only serialization changes)")
+
+
+if __name__ == "__main__":
+    main()
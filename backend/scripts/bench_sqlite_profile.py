@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: status reads/sec and state writes/sec under each SQLITE_PROFILE.
+
+Each profile runs in its own subprocess (the engine is built at import time)
+against a fresh SQLite file. Reads are concurrent GET /status calls through
+the ASGI app; writes are concurrent WorkflowPersistence.save() calls, each
+one a full transaction with a commit, on distinct workflows.
+
+Run: python scripts/bench_sqlite_profile.py [--workflows 100] [--seconds 5] [--concurrency 16]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_status_batch import _seed  # noqa: E402
+
+
+async def _rate(seconds: float, concurrency: int, operation) -> float:
+    deadline = time.perf_counter() + seconds
+    done = 0
+
+    async def loop(worker: int) -> None:
+        nonlocal done
+        index = worker
+        while time.perf_counter() < deadline:
+            await operation(index)
+            index += concurrency
+            done += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(loop(worker) for worker in range(concurrency)))
+    return done / (time.perf_counter() - started)
+
+
+async def _run(app, ids: list[str], seconds: float, concurrency: int) -> dict[str, float]:
+    import httpx
+
+    from app.models.database import SessionLocal, WorkflowRecord
+
+    persistence = app.state.workflow_persistence
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+
+        async def read(index: int) -> None:
+            response = await http.get(f"/api/v1/workflows/{ids[index % len(ids)]}/status")
+            assert response.status_code == 200
+
+        reads = await _rate(seconds, concurrency, read)
+
+    async def write(index: int) -> None:
+        # Workers own disjoint workflows, so compare-and-swap never conflicts.
+        async with SessionLocal() as session:
+            record = await session.get(WorkflowRecord, ids[index % len(ids)])
+            state = dict(await persistence.load_state(session, record))
+            state["updated_ts"] = int(time.time())
+            state["errors"] = [f"bench write {index}"]
+            await persistence.save(session, record, state)
+
+    writes = await _rate(seconds, concurrency, write)
+    return {"reads_per_sec": reads, "writes_per_sec": writes}
+
+
+def _child(profile: str, args: argparse.Namespace) -> None:
+    workdir = Path(tempfile.mkdtemp(prefix=f"cat-bench-{profile}-"))
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{(workdir / 'app.db').as_posix()}"
+    os.environ["CHECKPOINT_DB_URL"] = f"sqlite+aiosqlite:///{(workdir / 'checkpoints.db').as_posix()}"
+    os.environ["SQLITE_PROFILE"] = profile
+    os.environ["LLM_PROVIDER"] = "mock"
+    os.environ.setdefault("DEBUG", "false")
+
+    from fastapi.testclient import TestClient
+
+    from app.main import create_app
+
+    app = create_app()
+    with TestClient(app) as client:
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        logging.getLogger().setLevel(logging.WARNING)
+        # A multiple of concurrency, so each write worker cycles through its own workflows.
+        count = -(-args.workflows // args.concurrency) * args.concurrency
+        ids = client.portal.call(_seed, count)
+        result = client.portal.call(_run, app, ids, args.seconds, args.concurrency)
+    print(json.dumps(result))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workflows", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--profile", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        _child(args.profile, args)
+        return
+
+    results = {}
+    for profile in ("development", "production"):
+        output = subprocess.run(
+            [sys.executable, __file__, *sys.argv[1:], "--profile", profile],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results[profile] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"concurrency: {args.concurrency}  seconds per measurement: {args.seconds}")
+    print(f"{'profile':<14}{'reads/s':>10}{'writes/s':>10}")
+    for profile, result in results.items():
+        print(f"{profile:<14}{result['reads_per_sec']:10.0f}{result['writes_per_sec']:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark: N single /status calls vs one POST /status:batch.
+
+Runs the app in-process against a throwaway SQLite database seeded with
+synthetic workflows, so it measures server-side cost (session setup,
+queries, serialization) rather than network latency.
+
+Run: python scripts/bench_status_batch.py [--workflows 200] [--rounds 5]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def _snapshot(workflow_id: str, now: int) -> dict:
+    return {
+        "workflow_id": workflow_id,
+        "user_id": "bench_user",
+        "topic": "Benchmark topic",
+        "target_platforms": ["youtube"],
+        "brand_voice": "educational",
+        "trend_data": {"primary_trend": "bench", "suggested_hooks": ["a", "b", "c"]},
+        "script_variants": [
+            {
+                "id": f"{workflow_id}-s{index}",
+                "hook": "Hook " * 10,
+                "body": "Body sentence. " * 40,
+                "cta": "Follow for more.",
+                "predicted_retention": 0.7,
+                "tone": "curiosity_gap",
+            }
+            for index in range(3)
+        ],
+        "selected_script_id": None,
+        "thumbnail_variants": [],
+        "selected_thumbnail_id": None,
+        "ab_test": None,
+        "current_step": "awaiting_approval",
+        "human_approval_status": {
+            "scripts_approved": False,
+            "scripts_rejected": False,
+            "thumbnails_approved": False,
+        },
+        "token_usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        "errors": [],
+        "created_ts": now,
+        "updated_ts": now,
+    }
+
+
+async def _seed(count: int) -> list[str]:
+    from app.models.database import SessionLocal, WorkflowRecord
+
+    now = int(time.time())
+    ids = [f"bench-{index:05d}" for index in range(count)]
+    async with SessionLocal() as session:
+        session.add_all(
+            WorkflowRecord(
+                id=workflow_id,
+                user_id="bench_user",
+                topic="Benchmark topic",
+                target_platforms=["youtube"],
+                status="awaiting_approval",
+                current_step="awaiting_approval",
+                state_snapshot=_snapshot(workflow_id, now),
+                created_ts=now,
+                updated_ts=now,
+                revision=1,
+            )
+            for workflow_id in ids
+        )
+        await session.commit()
+    return ids
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workflows", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="cat-bench-"))
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{(workdir / 'app.db').as_posix()}"
+    os.environ["CHECKPOINT_DB_URL"] = f"sqlite+aiosqlite:///{(workdir / 'checkpoints.db').as_posix()}"
+    os.environ["LLM_PROVIDER"] = "mock"
+    os.environ.setdefault("DEBUG", "false")
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    from fastapi.testclient import TestClient
+
+    from app.main import create_app
+
+    with TestClient(create_app()) as client:
+        ids = client.portal.call(_seed, args.workflows)
+
+        single_times, batch_times = [], []
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            for workflow_id in ids:
+                response = client.get(f"/api/v1/workflows/{workflow_id}/status")
+                assert response.status_code == 200
+            single_times.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            response = client.post("/api/v1/workflows/status:batch", json={"workflow_ids": ids})
+            assert response.status_code == 200 and not response.json()["missing"]
+            batch_times.append(time.perf_counter() - started)
+
+    single, batch = min(single_times), min(batch_times)
+    print(f"workflows: {args.workflows}  rounds: {args.rounds} (best of)")
+    print(f"{f'{args.workflows} x GET /status':<24}{single * 1000:10.1f} ms")
+    print(f"{'1 x POST /status:batch':<24}{batch * 1000:10.1f} ms")
+    print(f"{'speedup':<24}{single / batch:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+One-time switch of the SQLite checkpoint database to incremental vacuum.
+
+The periodic checkpoint compaction only deletes rows until the file has
+auto_vacuum=INCREMENTAL, and an existing file only gets it through a full
+VACUUM that rewrites it under an exclusive lock. Run this once, preferably
+with the API stopped (graph checkpoint reads and writes wait while it runs).
+
+Run: python scripts/enable_checkpoint_vacuum.py [path/to/checkpoints.db]
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy.engine import make_url
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import get_settings  # noqa: E402
+from app.services.checkpoint_compaction import enable_incremental_vacuum  # noqa: E402
+
+
+def _checkpoint_path() -> str:
+    if len(sys.argv) > 1:
+        return sys.argv[1]
+    url = make_url(get_settings().checkpoint_db_url)
+    if not url.drivername.startswith("sqlite"):
+        sys.exit(f"CHECKPOINT_DB_URL is not SQLite ({url.drivername}); nothing to do")
+    return url.database
+
+
+async def main() -> None:
+    path = _checkpoint_path()
+    if not Path(path).exists():
+        sys.exit(f"{path} does not exist")
+    started = time.perf_counter()
+    converted = await enable_incremental_vacuum(path)
+    if converted:
+        print(f"{path}: incremental vacuum enabled in {time.perf_counter() - started:.1f}s")
+    else:
+        print(f"{path}: incremental vacuum already enabled")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
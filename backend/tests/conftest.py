@@ -5,8 +5,7 @@ import pytest
 from fastapi.testclient import TestClient
 
 
-@pytest.fixture()
-def client():
+def _make_client():
     backend_dir = Path(__file__).resolve().parents[1]
     project_root = backend_dir.parent
     data_dir = project_root / "data"
@@ -34,3 +33,39 @@ def client():
         yield test_client
 
     get_settings.cache_clear()
+
+
+@pytest.fixture()
+def client(request, monkeypatch):
+    """
+    The app under a TestClient. Settings are overridden per test by
+    parametrizing this fixture indirectly with environment variables:
+
+        @pytest.mark.parametrize("client", [{"WORKFLOW_EXECUTION_MODE": "queued"}], indirect=True)
+    """
+    for name, value in getattr(request, "param", {}).items():
+        monkeypatch.setenv(name, value)
+    yield from _make_client()
+
+
+@pytest.fixture()
+def redis_cache():
+    """RedisCache backed by an in-memory fake server (with Lua scripting)."""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+
+    from app.services.redis_client import RedisCache
+
+    cache = RedisCache()
+    cache._client = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+    cache._enabled = True
+    return cache
+
+
+@pytest.fixture()
+def redis_client(client, redis_cache):
+    """The app client with its shared RedisCache pointed at the fake server."""
+    shared = client.app.state.redis_cache
+    shared._client, shared._enabled = redis_cache._client, True
+    yield client
+    shared._client, shared._enabled = None, False
@@ -0,0 +1,28 @@
+"""Workflow steps shared by the API tests."""
+
+
+def start_workflow(client, topic: str = "Testing") -> dict:
+    response = client.post(
+        "/api/v1/workflows/start",
+        json={
+            "topic": topic,
+            "platforms": ["youtube"],
+            "user_id": "test_user",
+            "brand_voice": "educational",
+        },
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def complete_workflow(client, topic: str = "Testing") -> str:
+    workflow_id = start_workflow(client, topic)["workflow_id"]
+    client.post(f"/api/v1/workflows/{workflow_id}/approve", json={"action": "approve"})
+    thumbnail_id = client.get(f"/api/v1/workflows/{workflow_id}/status").json()["thumbnails"][0]["id"]
+    client.post(
+        f"/api/v1/workflows/{workflow_id}/select-thumbnail",
+        json={"selected_thumbnail_id": thumbnail_id},
+    )
+    declared = client.post(f"/api/v1/workflows/{workflow_id}/declare-winner", json={"thumbnail_id": thumbnail_id})
+    assert declared.json()["status"] == "completed"
+    return workflow_id
@@ -0,0 +1,104 @@
+import time
+
+import pytest
+
+from helpers import start_workflow
+
+NORMALIZED = {"WORKFLOW_STATE_STORAGE": "normalized"}
+
+
+@pytest.mark.parametrize("client", [{}, NORMALIZED], ids=["json", "normalized"], indirect=True)
+def test_ab_ticker_checks_running_tests_in_one_batch(client, monkeypatch):
+    from sqlalchemy import event
+
+    # Imported once the fixture has configured the database.
+    from app.models.database import engine
+    from app.services.ab_ticker import tick_duration_seconds
+    from app.services.statistics import ABTestStatistics
+
+    ticker = client.app.state.ab_ticker
+    workflow_ids = []
+    for index in range(3):
+        workflow_id = start_workflow(client, f"Ticker {index}")["workflow_id"]
+        thumbnails = client.post(f"/api/v1/workflows/{workflow_id}/approve", json={"action": "approve"}).json()[
+            "thumbnails"
+        ]
+        client.post(
+            f"/api/v1/workflows/{workflow_id}/select-thumbnail",
+            json={"selected_thumbnail_id": thumbnails[0]["id"]},
+        )
+        workflow_ids.append(workflow_id)
+    etags = {
+        workflow_id: client.get(f"/api/v1/workflows/{workflow_id}/status").headers["etag"]
+        for workflow_id in workflow_ids
+    }
+    ticks = tick_duration_seconds.summary()["count"]
+
+    updates = []
+
+    def count_updates(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE workflows "):
+            updates.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_updates)
+    try:
+        # Checked at most every check_interval_seconds.
+        assert client.portal.call(ticker.tick_once) == 0
+        assert client.portal.call(ticker.tick_once, time.time() + 60) == 3
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count_updates)
+
+    assert len(updates) == 1
+    assert tick_duration_seconds.summary()["count"] == ticks + 2
+    for workflow_id in workflow_ids:
+        status = client.get(f"/api/v1/workflows/{workflow_id}/status")
+        assert status.headers["etag"] != etags[workflow_id]
+        ab_status = client.get(f"/api/v1/workflows/{workflow_id}/ab-status").json()
+        assert ab_status["checks_completed"] == 1
+        assert ab_status["total_impressions"] >= 300
+        timeline = client.get(f"/api/v1/workflows/{workflow_id}/ab-timeline").json()
+        assert all(series["total_samples"] == 2 for series in timeline["series"])
+
+    # A test that reaches significance resumes its graph and completes.
+    original_batch = ABTestStatistics.calculate_multi_variant_batch
+
+    def significant(tests, min_confidence=0.95):
+        results = original_batch(tests, min_confidence)
+        for variants, result in zip(tests, results):
+            result.update(recommendation="declare_winner", winner_id=variants[0]["thumbnail_id"])
+        return results
+
+    monkeypatch.setattr(ABTestStatistics, "calculate_multi_variant_batch", staticmethod(significant))
+    assert client.portal.call(ticker.tick_once, time.time() + 120) == 3
+    for workflow_id in workflow_ids:
+        completed = client.get(f"/api/v1/workflows/{workflow_id}/status").json()
+        assert completed["status"] == "completed"
+    assert client.portal.call(ticker.tick_once, time.time() + 180) == 0
+
+
+def test_ab_ticker_ticks_in_one_process_per_interval(redis_client):
+    from app.services.ab_ticker import TICK_LEASE_KEY, ABTestTicker, ticks_skipped
+
+    client = redis_client
+    workflow_id = start_workflow(client, "Leased ticker")["workflow_id"]
+    thumbnails = client.post(f"/api/v1/workflows/{workflow_id}/approve", json={"action": "approve"}).json()[
+        "thumbnails"
+    ]
+    client.post(
+        f"/api/v1/workflows/{workflow_id}/select-thumbnail",
+        json={"selected_thumbnail_id": thumbnails[0]["id"]},
+    )
+
+    # A second ticker on the same Redis stands in for another API process.
+    ticker = client.app.state.ab_ticker
+    other = ABTestTicker(ticker.persistence, ticker.engine, cache=ticker.cache)
+    skipped = ticks_skipped.value()
+
+    assert client.portal.call(other.tick_once, time.time() + 60) == 1
+    assert client.portal.call(ticker.tick_once, time.time() + 120) == 0
+    assert ticks_skipped.value() == skipped + 1
+
+    # Once the lease lapses the next process to tick takes it.
+    client.portal.call(ticker.cache.release_lease, TICK_LEASE_KEY, other._token)
+    assert client.portal.call(ticker.tick_once, time.time() + 120) == 1
+    assert client.get(f"/api/v1/workflows/{workflow_id}/ab-status").json()["checks_completed"] == 2
@@ -0,0 +1,34 @@
+from helpers import start_workflow
+
+
+def test_ab_timeline_returns_downsampled_series(client):
+    workflow_id = start_workflow(client)["workflow_id"]
+    client.post(f"/api/v1/workflows/{workflow_id}/approve", json={"action": "approve"})
+    thumbnails = client.get(f"/api/v1/workflows/{workflow_id}/status").json()["thumbnails"]
+    client.post(
+        f"/api/v1/workflows/{workflow_id}/select-thumbnail",
+        json={"selected_thumbnail_id": thumbnails[0]["id"]},
+    )
+
+    timeline_url = f"/api/v1/workflows/{workflow_id}/ab-timeline"
+    response = client.get(timeline_url, params={"points": 50})
+    assert response.status_code == 200
+    body = response.json()
+    assert {series["variant_id"] for series in body["series"]} == {t["id"] for t in thumbnails}
+    for series in body["series"]:
+        assert 1 <= len(series["samples"]) <= 50
+        assert {"ts", "impressions", "clicks", "ctr"} <= series["samples"][0].keys()
+
+    cached = client.get(timeline_url, params={"points": 50}, headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+
+
+def test_lttb_downsampling_bounds():
+    from app.services.ab_timeline import lttb
+
+    points = [(float(index), float(index % 17)) for index in range(10_000)]
+    selected = lttb(points, 120)
+    assert len(selected) == 120
+    assert selected[0] == 0 and selected[-1] == len(points) - 1
+    assert selected == sorted(set(selected))
+    assert lttb(points[:10], 120) == list(range(10))
@@ -0,0 +1,57 @@
+import json
+import time
+
+from helpers import complete_workflow
+
+
+def test_archived_workflows_are_rehydrated_on_read(client):
+    from app.models.database import SessionLocal, WorkflowArchiveRecord, WorkflowRecord
+    from app.services.archive import WorkflowArchiver
+
+    clock_fields = {"elapsed_time_seconds", "estimated_time_remaining", "can_declare_early"}
+
+    def ab_metrics():
+        body = client.get(f"/api/v1/workflows/{workflow_id}/ab-status").json()
+        return {key: value for key, value in body.items() if key not in clock_fields}
+
+    workflow_id = complete_workflow(client)
+    status_before = client.get(f"/api/v1/workflows/{workflow_id}/status").json()
+    results_before = client.get(f"/api/v1/workflows/{workflow_id}/results").json()
+    ab_before = ab_metrics()
+    timeline_before = client.get(f"/api/v1/workflows/{workflow_id}/ab-timeline").json()
+    assert timeline_before["series"]
+    assert WorkflowArchiver(client.app.state.workflow_persistence).max_age_seconds == 0  # off by default
+
+    archiver = WorkflowArchiver(client.app.state.workflow_persistence, max_age_seconds=60)
+    assert client.portal.call(archiver.archive_once) == 0  # not old enough yet
+    assert client.portal.call(archiver.archive_once, time.time() + 120) == 1
+
+    async def rows():
+        async with SessionLocal() as session:
+            return await session.get(WorkflowRecord, workflow_id), await session.get(WorkflowArchiveRecord, workflow_id)
+
+    hot, cold = client.portal.call(rows)
+    assert hot is None
+    assert cold.codec in ("zstd", "zlib")
+
+    assert client.get(f"/api/v1/workflows/{workflow_id}/status").json() == status_before
+    assert client.get(f"/api/v1/workflows/{workflow_id}/results").json() == results_before
+    batch = client.post("/api/v1/workflows/status:batch", json={"workflow_ids": [workflow_id]}).json()
+    assert batch["workflows"] == [status_before]
+    listed = client.get("/api/v1/workflows", params={"user_id": "test_user"}).json()
+    listed = {item["workflow_id"]: item for item in listed}
+    assert listed[workflow_id]["archived"] is True
+    assert listed[workflow_id]["status"] == status_before["status"]
+
+    assert ab_metrics() == ab_before
+    assert client.get(f"/api/v1/workflows/{workflow_id}/ab-timeline").json() == timeline_before
+    with client.stream("GET", f"/api/v1/workflows/{workflow_id}/ab-stream") as response:
+        assert response.status_code == 200
+        data_lines = [line for line in "".join(response.iter_text()).splitlines() if line.startswith("data: ")]
+    assert len(data_lines) == 1
+    assert json.loads(data_lines[0].removeprefix("data: "))["winner_id"] == ab_before["winner_id"]
+
+    # Archived workflows are read-only: 410, while unknown ids stay 404.
+    stop = client.post(f"/api/v1/workflows/{workflow_id}/stop-test", json={})
+    assert stop.status_code == 410
+    assert client.post("/api/v1/workflows/missing/stop-test", json={}).status_code == 404
@@ -0,0 +1,110 @@
+from helpers import start_workflow
+
+
+def test_checkpoint_compaction_keeps_last_and_collapses_completed(client):
+    from sqlalchemy import update
+
+    from app.models.database import SessionLocal, WorkflowRecord
+    from app.services.checkpoint_compaction import CheckpointCompactor, enable_incremental_vacuum
+
+    workflow_id = start_workflow(client)["workflow_id"]
+    client.post(f"/api/v1/workflows/{workflow_id}/approve", json={"action": "approve"})
+    engine = client.app.state.workflow_engine
+    compactor = CheckpointCompactor(engine, keep_last=3, interval_seconds=0)
+
+    async def thread_rows():
+        conn = await engine.checkpoint_connection()
+        async with conn.execute("SELECT COUNT(*) FROM checkpoints WHERE thread_id = ?", (workflow_id,)) as cursor:
+            return (await cursor.fetchone())[0]
+
+    assert client.portal.call(thread_rows) > 3
+    result = client.portal.call(compactor.compact)
+    assert result["deleted_retention"] > 0
+    assert client.portal.call(thread_rows) == 3
+    assert client.get(f"/api/v1/workflows/{workflow_id}/status").json()["thumbnails"]
+
+    async def complete():
+        async with SessionLocal() as session:
+            await session.execute(
+                update(WorkflowRecord).where(WorkflowRecord.id == workflow_id).values(status="completed")
+            )
+            await session.commit()
+
+    client.portal.call(complete)
+    assert client.portal.call(compactor.compact)["deleted_completed"] == 2
+    assert client.portal.call(thread_rows) == 1
+
+    stats = client.get("/api/v1/health/checkpoints").json()
+    assert stats["backend"] == "sqlite"
+    assert stats["checkpoints"] >= 1 and stats["size_bytes"] > 0
+    # Passes never rewrite the file; the one-time conversion is an explicit admin step.
+    assert stats["incremental_vacuum"] is False
+    assert client.portal.call(compactor.compact)["vacuumed"] is False
+    checkpoint_path = engine._checkpoint_target(engine.settings.checkpoint_db_url)
+    assert client.portal.call(enable_incremental_vacuum, checkpoint_path) is True
+    assert client.portal.call(enable_incremental_vacuum, checkpoint_path) is False
+    assert client.portal.call(compactor.compact)["vacuumed"] is True
+
+
+def test_sqlalchemy_checkpointer_round_trip(tmp_path):
+    import asyncio
+
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.orchestration.checkpointer import SQLAlchemyCheckpointSaver
+    from app.orchestration.workflow import ContentWorkflow
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{(tmp_path / 'checkpoints.db').as_posix()}")
+        saver = SQLAlchemyCheckpointSaver(engine, owns_engine=True)
+        graph = ContentWorkflow().builder.compile(checkpointer=saver)
+        config = {"configurable": {"thread_id": "thread-1"}}
+        await graph.aupdate_state(config, {"workflow_id": "thread-1", "current_step": "queued"}, as_node="__start__")
+        await graph.aupdate_state(config, {"current_step": "failed"}, as_node="__start__")
+
+        # A second saver on the same database (another replica) sees the same thread.
+        replica = SQLAlchemyCheckpointSaver(engine)
+        latest = await replica.aget_tuple(config)
+        history = [item async for item in replica.alist(config)]
+        limited = [item async for item in replica.alist(config, limit=1)]
+        await saver.close()
+        return latest, history, limited
+
+    latest, history, limited = asyncio.run(run())
+    assert latest.checkpoint["channel_values"]["current_step"] == "failed"
+    assert len(history) == 2
+    assert history[0].config == latest.config
+    assert history[0].parent_config == history[1].config
+    assert [item.config for item in limited] == [latest.config]
+
+
+def test_autogenerate_ignores_checkpoint_tables(tmp_path):
+    import asyncio
+
+    from alembic.autogenerate import compare_metadata
+    from alembic.migration import MigrationContext
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.models.database import Base
+    from app.orchestration.checkpointer import SQLAlchemyCheckpointSaver, include_in_migrations
+
+    def diff(connection, include_name=None):
+        opts = {"include_name": include_name} if include_name else {}
+        context = MigrationContext.configure(connection, opts=opts)
+        return compare_metadata(context, Base.metadata)
+
+    async def run():
+        # One database for the app and the checkpointer.
+        engine = create_async_engine(f"sqlite+aiosqlite:///{(tmp_path / 'shared.db').as_posix()}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        await SQLAlchemyCheckpointSaver(engine).setup()
+        async with engine.connect() as connection:
+            unfiltered = await connection.run_sync(diff)
+            filtered = await connection.run_sync(diff, include_in_migrations)
+        await engine.dispose()
+        return unfiltered, filtered
+
+    unfiltered, filtered = asyncio.run(run())
+    assert any(change[0] == "remove_table" and change[1].name == "checkpoints" for change in unfiltered)
+    assert filtered == []
@@ -0,0 +1,80 @@
+from helpers import start_workflow
+
+
+def test_read_replica_routing_falls_back_to_primary(client, tmp_path):
+    from sqlalchemy import delete
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import make_transient
+
+    from app.models.database import Base, SessionLocal, WorkflowRecord
+    from app.services.read_routing import ReadSessionRouter, read_sessions
+
+    workflow_id = start_workflow(client)["workflow_id"]
+    replica_engine = create_async_engine(f"sqlite+aiosqlite:///{(tmp_path / 'replica.db').as_posix()}")
+    client.app.state.read_router = ReadSessionRouter(
+        async_sessionmaker(bind=replica_engine, class_=AsyncSession, expire_on_commit=False),
+        client.app.state.revision_tracker,
+        watermark_seconds=0,
+    )
+
+    async def create_schema() -> None:
+        async with replica_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def replicate() -> int:
+        async with SessionLocal() as session:
+            record = await session.get(WorkflowRecord, workflow_id)
+            session.expunge(record)
+        make_transient(record)
+        record.state_snapshot = {**record.state_snapshot, "selected_script_id": "replica"}
+        async with async_sessionmaker(bind=replica_engine, expire_on_commit=False)() as session:
+            await session.execute(delete(WorkflowRecord).where(WorkflowRecord.id == workflow_id))
+            session.add(record)
+            await session.commit()
+        return record.updated_ts
+
+    def served_by(**headers) -> str:
+        body = client.get(f"/api/v1/workflows/{workflow_id}/status", headers=headers).json()
+        return "replica" if body["selected_script_id"] == "replica" else "primary"
+
+    # The tracker knows a revision the replica has not received yet.
+    client.portal.call(create_schema)
+    assert served_by() == "primary"
+    client.portal.call(replicate)
+    assert served_by() == "replica"
+
+    client.post(f"/api/v1/workflows/{workflow_id}/approve", json={"action": "approve"})
+    assert served_by() == "primary"
+    replicated_ts = client.portal.call(replicate)
+    assert served_by() == "replica"
+
+    # Read-your-writes: the client has seen a newer write than the replica holds.
+    assert served_by(**{"X-Min-Updated-Ts": str(replicated_ts + 60)}) == "primary"
+    assert read_sessions.value(database="primary", reason="client_ts") >= 1
+    client.portal.call(replica_engine.dispose)
+
+
+def test_sqlite_production_pragmas(tmp_path):
+    import asyncio
+
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.core.config import Settings
+    from app.core.sqlite import install_sqlite_pragmas, sqlite_pragmas
+
+    settings = Settings(SQLITE_PROFILE="production", SQLITE_BUSY_TIMEOUT_MS=1234)
+    assert settings.sqlite_tuned
+
+    async def read_pragmas():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{(tmp_path / 'tuned.db').as_posix()}")
+        install_sqlite_pragmas(engine.sync_engine, sqlite_pragmas(settings))
+        async with engine.connect() as connection:
+            values = [
+                (await connection.execute(text(f"PRAGMA {name}"))).scalar()
+                for name in ("journal_mode", "synchronous", "busy_timeout")
+            ]
+        await engine.dispose()
+        return values
+
+    assert asyncio.run(read_pragmas()) == ["wal", 1, 1234]
@@ -0,0 +1,142 @@
+import json
+
+import pytest
+
+from helpers import start_workflow
+
+
+def test_ab_stream_sends_final_state(client):
+    workflow_id = start_workflow(client)["workflow_id"]
+    client.post(f"/api/v1/workflows/{workflow_id}/approve", json={"action": "approve"})
+    thumbnails = client.get(f"/api/v1/workflows/{workflow_id}/status").json()["thumbnails"]
+    client.post(
+        f"/api/v1/workflows/{workflow_id}/select-thumbnail",
+        json={"selected_thumbnail_id": thumbnails[0]["id"]},
+    )
+    client.post(
+        f"/api/v1/workflows/{workflow_id}/declare-winner",
+        json={"thumbnail_id": thumbnails[1]["id"]},
+    )
+
+    # The test is over, so the stream sends one event and closes.
+    with client.stream("GET", f"/api/v1/workflows/{workflow_id}/ab-stream") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = "".join(response.iter_text())
+
+    data_lines = [line for line in body.splitlines() if line.startswith("data: ")]
+    assert len(data_lines) == 1
+    payload = json.loads(data_lines[0].removeprefix("data: "))
+    assert payload["is_running"] is False
+    assert payload["winner_id"] == thumbnails[1]["id"]
+
+
+def test_ab_stream_sees_a_winner_committed_during_its_read(client, monkeypatch):
+    from app.services.workflow_persistence import WorkflowPersistence
+
+    workflow_id = start_workflow(client)["workflow_id"]
+    client.post(f"/api/v1/workflows/{workflow_id}/approve", json={"action": "approve"})
+    thumbnails = client.get(f"/api/v1/workflows/{workflow_id}/status").json()["thumbnails"]
+    client.post(
+        f"/api/v1/workflows/{workflow_id}/select-thumbnail",
+        json={"selected_thumbnail_id": thumbnails[0]["id"]},
+    )
+
+    load_ab_test = WorkflowPersistence.load_ab_test
+
+    async def load_then_finish(self, session, record):
+        ab_test = await load_ab_test(self, session, record)
+        # A winner is committed after the stream read the running test.
+        finished = {**ab_test, "status": "completed", "winner_id": thumbnails[1]["id"]}
+        await self.events.publish({"workflow_id": record.id, "revision": record.revision + 1, "ab_test": finished})
+        return ab_test
+
+    monkeypatch.setattr(WorkflowPersistence, "load_ab_test", load_then_finish)
+
+    with client.stream("GET", f"/api/v1/workflows/{workflow_id}/ab-stream") as response:
+        body = "".join(response.iter_text())
+
+    payloads = [json.loads(line.removeprefix("data: ")) for line in body.splitlines() if line.startswith("data: ")]
+    assert [payload["is_running"] for payload in payloads] == [True, False]
+    assert payloads[-1]["winner_id"] == thumbnails[1]["id"]
+
+    assert client.get("/api/v1/workflows/missing/ab-stream").status_code == 404
+    assert not client.app.state.event_bus._subscribers
+
+
+def test_websocket_pushes_workflow_deltas(client):
+    workflow_id = start_workflow(client)["workflow_id"]
+
+    with client.websocket_connect("/api/v1/workflows/ws") as websocket:
+        websocket.send_json({"action": "subscribe", "workflow_ids": [workflow_id, "missing"]})
+        initial = websocket.receive_json()
+        assert initial["type"] == "workflow_update"
+        assert initial["workflow_id"] == workflow_id
+        assert initial["current_step"] == "awaiting_approval"
+
+        client.post(f"/api/v1/workflows/{workflow_id}/approve", json={"action": "approve"})
+
+        delta = websocket.receive_json()
+        assert delta["workflow_id"] == workflow_id
+        assert delta["status"] == "awaiting_thumbnail_selection"
+        assert delta["revision"] > initial["revision"]
+        assert "thumbnails" not in delta
+
+
+def test_websocket_closes_when_forwarding_fails(client, monkeypatch):
+    from starlette.websockets import WebSocketDisconnect
+
+    from app.api.v1 import workflows
+
+    workflow_id = start_workflow(client)["workflow_id"]
+
+    def unserializable(event):
+        raise TypeError("not JSON serializable")
+
+    with client.websocket_connect("/api/v1/workflows/ws") as websocket:
+        websocket.send_json({"action": "subscribe", "workflow_ids": [workflow_id]})
+        websocket.receive_json()
+        monkeypatch.setattr(workflows, "_workflow_delta", unserializable)
+        client.post(f"/api/v1/workflows/{workflow_id}/approve", json={"action": "approve"})
+
+        # The failed send ends the connection instead of leaving a silent socket behind.
+        with pytest.raises(WebSocketDisconnect):
+            websocket.receive_json()
+    assert not client.app.state.event_bus._subscribers
+
+
+def test_event_relay_restarts_after_failure(redis_cache):
+    import asyncio
+
+    from app.services.events import WorkflowEventBus
+
+    async def scenario():
+        bus = WorkflowEventBus(redis_cache, retry_seconds=0.01)
+        await bus.start()
+        subscription = bus.subscribe(["wf"])
+        dispatch = bus._dispatch
+        failures = []
+
+        def fail_once(event):
+            if not failures:
+                failures.append(event)
+                raise RuntimeError("relay lost")
+            dispatch(event)
+
+        bus._dispatch = fail_once
+        await bus.publish({"workflow_id": "wf", "revision": 1})
+        first_relay = bus._relay_task
+        while not first_relay.done():
+            await asyncio.sleep(0.01)
+        while bus._relay_task is first_relay:
+            await asyncio.sleep(0.01)
+
+        await bus.publish({"workflow_id": "wf", "revision": 2})
+        event = await subscription.get(timeout=2)
+        subscription.close()
+        await bus.close()
+        return len(failures), event
+
+    failures, event = asyncio.run(scenario())
+    assert failures == 1
+    assert event == {"workflow_id": "wf", "revision": 2}
@@ -0,0 +1,162 @@
+import time
+
+import pytest
+
+QUEUED = {"WORKFLOW_EXECUTION_MODE": "queued"}
+
+
+@pytest.mark.parametrize("client", [QUEUED], indirect=True)
+def test_queued_execution_returns_202(client):
+    response = client.post(
+        "/api/v1/workflows/start",
+        json={"topic": "Queued", "platforms": ["youtube"], "user_id": "test_user"},
+    )
+    assert response.status_code == 202
+    body = response.json()
+    assert body["status"] == "queued"
+
+    workflow_id = body["workflow_id"]
+    deadline = time.time() + 10
+    status = body
+    while status["status"] == "queued" and time.time() < deadline:
+        time.sleep(0.05)
+        status = client.get(f"/api/v1/workflows/{workflow_id}/status").json()
+    assert status["status"] == "awaiting_approval"
+    assert len(status["scripts"]) == 3
+
+    stats = client.get("/api/v1/health/queue").json()
+    assert stats["mode"] == "queued"
+    assert stats["jobs"]["succeeded"] >= 1
+
+
+@pytest.mark.parametrize("client", [QUEUED], indirect=True)
+def test_queued_jobs_survive_a_restart(client):
+    import asyncio
+
+    job_queue = client.app.state.job_queue
+
+    # The process "restarts" between the 202 and the run: workers gone, in-memory jobs lost.
+    client.portal.call(job_queue.close)
+    response = client.post(
+        "/api/v1/workflows/start",
+        json={"topic": "Stranded", "platforms": ["youtube"], "user_id": "test_user"},
+    )
+    assert response.status_code == 202
+    workflow_id = response.json()["workflow_id"]
+    job_queue._queue = asyncio.Queue()
+
+    client.portal.call(job_queue.start)
+    deadline = time.time() + 10
+    status = response.json()
+    while status["status"] == "queued" and time.time() < deadline:
+        time.sleep(0.05)
+        status = client.get(f"/api/v1/workflows/{workflow_id}/status").json()
+    assert status["status"] == "awaiting_approval"
+
+
+def test_redis_jobs_stay_claimed_until_acked(redis_cache):
+    import asyncio
+
+    from app.services.job_queue import JOBS_QUEUE_KEY, WorkflowJobQueue
+    from app.services.workflow_ownership import WorkflowOwnership, worker_processing_key
+
+    def job(workflow_id):
+        return {"workflow_id": workflow_id, "enqueued_at": time.time()}
+
+    async def scenario():
+        lengths = []
+
+        async def record_lengths(processing_key):
+            lengths.append(
+                (await redis_cache.list_length(JOBS_QUEUE_KEY), await redis_cache.list_length(processing_key))
+            )
+
+        # Acked once handled; an interrupted job is put back by close().
+        queue = WorkflowJobQueue(None, None, redis_cache, None, backend="redis")
+        await redis_cache.push_json(JOBS_QUEUE_KEY, job("wf-1"))
+        claimed, receipt = await queue._next_job()
+        await record_lengths(queue.processing_key)
+        await redis_cache.ack_json(queue.processing_key, receipt)
+        await record_lengths(queue.processing_key)
+        await redis_cache.push_json(JOBS_QUEUE_KEY, job("wf-2"))
+        await queue._next_job()
+        await queue.close()
+        await record_lengths(queue.processing_key)
+        await redis_cache.delete(JOBS_QUEUE_KEY)
+
+        # A worker that dies mid-job (no heartbeat, no close) is reaped with its claimed job.
+        dead = WorkflowOwnership(redis_cache, JOBS_QUEUE_KEY, worker_id="dead")
+        await redis_cache.add_members("workflow_workers", "dead")
+        dead_queue = WorkflowJobQueue(None, None, redis_cache, None, backend="redis", ownership=dead)
+        await redis_cache.push_json(JOBS_QUEUE_KEY, job("wf-3"))
+        await dead_queue._next_job()
+        await record_lengths(worker_processing_key("dead"))
+        survivor = WorkflowOwnership(redis_cache, JOBS_QUEUE_KEY, worker_id="survivor")
+        assert await survivor.reap() == 1
+        await record_lengths(worker_processing_key("dead"))
+        return claimed["workflow_id"], lengths
+
+    claimed, lengths = asyncio.run(scenario())
+    assert claimed == "wf-1"
+    assert lengths == [(0, 1), (0, 0), (1, 0), (0, 1), (1, 0)]
+
+
+def test_workflow_ownership_routing_heartbeat_and_takeover(redis_cache):
+    import asyncio
+
+    from app.services.job_queue import JOBS_QUEUE_KEY, WorkflowJobQueue
+    from app.services.workflow_ownership import WorkflowOwnership, worker_queue_key
+
+    ttl = 0.3
+
+    def worker(worker_id):
+        ownership = WorkflowOwnership(redis_cache, JOBS_QUEUE_KEY, ttl_seconds=ttl, worker_id=worker_id)
+        queue = WorkflowJobQueue(None, None, redis_cache, None, backend="redis", ownership=ownership)
+        return ownership, queue
+
+    async def queued(key):
+        jobs = []
+        while item := await redis_cache.claim_json([key], "test_processing", timeout=0.01):
+            jobs.append(item[0]["workflow_id"])
+        return jobs
+
+    async def scenario():
+        owner, owner_queue = worker("worker-a")
+        other, other_queue = worker("worker-b")
+        await owner.start()
+        await other.start()
+
+        # Unowned: shared queue. Owned: the owner's own queue, and jobs popped elsewhere are forwarded.
+        await other_queue.enqueue("wf-1")
+        assert await queued(JOBS_QUEUE_KEY) == ["wf-1"]
+        assert await owner.claim("wf-1") == "worker-a"
+        await other_queue.enqueue("wf-1")
+        assert await queued(worker_queue_key("worker-a")) == ["wf-1"]
+        assert await other_queue._owns({"workflow_id": "wf-1", "enqueued_at": 0.0}) is False
+        assert await queued(worker_queue_key("worker-a")) == ["wf-1"]
+
+        # The heartbeat loop keeps a running job's lease well past its ttl.
+        await asyncio.sleep(ttl * 3)
+        assert await other.claim("wf-1") == "worker-a"
+        assert await other.reap() == 0
+
+        # The owner dies (no close, no heartbeat) with a job still in its queue.
+        await owner_queue.enqueue("wf-1")
+        owner._task.cancel()
+        await asyncio.sleep(ttl * 1.5)
+        assert await other.owner("wf-1") is None
+        # The survivor's heartbeat loop reaps it: queued job and owned workflow go back to the shared queue.
+        async def reaped():
+            while "worker-a" in await redis_cache.members("workflow_workers"):
+                await asyncio.sleep(0.01)
+
+        await asyncio.wait_for(reaped(), timeout=5)
+        assert await queued(JOBS_QUEUE_KEY) == ["wf-1", "wf-1"]
+        assert await other.claim("wf-1") == "worker-b"
+        assert await owner_queue.ownership.route("wf-1") == worker_queue_key("worker-b")
+
+        other.done("wf-1")
+        await other.close()
+        return await redis_cache.members("workflow_workers"), await other.owner("wf-1")
+
+    assert asyncio.run(scenario()) == (frozenset(), None)
@@ -0,0 +1,53 @@
+from helpers import start_workflow
+
+
+def test_list_workflows_keyset_pagination(client):
+    created = {start_workflow(client, topic=f"Topic {index}")["workflow_id"] for index in range(3)}
+
+    first_page = client.get("/api/v1/workflows", params={"user_id": "test_user", "limit": 2})
+    assert first_page.status_code == 200
+    assert len(first_page.json()) == 2
+    assert first_page.json()[0]["current_step"] == "awaiting_approval"
+    cursor = first_page.headers["x-next-cursor"]
+
+    second_page = client.get(
+        "/api/v1/workflows", params={"user_id": "test_user", "limit": 2, "cursor": cursor}
+    )
+    assert second_page.status_code == 200
+    assert "x-next-cursor" not in second_page.headers
+
+    listed = {item["workflow_id"] for item in first_page.json() + second_page.json()}
+    assert listed == created
+
+    invalid = client.get("/api/v1/workflows", params={"cursor": "not-a-cursor"})
+    assert invalid.status_code == 400
+
+
+def test_list_cache_generation_bump_and_redis_errors(redis_client, monkeypatch):
+    cache = redis_client.app.state.redis_cache
+    list_url = "/api/v1/workflows"
+    first = start_workflow(redis_client)["workflow_id"]
+
+    listed = redis_client.get(list_url, params={"user_id": "test_user"}).json()
+    assert [item["workflow_id"] for item in listed] == [first]
+    generation = redis_client.portal.call(cache.get_generation, "workflows_list:test_user")
+    assert redis_client.portal.call(cache.get, f"workflows_list:test_user:g{generation}:50:first") is not None
+
+    # The write bumps the scope, so the page cached under the old generation is missed.
+    second = start_workflow(redis_client)["workflow_id"]
+    listed = redis_client.get(list_url, params={"user_id": "test_user"}).json()
+    assert {item["workflow_id"] for item in listed} == {first, second}
+
+    # With the generation unreadable the cache is bypassed, never read at generation 0.
+    redis_client.portal.call(cache.set, "workflows_list:test_user:g0:50:first", {"items": [], "next_cursor": None})
+    redis_get = cache._client.get
+
+    async def failing_generation_get(name, *args, **kwargs):
+        if ":gen:" in str(name):
+            raise ConnectionError("redis down")
+        return await redis_get(name, *args, **kwargs)
+
+    monkeypatch.setattr(cache._client, "get", failing_generation_get)
+    assert redis_client.portal.call(cache.get_generation, "workflows_list:test_user") is None
+    listed = redis_client.get(list_url, params={"user_id": "test_user"}).json()
+    assert {item["workflow_id"] for item in listed} == {first, second}
@@ -0,0 +1,23 @@
+
+
+
+def test_metrics_endpoint_reports_node_timings_and_fallbacks(client):
+    workflow_id = client.post(
+        "/api/v1/workflows/start",
+        json={"topic": "Metrics", "platforms": ["youtube"], "user_id": "test_user", "brand_voice": "educational"},
+    ).json()["workflow_id"]
+    assert workflow_id
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    body = response.text
+    assert "# TYPE workflow_node_duration_seconds histogram" in body
+    for node in ("analyze_trends", "generate_scripts", "await_script_approval"):
+        assert f'workflow_node_duration_seconds_count{{node="{node}",outcome="ok"}}' in body
+    assert 'workflow_node_duration_seconds_bucket{node="analyze_trends",outcome="ok",le="+Inf"}' in body
+    # No API keys or LLM in tests: the trend source and scripts are mocks.
+    assert 'workflow_fallbacks_total{node="analyze_trends",path="mock_trend_source"}' in body
+    assert 'workflow_fallbacks_total{node="generate_scripts",path="mock_scripts"}' in body
+    assert 'workflow_checkpoint_io_seconds_count{operation="aput"}' in body
@@ -0,0 +1,76 @@
+import pytest
+
+from helpers import start_workflow
+
+
+def test_concurrent_approvals_share_one_run(client):
+    import asyncio
+
+    import httpx
+
+    workflow_id = start_workflow(client, "Double click")["workflow_id"]
+    engine = client.app.state.workflow_engine
+    original_resume = engine.resume
+    calls = []
+
+    async def slow_resume(thread_id, delta, state):
+        calls.append(thread_id)
+        await asyncio.sleep(0.2)
+        return await original_resume(thread_id, delta, state)
+
+    engine.resume = slow_resume
+
+    async def approve_twice():
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            url = f"/api/v1/workflows/{workflow_id}/approve"
+            payload = {"action": "approve"}
+            return await asyncio.gather(http.post(url, json=payload), http.post(url, json=payload))
+
+    first, second = client.portal.call(approve_twice)
+    engine.resume = original_resume
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert first.json()["status"] == "awaiting_thumbnail_selection"
+    assert calls == [workflow_id]
+
+
+def test_run_lease_held_by_another_process_compares_fingerprints(redis_cache):
+    import asyncio
+
+    from app.services.run_coordinator import WorkflowBusyError, WorkflowRunCoordinator
+
+    # Two coordinators on one Redis stand in for two API processes.
+    holder = WorkflowRunCoordinator(redis_cache, poll_interval_seconds=0.01)
+    other = WorkflowRunCoordinator(redis_cache, poll_interval_seconds=0.01)
+
+    async def scenario():
+        started, finish = asyncio.Event(), asyncio.Event()
+        runs = []
+
+        async def execute():
+            runs.append("approve")
+            started.set()
+            await finish.wait()
+            return "approved"
+
+        async def load_latest():
+            return "committed"
+
+        async def never_run():
+            runs.append("unexpected")
+
+        running = asyncio.create_task(holder.run("wf", "approve:approve:s1", execute, load_latest))
+        await started.wait()
+
+        with pytest.raises(WorkflowBusyError):
+            await other.run("wf", "approve:reject:s1", never_run, load_latest)
+
+        duplicate = asyncio.create_task(other.run("wf", "approve:approve:s1", never_run, load_latest))
+        await asyncio.sleep(0.05)
+        assert not duplicate.done()
+        finish.set()
+        return await running, await duplicate, runs
+
+    assert asyncio.run(scenario()) == ("approved", "committed", ["approve"])
@@ -0,0 +1,167 @@
+import pytest
+
+from helpers import start_workflow
+
+NORMALIZED = {"WORKFLOW_STATE_STORAGE": "normalized"}
+CHECKPOINT = {"WORKFLOW_STATE_STORAGE": "checkpoint"}
+
+
+@pytest.mark.parametrize("client", [NORMALIZED], indirect=True)
+def test_normalized_state_storage_writes_only_changed_rows(client):
+    from sqlalchemy import event, select
+
+    from app.models.database import SessionLocal, WorkflowRecord, WorkflowScriptVariant, engine
+
+    workflow_id = start_workflow(client)["workflow_id"]
+    client.post(f"/api/v1/workflows/{workflow_id}/approve", json={"action": "approve"})
+    status = client.get(f"/api/v1/workflows/{workflow_id}/status").json()
+    assert len(status["scripts"]) == 3
+    assert status["thumbnails"]
+
+    statements = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record_statement)
+    try:
+        response = client.post(
+            f"/api/v1/workflows/{workflow_id}/select-thumbnail",
+            json={"selected_thumbnail_id": status["thumbnails"][0]["id"]},
+        )
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record_statement)
+    assert response.status_code == 200
+    # Scripts did not change, so their rows are not rewritten.
+    assert not [sql for sql in statements if sql.startswith("UPDATE workflow_script_variants")]
+    assert [sql for sql in statements if sql.startswith("INSERT INTO workflow_ab_variants")]
+
+    ab_status = client.get(f"/api/v1/workflows/{workflow_id}/ab-status").json()
+    assert len(ab_status["variants"]) == len(status["thumbnails"])
+
+    async def load():
+        async with SessionLocal() as session:
+            record = await session.get(WorkflowRecord, workflow_id)
+            rows = (
+                await session.execute(
+                    select(WorkflowScriptVariant).where(WorkflowScriptVariant.workflow_id == workflow_id)
+                )
+            ).scalars().all()
+            return record.state_snapshot, rows
+
+    snapshot, script_rows = client.portal.call(load)
+    assert "script_variants" not in snapshot
+    assert "variants" not in snapshot["ab_test"]
+    assert len(script_rows) == 3
+
+
+@pytest.mark.parametrize("client", [CHECKPOINT], indirect=True)
+def test_checkpoint_state_storage_keeps_one_copy(client):
+    from app.models.database import SessionLocal, WorkflowRecord
+    from app.services.state_store import CHECKPOINT_INDEX_FIELDS
+
+    engine = client.app.state.workflow_engine
+    put_calls = []
+    put_state = engine.put_state
+
+    async def counting_put_state(thread_id, state):
+        put_calls.append(thread_id)
+        await put_state(thread_id, state)
+
+    engine.put_state = counting_put_state
+
+    workflow_id = start_workflow(client)["workflow_id"]
+    approve = client.post(f"/api/v1/workflows/{workflow_id}/approve", json={"action": "approve"})
+    assert approve.status_code == 200
+    status = client.get(f"/api/v1/workflows/{workflow_id}/status").json()
+    assert len(status["scripts"]) == 3
+    assert status["thumbnails"]
+    # Graph runs already checkpointed their results; saves only touched the index row.
+    assert put_calls == []
+
+    async def load():
+        async with SessionLocal() as session:
+            record = await session.get(WorkflowRecord, workflow_id)
+            return record.state_snapshot, await engine.get_state(workflow_id)
+
+    snapshot, checkpointed = client.portal.call(load)
+    assert set(snapshot) == set(CHECKPOINT_INDEX_FIELDS)
+    assert snapshot["current_step"] == checkpointed["current_step"] == status["current_step"]
+    assert checkpointed["selected_script_id"] == status["selected_script_id"]
+
+
+@pytest.mark.parametrize("client", [CHECKPOINT], indirect=True)
+def test_checkpoint_state_storage_checkpoints_only_committed_writes(client):
+    from app.models.database import SessionLocal, WorkflowRecord
+    from app.services.workflow_persistence import WorkflowConflictError
+
+    engine = client.app.state.workflow_engine
+    persistence = client.app.state.workflow_persistence
+    workflow_id = start_workflow(client)["workflow_id"]
+
+    async def race():
+        async with SessionLocal() as winner_session, SessionLocal() as loser_session:
+            winner = await winner_session.get(WorkflowRecord, workflow_id)
+            loser = await loser_session.get(WorkflowRecord, workflow_id)
+            winner_state = await persistence.load_state(winner_session, winner)
+            loser_state = await persistence.load_state(loser_session, loser)
+
+            await persistence.save(winner_session, winner, {**winner_state, "selected_script_id": "winner"})
+            try:
+                await persistence.save(loser_session, loser, {**loser_state, "selected_script_id": "loser"})
+            except WorkflowConflictError:
+                conflicted = True
+            else:
+                conflicted = False
+        return conflicted, await engine.get_state(workflow_id)
+
+    conflicted, checkpointed = client.portal.call(race)
+    assert conflicted
+    assert checkpointed["selected_script_id"] == "winner"
+
+    other_id = start_workflow(client, topic="Other")["workflow_id"]
+    batch = client.post("/api/v1/workflows/status:batch", json={"workflow_ids": [workflow_id, other_id]}).json()
+    assert [item["workflow_id"] for item in batch["workflows"]] == [workflow_id, other_id]
+    assert batch["workflows"][0]["selected_script_id"] == "winner"
+
+
+def test_jsonb_snapshot_patch_sends_only_changed_keys():
+    from sqlalchemy import update
+    from sqlalchemy.dialects import postgresql
+
+    from app.models.database import WorkflowRecord
+    from app.services.state_store import jsonb_patch_expression, snapshot_patch
+
+    old = {
+        "workflow_id": "wf-1",
+        "current_step": "awaiting_approval",
+        "script_variants": [{"id": "s1", "content": "x" * 2000}],
+        "ab_test": {"status": "running", "total_impressions": 10, "variants": [{"thumbnail_id": "t1"}]},
+        "errors": ["retry"],
+    }
+    new = {
+        **old,
+        "current_step": "ab_testing",
+        "selected_script_id": "s1",
+        "ab_test": {**old["ab_test"], "total_impressions": 25, "confidence": 0.4},
+    }
+    del new["errors"]
+
+    removed, replaced, nested = snapshot_patch(old, new)
+    assert removed == ["errors"]
+    assert replaced == {"current_step": "ab_testing", "selected_script_id": "s1"}
+    assert nested == {"ab_test": {"total_impressions": 25, "confidence": 0.4}}
+
+    # Applying the patch the way PostgreSQL does rebuilds the new snapshot.
+    patched = {key: value for key, value in old.items() if key not in removed} | replaced
+    for key, patch in nested.items():
+        patched[key] = patched[key] | patch
+    assert patched == new
+
+    statement = update(WorkflowRecord).values(
+        state_snapshot=jsonb_patch_expression(WorkflowRecord.state_snapshot, removed, replaced, nested)
+    )
+    compiled = statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": False})
+    sql = str(compiled)
+    assert "jsonb_set(" in sql and " || " in sql and " - " in sql
+    assert all("x" * 2000 not in str(value) for value in compiled.params.values())
@@ -0,0 +1,103 @@
+import pytest
+
+from helpers import start_workflow
+
+FAST_JSON = {"FAST_JSON_RESPONSES": "true"}
+
+
+def test_status_conditional_get(client):
+    workflow_id = start_workflow(client)["workflow_id"]
+    status_url = f"/api/v1/workflows/{workflow_id}/status"
+
+    first = client.get(status_url)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    unchanged = client.get(status_url, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.headers["etag"] == etag
+
+    approve_response = client.post(f"/api/v1/workflows/{workflow_id}/approve", json={"action": "approve"})
+    assert approve_response.status_code == 200
+
+    changed = client.get(status_url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["current_step"] == "awaiting_thumbnail_selection"
+
+
+@pytest.mark.parametrize("shared", [True, False])
+def test_revisions_and_status_cache_only_advance(redis_cache, shared):
+    import asyncio
+
+    from app.services.revisions import RevisionTracker
+
+    if not shared:
+        redis_cache._enabled = False
+
+    async def scenario():
+        revisions = RevisionTracker(redis_cache)
+        await revisions.set("wf", 5)
+        # A stale reader (replica lag, lost race) reports an older revision.
+        await revisions.set("wf", 3)
+        tracked = await revisions.get("wf")
+        await revisions.set("wf", 6)
+
+        await redis_cache.set_json_if_newer("status:wf", {"revision": 5, "status": "new"})
+        stale_written = await redis_cache.set_json_if_newer("status:wf", {"revision": 4, "status": "old"})
+        return tracked, await revisions.get("wf"), stale_written, await redis_cache.get_json("status:wf")
+
+    tracked, latest, stale_written, cached = asyncio.run(scenario())
+    assert (tracked, latest) == (5, 6)
+    if shared:
+        assert not stale_written
+        assert cached == {"revision": 5, "status": "new"}
+
+
+def test_status_batch(client):
+    first = start_workflow(client, topic="First")["workflow_id"]
+    second = start_workflow(client, topic="Second")["workflow_id"]
+
+    response = client.post(
+        "/api/v1/workflows/status:batch",
+        json={"workflow_ids": [second, "missing", first, second]},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["workflow_id"] for item in data["workflows"]] == [second, first]
+    assert data["missing"] == ["missing"]
+    assert all(item["status"] == "awaiting_approval" for item in data["workflows"])
+
+    too_many = client.post("/api/v1/workflows/status:batch", json={"workflow_ids": ["x"] * 301})
+    assert too_many.status_code == 422
+
+
+@pytest.mark.parametrize("client", [FAST_JSON], indirect=True)
+def test_fast_json_responses_match_regular_path(client):
+    workflow_id = start_workflow(client)["workflow_id"]
+    status_url = f"/api/v1/workflows/{workflow_id}/status"
+
+    first = client.get(status_url)
+    repeat = client.get(status_url)
+    assert first.content == repeat.content
+    assert first.headers["etag"] == repeat.headers["etag"]
+    assert first.json()["status"] == "awaiting_approval"
+
+    client.post(f"/api/v1/workflows/{workflow_id}/approve", json={"action": "approve"})
+    thumbnails = client.get(status_url).json()["thumbnails"]
+    assert thumbnails
+    client.post(
+        f"/api/v1/workflows/{workflow_id}/select-thumbnail",
+        json={"selected_thumbnail_id": thumbnails[0]["id"]},
+    )
+
+    ab_url = f"/api/v1/workflows/{workflow_id}/ab-status"
+    for _ in range(2):
+        ab_status = client.get(ab_url)
+        assert ab_status.status_code == 200
+        body = ab_status.json()
+        assert body["workflow_id"] == workflow_id
+        assert {"variants", "elapsed_time_seconds", "can_declare_early"} <= body.keys()
+
+    cache = client.app.state.response_cache
+    assert cache.hits >= 2
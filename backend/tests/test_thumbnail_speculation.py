@@ -0,0 +1,43 @@
+import pytest
+
+from helpers import start_workflow
+
+# Two scripts' worth of renders; the port refuses connections, so renders fail fast.
+SPECULATIVE = {
+    "SPECULATIVE_THUMBNAILS": "true",
+    "SPECULATIVE_THUMBNAIL_RENDERS_PER_HOUR": "6",
+    "POLLINATIONS_BASE_URL": "http://127.0.0.1:9/prompt",
+}
+
+
+@pytest.mark.parametrize("client", [SPECULATIVE], indirect=True)
+def test_speculative_thumbnails_reused_on_approval(client):
+    from app.services.thumbnail_speculation import speculative_discarded, speculative_sets, speculative_skipped
+
+    speculator = client.app.state.workflow_engine.thumbnail_speculator
+    hits, misses = speculative_sets.value(result="hit"), speculative_sets.value(result="miss")
+    discarded, skipped = speculative_discarded.value(), speculative_skipped.value(reason="budget")
+
+    started = start_workflow(client)
+    client.portal.call(speculator.drain)
+    # The render budget covers two of the three scripts.
+    assert speculative_skipped.value(reason="budget") == skipped + 1
+
+    chosen = started["scripts"][1]
+    prepared = client.portal.call(speculator._load, started["workflow_id"])
+    assert set(prepared) == {script["id"] for script in started["scripts"][:2]}
+
+    approved = client.post(
+        f"/api/v1/workflows/{started['workflow_id']}/approve",
+        json={"action": "approve", "selected_script_id": chosen["id"]},
+    ).json()
+    assert approved["thumbnails"] == prepared[chosen["id"]]
+    assert speculative_sets.value(result="hit") == hits + 1
+    assert speculative_discarded.value() == discarded + 1
+
+    # Budget spent: the next workflow is generated inline after approval.
+    other = start_workflow(client)
+    client.portal.call(speculator.drain)
+    approved = client.post(f"/api/v1/workflows/{other['workflow_id']}/approve", json={"action": "approve"}).json()
+    assert len(approved["thumbnails"]) == 3
+    assert speculative_sets.value(result="miss") == misses + 1
@@ -0,0 +1,45 @@
+import json
+
+from helpers import complete_workflow, start_workflow
+
+
+def test_export_and_import_ndjson(client):
+    completed_id = complete_workflow(client, "Exported topic")
+    pending_id = start_workflow(client, "Pending topic")["workflow_id"]
+
+    response = client.get("/api/v1/workflows/export", params={"user_id": "test_user"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    by_id = {line["workflow_id"]: line for line in lines}
+    assert set(by_id) == {completed_id, pending_id}
+    assert by_id[completed_id]["results"] == client.get(f"/api/v1/workflows/{completed_id}/results").json()
+    assert by_id[pending_id]["results"] is None
+    assert len(by_id[pending_id]["state"]["script_variants"]) == 3
+
+    # Re-importing the export skips everything; renamed copies are inserted.
+    copies = []
+    for line in lines:
+        copy = json.loads(json.dumps(line))
+        copy["state"]["workflow_id"] = copy["workflow_id"] = f"imported-{line['workflow_id']}"
+        copies.append(copy)
+    body = "\n".join(json.dumps(line) for line in [*lines, *copies]) + "\nnot json\n"
+    result = client.post(
+        "/api/v1/workflows/import",
+        content=body.encode(),
+        headers={"Content-Type": "application/x-ndjson"},
+    ).json()
+    assert result["imported"] == 2
+    assert result["skipped"] == 2
+    assert result["failed"] == 1 and result["errors"][0]["line"] == 5
+
+    imported_status = client.get(f"/api/v1/workflows/imported-{pending_id}/status").json()
+    assert imported_status["scripts"] == by_id[pending_id]["state"]["script_variants"]
+    imported_results = client.get(f"/api/v1/workflows/imported-{completed_id}/results")
+    assert imported_results.status_code == 200
+
+    # A/B metric history travels with the workflow.
+    assert by_id[completed_id]["ab_samples"] and by_id[pending_id]["ab_samples"] == []
+    timeline = client.get(f"/api/v1/workflows/{completed_id}/ab-timeline").json()
+    imported_timeline = client.get(f"/api/v1/workflows/imported-{completed_id}/ab-timeline").json()
+    assert imported_timeline["series"] == timeline["series"]
@@ -1,3 +1,6 @@
+from helpers import start_workflow
+
+
 def test_workflow_start_and_thumbnail_finalize(client):
     start_response = client.post(
         "/api/v1/workflows/start",
@@ -87,3 +90,46 @@ def test_workflow_start_and_thumbnail_finalize(client):
     assert results["winning_content"]["script"] is not None
     assert results["winning_content"]["thumbnail"] is not None
     assert results["ab_test_summary"]["was_manual_override"] is True
+
+
+def test_human_actions_resume_from_gate_interrupts(client, monkeypatch):
+    engine = client.app.state.workflow_engine
+    started = start_workflow(client, "Interrupts")
+    workflow_id = started["workflow_id"]
+    config = {"configurable": {"thread_id": workflow_id}}
+
+    def paused_at() -> tuple:
+        return client.portal.call(engine.app.aget_state, config).next
+
+    assert paused_at() == ("human_gate_scripts",)
+
+    graph_class = type(engine.app)
+    original_update = graph_class.aupdate_state
+    updates = []
+
+    async def record_update(graph, config, values, as_node=None):
+        updates.append((as_node, set(values)))
+        return await original_update(graph, config, values, as_node=as_node)
+
+    monkeypatch.setattr(graph_class, "aupdate_state", record_update)
+
+    approved = client.post(f"/api/v1/workflows/{workflow_id}/approve", json={"action": "approve"}).json()
+    assert paused_at() == ("human_gate_thumbnails",)
+
+    thumbnail_id = approved["thumbnails"][0]["id"]
+    client.post(f"/api/v1/workflows/{workflow_id}/select-thumbnail", json={"selected_thumbnail_id": thumbnail_id})
+    assert paused_at() == ("ab_test_gate",)
+
+    completed = client.post(f"/api/v1/workflows/{workflow_id}/declare-winner", json={"thumbnail_id": thumbnail_id})
+    assert completed.json()["status"] == "completed"
+    assert paused_at() == ()
+
+    # Each action wrote only its delta, as the node announcing the gate.
+    assert updates == [
+        (
+            "await_script_approval",
+            {"selected_script_id", "selected_thumbnail_id", "human_approval_status", "updated_ts"},
+        ),
+        ("await_thumbnail_selection", {"selected_thumbnail_id", "human_approval_status", "updated_ts"}),
+        ("await_ab_result", {"ab_test", "current_step", "updated_ts"}),
+    ]
@@ -9,4 +9,4 @@ const apiClient = axios.create({
   },
 });
 
-export { apiClient };
+export { apiClient, API_BASE };
@@ -9,9 +9,20 @@ import type {
 
 const WORKFLOWS_BASE = '/api/v1/workflows'
 
+// Largest page the API serves; further pages are linked through X-Next-Cursor.
+const LIST_PAGE_SIZE = 200
+
 export async function listWorkflows(): Promise<WorkflowSummary[]> {
-  const response = await apiClient.get<WorkflowSummary[]>(WORKFLOWS_BASE)
-  return response.data
+  const workflows: WorkflowSummary[] = []
+  let cursor: string | undefined
+  do {
+    const response = await apiClient.get<WorkflowSummary[]>(WORKFLOWS_BASE, {
+      params: { limit: LIST_PAGE_SIZE, cursor },
+    })
+    workflows.push(...response.data)
+    cursor = response.headers['x-next-cursor'] || undefined
+  } while (cursor)
+  return workflows
 }
 
 export async function getWorkflow(workflowId: string): Promise<WorkflowDetail> {
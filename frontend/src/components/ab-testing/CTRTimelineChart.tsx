@@ -0,0 +1,70 @@
+import { CartesianGrid, Legend, Line, LineChart, ResponsiveContainer, Tooltip, XAxis, YAxis } from 'recharts'
+import type { ABTimelineSeries, VariantMetrics } from '../../types/abtest'
+
+interface CTRTimelineChartProps {
+  series: ABTimelineSeries[]
+  variants: VariantMetrics[]
+}
+
+const COLORS = ['#3498db', '#e74c3c', '#2ecc71', '#f39c12', '#9b59b6']
+
+export function CTRTimelineChart({ series, variants }: CTRTimelineChartProps) {
+  const labels = Object.fromEntries(variants.map((v) => [v.thumbnail_id, v.style.replace(/_/g, ' ')]))
+
+  // Each variant is downsampled independently, so merge the series on timestamp
+  const rows = new Map<number, Record<string, number>>()
+  for (const s of series) {
+    for (const sample of s.samples) {
+      const row = rows.get(sample.ts) ?? { ts: sample.ts }
+      row[s.variant_id] = Number((sample.ctr * 100).toFixed(2))
+      rows.set(sample.ts, row)
+    }
+  }
+  const data = [...rows.values()].sort((a, b) => a.ts - b.ts)
+
+  if (data.length < 2) {
+    return null
+  }
+
+  return (
+    <div className="panel">
+      <h3 className="text-lg font-bold mb-4">CTR Over Time</h3>
+      <div className="h-64 w-full">
+        <ResponsiveContainer width="100%" height="100%">
+          <LineChart data={data} margin={{ top: 5, right: 30, left: 20, bottom: 5 }}>
+            <CartesianGrid strokeDasharray="3 3" stroke="rgba(0,0,0,0.1)" />
+            <XAxis
+              dataKey="ts"
+              type="number"
+              domain={['dataMin', 'dataMax']}
+              tickFormatter={(ts: number) => new Date(ts * 1000).toLocaleTimeString()}
+              tick={{ fontSize: 12 }}
+            />
+            <YAxis unit="%" domain={[0, 'auto']} tick={{ fontSize: 12 }} />
+            <Tooltip
+              labelFormatter={(ts) => new Date(Number(ts) * 1000).toLocaleString()}
+              formatter={(value) => `${value}%`}
+              contentStyle={{
+                backgroundColor: 'var(--panel-bg)',
+                border: '1px solid var(--panel-border)',
+                borderRadius: '8px',
+              }}
+            />
+            <Legend />
+            {series.map((s, index) => (
+              <Line
+                key={s.variant_id}
+                dataKey={s.variant_id}
+                name={labels[s.variant_id] ?? s.variant_id}
+                stroke={COLORS[index % COLORS.length]}
+                dot={false}
+                connectNulls
+                isAnimationActive={false}
+              />
+            ))}
+          </LineChart>
+        </ResponsiveContainer>
+      </div>
+    </div>
+  )
+}
@@ -1,17 +1,18 @@
 import { useMutation, useQuery, useQueryClient } from '@tanstack/react-query'
-import { useEffect } from 'react'
+import { useEffect, useState } from 'react'
 import { useNavigate } from 'react-router-dom'
-import { apiClient } from '../api/client'
+import { API_BASE, apiClient } from '../api/client'
 import type { ABTestStatus } from '../types/abtest'
 import { toast } from 'react-hot-toast'
 
-const POLL_INTERVAL = 5000 // 5 seconds for real-time feel
+const POLL_INTERVAL = 5000 // Fallback when the event stream is unavailable
 
 export const useABTest = (workflowId: string | undefined) => {
   const queryClient = useQueryClient()
   const navigate = useNavigate()
+  const [streamFailed, setStreamFailed] = useState(false)
 
-  // Main polling query
+  // Initial fetch; live updates arrive over the event stream below
   const { data, isLoading, error } = useQuery<ABTestStatus>({
     queryKey: ['ab-test', workflowId],
     queryFn: async () => {
@@ -19,13 +20,38 @@ export const useABTest = (workflowId: string | undefined) => {
       return response.data
     },
     refetchInterval: (query) => {
-      // Stop polling if test is complete
+      // Only poll if the stream dropped and the test is still running
       const status = query.state.data?.is_running
-      return status ? POLL_INTERVAL : false
+      return streamFailed && status ? POLL_INTERVAL : false
     },
     enabled: !!workflowId,
   })
 
+  const isRunning = data?.is_running ?? false
+
+  // Server-Sent Events: the backend pushes only when metrics or the winner change
+  useEffect(() => {
+    if (!workflowId || !isRunning || typeof EventSource === 'undefined') {
+      return
+    }
+
+    const source = new EventSource(`${API_BASE}/api/v1/workflows/${workflowId}/ab-stream`)
+    source.addEventListener('ab_test', (event) => {
+      const payload = JSON.parse((event as MessageEvent<string>).data) as ABTestStatus
+      queryClient.setQueryData(['ab-test', workflowId], payload)
+      if (!payload.is_running) {
+        source.close()
+      }
+    })
+    source.onopen = () => setStreamFailed(false)
+    source.onerror = () => {
+      // EventSource retries on its own; poll meanwhile so the UI stays fresh
+      setStreamFailed(true)
+    }
+
+    return () => source.close()
+  }, [workflowId, isRunning, queryClient])
+
   // Manual winner declaration
   const declareWinner = useMutation({
     mutationFn: async (thumbnailId: string) => {
@@ -0,0 +1,20 @@
+import { useQuery } from '@tanstack/react-query'
+import { apiClient } from '../api/client'
+import type { ABTimeline } from '../types/abtest'
+
+const TIMELINE_POINTS = 200 // Server downsamples each variant to at most this many samples
+
+// Refetches whenever a new metrics check lands (checksCompleted changes)
+export const useABTimeline = (workflowId: string | undefined, checksCompleted: number | undefined) => {
+  return useQuery<ABTimeline>({
+    queryKey: ['ab-timeline', workflowId, checksCompleted],
+    queryFn: async () => {
+      const response = await apiClient.get(`/api/v1/workflows/${workflowId}/ab-timeline`, {
+        params: { points: TIMELINE_POINTS },
+      })
+      return response.data
+    },
+    enabled: !!workflowId,
+    placeholderData: (previous) => previous,
+  })
+}
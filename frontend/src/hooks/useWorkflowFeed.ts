@@ -0,0 +1,111 @@
+import { useQueryClient } from '@tanstack/react-query'
+import { useEffect, useRef, useState } from 'react'
+import { API_BASE } from '../api/client'
+import type { WorkflowSummary } from '../types/workflows'
+
+interface WorkflowUpdate {
+  type: 'workflow_update'
+  workflow_id: string
+  revision: number
+  status: string
+  current_step: string
+  updated_ts: number
+}
+
+const RECONNECT_DELAY = 3000
+
+function socketUrl(): string {
+  return `${API_BASE.replace(/^http/, 'ws')}/api/v1/workflows/ws`
+}
+
+/**
+ * Keeps the cached workflow list fresh over a single WebSocket per tab.
+ * Returns whether the socket is connected so callers can relax polling.
+ */
+export const useWorkflowFeed = (workflowIds: string[]) => {
+  const queryClient = useQueryClient()
+  const socketRef = useRef<WebSocket | null>(null)
+  const subscribedRef = useRef<Set<string>>(new Set())
+  const [connected, setConnected] = useState(false)
+
+  useEffect(() => {
+    if (typeof WebSocket === 'undefined') {
+      return
+    }
+
+    let closed = false
+    let retryTimer: ReturnType<typeof setTimeout> | undefined
+
+    const connect = () => {
+      const socket = new WebSocket(socketUrl())
+      socketRef.current = socket
+
+      socket.onopen = () => {
+        setConnected(true)
+        const ids = Array.from(subscribedRef.current)
+        if (ids.length > 0) {
+          socket.send(JSON.stringify({ action: 'subscribe', workflow_ids: ids }))
+        }
+      }
+
+      socket.onmessage = (event) => {
+        const message = JSON.parse(event.data) as WorkflowUpdate | { type: 'error' }
+        if (message.type !== 'workflow_update') {
+          return
+        }
+        queryClient.setQueryData<WorkflowSummary[]>(['workflows'], (current) =>
+          current?.map((workflow) =>
+            workflow.workflow_id === message.workflow_id
+              ? {
+                  ...workflow,
+                  status: message.status,
+                  current_step: message.current_step,
+                  updated_ts: message.updated_ts,
+                }
+              : workflow,
+          ),
+        )
+        queryClient.invalidateQueries({ queryKey: ['workflow', message.workflow_id] })
+      }
+
+      socket.onclose = () => {
+        setConnected(false)
+        if (!closed) {
+          retryTimer = setTimeout(connect, RECONNECT_DELAY)
+        }
+      }
+    }
+
+    connect()
+
+    return () => {
+      closed = true
+      clearTimeout(retryTimer)
+      socketRef.current?.close()
+      socketRef.current = null
+    }
+  }, [queryClient])
+
+  const idsKey = workflowIds.join(',')
+
+  useEffect(() => {
+    const wanted = new Set(idsKey ? idsKey.split(',') : [])
+    const current = subscribedRef.current
+    const added = [...wanted].filter((id) => !current.has(id))
+    const removed = [...current].filter((id) => !wanted.has(id))
+    subscribedRef.current = wanted
+
+    const socket = socketRef.current
+    if (!socket || socket.readyState !== WebSocket.OPEN) {
+      return
+    }
+    if (added.length > 0) {
+      socket.send(JSON.stringify({ action: 'subscribe', workflow_ids: added }))
+    }
+    if (removed.length > 0) {
+      socket.send(JSON.stringify({ action: 'unsubscribe', workflow_ids: removed }))
+    }
+  }, [idsKey, connected])
+
+  return { connected }
+}
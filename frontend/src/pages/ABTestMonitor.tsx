@@ -2,17 +2,20 @@ import { useState } from 'react'
 import { Link, useParams } from 'react-router-dom'
 import { useABTest } from '../hooks/useABTest'
 import { CTRChart } from '../components/ab-testing/CTRChart'
+import { CTRTimelineChart } from '../components/ab-testing/CTRTimelineChart'
 import { ConfidenceMeter } from '../components/ab-testing/ConfidenceMeter'
 import { VariantCard } from '../components/ab-testing/VariantCard'
 import { TestTimer } from '../components/ab-testing/TestTimer'
 import { WinnerModal } from '../components/ab-testing/WinnerModal'
 import { ABTestWaiting } from '../components/ABTestWaiting'
 import { useWorkflow } from '../hooks/useWorkflow'
+import { useABTimeline } from '../hooks/useABTimeline'
 
 export function ABTestMonitor() {
   const { id } = useParams<{ id: string }>()
   const { data, isLoading, error, declareWinner, isDeclaring } = useABTest(id)
   const { data: workflowData } = useWorkflow(id)
+  const { data: timeline } = useABTimeline(id, data?.checks_completed)
   const [showWinnerModal, setShowWinnerModal] = useState(true)
 
   // Get thumbnail URLs from workflow data
@@ -103,6 +106,11 @@ export function ABTestMonitor() {
           ) : (
             <>
               <CTRChart variants={data.variants} />
+              {timeline && (
+                <div style={{ marginTop: '16px' }}>
+                  <CTRTimelineChart series={timeline.series} variants={data.variants} />
+                </div>
+              )}
               <div style={{ marginTop: '16px' }}>
                 <ConfidenceMeter confidence={data.current_confidence} />
               </div>
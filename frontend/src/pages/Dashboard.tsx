@@ -6,6 +6,7 @@ import { apiClient } from '../api/client'
 import { listWorkflows, startWorkflow } from '../api/workflows'
 import { WorkflowCard } from '../components/WorkflowCard'
 import { DashboardEmpty } from '../components/DashboardEmpty'
+import { useWorkflowFeed } from '../hooks/useWorkflowFeed'
 import { useWorkflowStore } from '../stores/workflowStore'
 import { toast } from 'react-hot-toast'
 
@@ -32,9 +33,12 @@ export function Dashboard() {
   const workflowsQuery = useQuery({
     queryKey: ['workflows'],
     queryFn: listWorkflows,
-    refetchInterval: 5000,
+    // Status changes arrive over the workflow feed; poll only as a fallback
+    refetchInterval: () => (feed.connected ? 60000 : 5000),
   })
 
+  const feed = useWorkflowFeed(workflowsQuery.data?.map((workflow) => workflow.workflow_id) ?? [])
+
   const createWorkflowMutation = useMutation({
     mutationFn: (workflowTopic: string) =>
       startWorkflow({
@@ -24,6 +24,25 @@ export interface ABTestStatus {
   can_declare_early: boolean
 }
 
+export interface ABTimelineSample {
+  ts: number // unix seconds
+  impressions: number
+  clicks: number
+  ctr: number
+}
+
+export interface ABTimelineSeries {
+  variant_id: string
+  total_samples: number
+  samples: ABTimelineSample[]
+}
+
+export interface ABTimeline {
+  workflow_id: string
+  points: number
+  series: ABTimelineSeries[]
+}
+
 export interface ABTestResults {
   winning_content: {
     script: ScriptVariant